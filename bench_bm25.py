@@ -0,0 +1,109 @@
+"""
+Benchmark: block-max top-k BM25 retrieval versus scoring every posting of
+every query term and taking the k best.
+
+Both must return the same documents with the same scores (the exhaustive
+scorer sums terms in the same order, so scores match exactly). Queries are
+a list of common Bible words and pairs plus combinations sampled from
+frequent, middling and rare terms, since pruning pays off most when a
+frequent term is involved.
+
+Usage: python bench_bm25.py [concordance.rank] [--samples 60] [-k 10] [--level verse]
+"""
+
+import argparse
+import heapq
+import random
+import statistics
+import time
+
+from bm25_index import LEVELS, BM25Index
+
+COMMON_QUERIES = [
+    "lord", "god", "israel", "king", "lord god", "living water", "covenant blood",
+    "faith hope love", "son of man", "shepherd sheep", "bread of life", "kingdom heaven",
+]
+
+
+def exhaustive_top_k(index, term_ids, level, k):
+    """Score every posting, then take the k best: what the pruning avoids."""
+    rank = index.levels[level]
+    docs, tfs, norms = rank.posting_docs, rank.posting_tfs, rank.norms
+    k1_plus_1 = index.k1 + 1
+    scores = {}
+    for term_id in term_ids:
+        idf = rank.idf[term_id]
+        for posting in range(rank.term_starts[term_id], rank.term_starts[term_id + 1]):
+            doc = docs[posting]
+            tf = tfs[posting]
+            scores[doc] = scores.get(doc, 0.0) + idf * tf * k1_plus_1 / (tf + norms[doc])
+    return [(doc, score) for doc, score in heapq.nlargest(k, scores.items(), key=lambda x: (x[1], -x[0]))]
+
+
+def sampled_queries(index, level, count, seed=5):
+    """One to three terms drawn from the frequent (top 1%), middling and rare bands."""
+    rank = index.levels[level]
+    by_frequency = sorted(range(len(index)), key=lambda t: rank.term_starts[t] - rank.term_starts[t + 1])
+    cut = max(1, len(by_frequency) // 100)
+    bands = [by_frequency[:cut], by_frequency[cut:cut * 10], by_frequency[cut * 10:]]
+    shapes = [(0,), (0, 0), (0, 1), (0, 2), (1, 2), (0, 1, 2), (1, 1)]
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        queries.append(" ".join(index.term(rng.choice(bands[band])) for band in shapes[i % len(shapes)]))
+    return queries
+
+
+def timed(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def run(args):
+    index = BM25Index(args.index)
+    level = args.level
+    queries = COMMON_QUERIES + sampled_queries(index, level, args.samples)
+
+    print(f"\n{'='*72}")
+    print("BM25 TOP-K BENCHMARK")
+    print(f"{'='*72}")
+    print(f"  Index: {args.index} ({len(index):,} terms, {len(index.levels[level]):,} {level}s), k={args.k}")
+    print(f"\n  {'query':<30} {'postings':>9} {'top-k':>10} {'all':>10} {'speedup':>8}")
+
+    rank = index.levels[level]
+    speedups = []
+    top_total = all_total = 0.0
+    for query in queries:
+        term_ids = index.query_terms(query)
+        postings = sum(rank.term_starts[t + 1] - rank.term_starts[t] for t in term_ids)
+        ranked, top_time = timed(lambda: index.top_k(term_ids, level, args.k), args.repeats)
+        expected, all_time = timed(lambda: exhaustive_top_k(index, term_ids, level, args.k), args.repeats)
+        if ranked != expected:
+            raise SystemExit(f"  {query}: top-k and exhaustive scoring disagree")
+        top_total += top_time
+        all_total += all_time
+        if term_ids:
+            speedups.append(all_time / top_time)
+        if query in COMMON_QUERIES or args.verbose:
+            print(f"  {query[:30]:<30} {postings:>9,} {top_time * 1e6:8.0f}us {all_time * 1e6:8.0f}us "
+                  f"{all_time / top_time:7.1f}x")
+
+    print(f"\n  {len(queries)} queries ({len(COMMON_QUERIES)} common, {args.samples} sampled), "
+          f"all matching exhaustive scoring")
+    print(f"  Total: top-k {top_total * 1000:.1f} ms, exhaustive {all_total * 1000:.1f} ms "
+          f"({all_total / top_total:.1f}x); median speedup {statistics.median(speedups):.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Block-max top-k BM25 vs exhaustive scoring")
+    parser.add_argument("index", nargs="?", default="concordance.rank")
+    parser.add_argument("--level", choices=LEVELS, default="verse")
+    parser.add_argument("-k", type=int, default=10, help="results per query")
+    parser.add_argument("--samples", type=int, default=60, help="queries sampled from the vocabulary")
+    parser.add_argument("--repeats", type=int, default=3, help="best of N per query")
+    parser.add_argument("--verbose", action="store_true", help="print sampled queries too")
+    run(parser.parse_args())
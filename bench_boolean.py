@@ -0,0 +1,152 @@
+"""
+Benchmark: boolean queries with automatic sparse/dense choice versus always
+galloping through sorted lists, always using bitsets, and plain Python sets.
+
+Every strategy must return the same ids. Term postings are warmed first, so
+the times are for parsing and evaluating a query plus reading its first
+--limit ids, which is what /api/query does. Queries are a list of common
+Bible combinations plus ones sampled from frequent, middling and rare words,
+so every kind of operand mix is covered on any corpus.
+
+Usage: python bench_boolean.py [concordance.pos] [--samples 60] [--repeats 5] [--level verse]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from boolean_query import LEVELS, BooleanIndex, open_boolean_index, parse_boolean
+from positional_index import PositionalIndex
+
+COMMON_QUERIES = [
+    "covenant AND blood NOT egypt", "lord AND israel", "lord israel NOT king",
+    "(moses OR aaron) AND pharaoh", "shepherd sheep NOT wolf", "faith OR hope OR love",
+    "david AND (saul OR jonathan)", "god NOT lord", "bread AND wine AND blood",
+]
+
+
+def set_search(sets, universe, tree):
+    """Evaluate with Python sets: what the engine replaces."""
+    kind = tree[0]
+    if kind == "term":
+        return sets.get(tree[1], set())
+    if kind == "or":
+        return set().union(*(set_search(sets, universe, node) for node in tree[1]))
+    positives = [set_search(sets, universe, node) for node, negated in tree[1] if not negated]
+    result = set.intersection(*positives) if positives else set(range(universe))
+    for node, negated in tree[1]:
+        if negated:
+            result = result - set_search(sets, universe, node)
+    return result
+
+
+def sampled_queries(words, count, seed=7):
+    """AND / NOT / OR mixes of frequent (top 1%), middling and rare words."""
+    rng = random.Random(seed)
+    cut = max(1, len(words) // 100)
+    frequent, middling, rare = words[:cut], words[cut:cut * 10], words[cut * 10:]
+    shapes = [
+        lambda: f"{rng.choice(frequent)} AND {rng.choice(frequent)} NOT {rng.choice(frequent)}",
+        lambda: f"{rng.choice(rare)} AND {rng.choice(frequent)}",
+        lambda: f"{rng.choice(middling)} AND {rng.choice(middling)}",
+        lambda: f"({rng.choice(rare)} OR {rng.choice(middling)}) AND NOT {rng.choice(frequent)}",
+        lambda: f"{rng.choice(rare)} OR {rng.choice(rare)}",
+        lambda: f"{rng.choice(frequent)} OR {rng.choice(middling)}",
+    ]
+    return [shapes[i % len(shapes)]() for i in range(count)]
+
+
+def first_ids(engine, query, level, limit):
+    matches = engine.query(query, level)
+    return len(matches), list(matches.to_ids(limit))
+
+
+def timed(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def run(args):
+    positional = PositionalIndex(args.index)
+    auto = open_boolean_index(positional)
+    engines = {
+        "auto": auto,
+        "sparse": BooleanIndex(positional, "sparse"),
+        "bits": BooleanIndex(positional, "bits"),
+    }
+    # One word per lemma group (its first form)
+    groups = {}
+    for i in range(len(positional)):
+        term = positional.term(i).decode('utf-8')
+        groups.setdefault(positional.lemma_group(term), term)
+    words = sorted(groups.values(), key=lambda word: -len(auto.term_postings(word)))
+    queries = COMMON_QUERIES + sampled_queries(words, args.samples)
+
+    level = args.level
+    universe = auto.universe[level]
+    start = time.perf_counter()
+    for engine in engines.values():
+        for query in queries:
+            engine.query(query, level).to_ids(args.limit)
+    warm_time = time.perf_counter() - start
+    sets = {}
+    for query in queries:
+        stack = [parse_boolean(query)]
+        while stack:
+            node = stack.pop()
+            if node[0] == "term":
+                sets[node[1]] = set(auto.term_postings(node[1], level).to_ids())
+            else:
+                stack.extend(child[0] if node[0] == "and" else child for child in node[1])
+
+    print(f"\n{'='*72}")
+    print("BOOLEAN QUERY BENCHMARK")
+    print(f"{'='*72}")
+    print(f"  Index: {args.index} ({len(words):,} lemmas, {universe:,} {level}s); "
+          f"term caches warmed in {warm_time * 1000:.0f} ms")
+    print(f"\n  {'query':<36} {'hits':>6} " + " ".join(f"{name:>8}" for name in [*engines, "sets"]))
+
+    totals = dict.fromkeys([*engines, "sets"], 0.0)
+    auto_times = []
+    for query in queries:
+        tree = parse_boolean(query)
+        expected, set_time = timed(lambda: sorted(set_search(sets, universe, tree))[:args.limit], args.repeats)
+        row = {}
+        for name, engine in engines.items():
+            (count, ids), row[name] = timed(
+                lambda: first_ids(engine, query, level, args.limit), args.repeats)
+            if ids != expected:
+                raise SystemExit(f"  {query}: {name} and sets disagree")
+        row["sets"] = set_time
+        auto_times.append(row["auto"])
+        for name, seconds in row.items():
+            totals[name] += seconds
+        if query in COMMON_QUERIES or args.verbose:
+            print(f"  {query[:36]:<36} {count:>6} "
+                  + " ".join(f"{seconds * 1e6:6.0f}us" for seconds in row.values()))
+
+    print(f"\n  {len(queries)} queries ({len(COMMON_QUERIES)} common, {args.samples} sampled), "
+          f"all strategies agree")
+    print("  Mean per query: " + ", ".join(
+        f"{name} {total / len(queries) * 1e6:.0f} us" for name, total in totals.items()))
+    print(f"  auto vs best forced strategy: "
+          f"{totals['auto'] / min(totals['sparse'], totals['bits']):.2f}x the time; "
+          f"sets {totals['sets'] / totals['auto']:.1f}x slower than auto")
+    print(f"  Median auto query {statistics.median(auto_times) * 1e6:.0f} us, "
+          f"slowest {max(auto_times) * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Boolean query strategies compared")
+    parser.add_argument("index", nargs="?", default="concordance.pos")
+    parser.add_argument("--level", choices=LEVELS, default="verse")
+    parser.add_argument("--samples", type=int, default=60, help="queries sampled from the vocabulary")
+    parser.add_argument("--repeats", type=int, default=5, help="best of N per query")
+    parser.add_argument("--limit", type=int, default=50, help="ids read from each result")
+    parser.add_argument("--verbose", action="store_true", help="print sampled queries too")
+    run(parser.parse_args())
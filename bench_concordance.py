@@ -0,0 +1,132 @@
+"""
+Benchmark: full concordance.json fetch vs per-word /api/concordance lookups.
+
+Compares payload size and time-to-first-result for the two ways the
+Concordance tab can get a word's entries:
+  - full:  download and parse all of concordance.json, then look the word up
+  - api:   ask the server for just that word's entries
+
+Without a server URL it measures both paths in-process (file read + JSON
+parse vs. index lookup + JSON encode). With a URL it measures real HTTP
+round trips against a running server.py.
+
+Usage: python bench_concordance.py [concordance.json] [http://localhost:8000]
+"""
+
+import json
+import statistics
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from concordance_index import ConcordanceIndex
+
+SAMPLE_WORDS = ["love", "covenant", "lord", "israel", "baptize", "pharisee", "water", "shepherd"]
+
+
+def fmt_bytes(n):
+    if n >= 1024 * 1024:
+        return f"{n / 1024 / 1024:.2f} MB"
+    if n >= 1024:
+        return f"{n / 1024:.1f} KB"
+    return f"{n} B"
+
+
+def bench_local(concordance_file, words):
+    """Measure both paths in-process, without any network."""
+    raw = Path(concordance_file).read_bytes()
+
+    # Full-file path: parse everything, then look up the word
+    start = time.perf_counter()
+    data = json.loads(raw)
+    data["concordance"].get(words[0], [])
+    full_time = time.perf_counter() - start
+
+    # API path: build the index once (server startup), then per-word lookups
+    start = time.perf_counter()
+    index = ConcordanceIndex.from_concordance(data)
+    startup_time = time.perf_counter() - start
+    del data
+
+    sizes = []
+    times = []
+    for word in words:
+        start = time.perf_counter()
+        body = json.dumps({"word": word, "entries": index.lookup(word)}).encode('utf-8')
+        times.append(time.perf_counter() - start)
+        sizes.append(len(body))
+
+    return {
+        "full_bytes": len(raw),
+        "full_time": full_time,
+        "startup_time": startup_time,
+        "api_sizes": sizes,
+        "api_times": times,
+    }
+
+
+def fetch(url):
+    """Return (body_size, seconds) for one GET."""
+    start = time.perf_counter()
+    with urllib.request.urlopen(url) as response:
+        body = response.read()
+    return len(body), time.perf_counter() - start
+
+
+def bench_http(base_url, words):
+    """Measure both paths against a running server."""
+    base_url = base_url.rstrip('/')
+    full_bytes, full_time = fetch(f"{base_url}/concordance.json")
+
+    sizes = []
+    times = []
+    for word in words:
+        try:
+            size, elapsed = fetch(f"{base_url}/api/concordance/{word}")
+        except urllib.error.HTTPError as e:
+            # Unknown words answer 404 with a tiny body
+            size, elapsed = len(e.read()), 0.0
+        sizes.append(size)
+        times.append(elapsed)
+
+    return {
+        "full_bytes": full_bytes,
+        "full_time": full_time,
+        "startup_time": None,
+        "api_sizes": sizes,
+        "api_times": times,
+    }
+
+
+def report(result, words):
+    print(f"\n{'='*60}")
+    print("CONCORDANCE PAYLOAD BENCHMARK")
+    print(f"{'='*60}")
+    print(f"  Full fetch:  {fmt_bytes(result['full_bytes']):>10}  {result['full_time'] * 1000:9.1f} ms to first result")
+    if result["startup_time"] is not None:
+        print(f"  Index build: {result['startup_time'] * 1000:.1f} ms (once, at server startup)")
+
+    print(f"\n  {'word':<12} {'payload':>10} {'time':>10}")
+    for word, size, elapsed in zip(words, result["api_sizes"], result["api_times"]):
+        print(f"  {word:<12} {fmt_bytes(size):>10} {elapsed * 1000:8.2f} ms")
+
+    median_size = statistics.median(result["api_sizes"])
+    median_time = statistics.median(result["api_times"])
+    print(f"\n  API median:  {fmt_bytes(int(median_size)):>10}  {median_time * 1000:9.2f} ms")
+    if median_size:
+        print(f"  Payload reduction: {result['full_bytes'] / median_size:,.0f}x")
+    if median_time:
+        print(f"  Time-to-first-result speedup: {result['full_time'] / median_time:,.0f}x")
+
+
+if __name__ == "__main__":
+    concordance_file = sys.argv[1] if len(sys.argv) > 1 else "concordance.json"
+    server_url = sys.argv[2] if len(sys.argv) > 2 else None
+
+    if server_url:
+        result = bench_http(server_url, SAMPLE_WORDS)
+    else:
+        result = bench_local(concordance_file, SAMPLE_WORDS)
+    report(result, SAMPLE_WORDS)
@@ -0,0 +1,114 @@
+"""
+Benchmark: concordance index build time versus worker processes.
+
+Times only the postings stage of build_concordance.py (tokenize, index and
+snippet every verse, then merge), which is what concordance_postings.py
+parallelizes per book. Lemmatization is left out: it runs once up front
+in spaCy, and the indexing cost doesn't depend on which lemma a word maps
+to, so words are indexed as their own lemmas here. Every parallel result
+is checked against the single-process one.
+
+Uses nasb.txt when present, otherwise a placeholder corpus with the
+Bible's shape (1,189 chapters, ~31k verses, Zipf-distributed words).
+--copies N indexes N copies of the corpus as separate "translations".
+
+Usage: python bench_concordance_build.py [--workers 1,2,4,8] [--repeats 3]
+                                         [--copies 1] [nasb.txt]
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+from concordance_postings import build_postings, partition_by_book
+from corpus import load_corpus
+
+
+def load_chapters(bible_filepath, copies):
+    """{chapter_key: {"verses": [{ref, text}]}}, as build_concordance.parse_bible returns."""
+    if Path(bible_filepath).exists():
+        corpus = load_corpus(bible_filepath)
+        base = {
+            key: [(corpus.verses[i], corpus.verse_text(i)) for i in indexes]
+            for key, indexes in corpus.chapter_verses().items()
+        }
+        label = f"{bible_filepath}"
+    else:
+        base = placeholder_chapters()
+        label = "placeholder corpus"
+
+    chapters = {}
+    for copy in range(copies):
+        suffix = f" ({copy + 1})" if copies > 1 else ""
+        for key, verses in base.items():
+            book, chapter = key.rsplit(' ', 1)
+            copy_key = f"{book}{suffix} {chapter}"
+            chapters[copy_key] = {
+                "verses": [{"ref": f"{copy_key}:{n}", "text": text} for n, text in verses]
+            }
+    return chapters, label
+
+
+def placeholder_chapters(books=66, chapters=1189, verses=31102, seed=5):
+    rng = random.Random(seed)
+    letters = "abcdefghiklmnoprstuvwy"
+    vocab = sorted({"".join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(12000)})
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    result = {}
+    for c in range(chapters):
+        key = f"Book{c * books // chapters + 1} {c + 1}"
+        count = verses // chapters + (1 if c < verses % chapters else 0)
+        result[key] = [
+            (v + 1, " ".join(rng.choices(vocab, weights, k=rng.randint(12, 40))).capitalize() + ".")
+            for v in range(count)
+        ]
+    return result
+
+
+def run(args):
+    chapters, label = load_chapters(args.bible, args.copies)
+    summaries = {}
+    lemmas = {}
+    verses = sum(len(c["verses"]) for c in chapters.values())
+
+    print(f"\n{'='*60}")
+    print("CONCORDANCE BUILD BENCHMARK")
+    print(f"{'='*60}")
+    print(f"  Corpus: {label} x{args.copies}: {len(chapters):,} chapters, {verses:,} verses, "
+          f"{len(partition_by_book(chapters))} book partitions")
+    print(f"  CPU cores: {os.cpu_count()}")
+    print(f"\n  {'workers':>7} {'time':>9} {'speedup':>8} {'efficiency':>11}")
+
+    reference = None
+    baseline = None
+    for workers in args.workers:
+        times = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            concordance = build_postings(chapters, summaries, lemmas, workers)
+            times.append(time.perf_counter() - start)
+        best = min(times)
+
+        if reference is None:
+            reference = json.dumps(concordance)
+        elif json.dumps(concordance) != reference:
+            raise SystemExit(f"  {workers} workers: output differs from {args.workers[0]} worker(s)")
+
+        baseline = baseline or best * args.workers[0]
+        speedup = baseline / best
+        print(f"  {workers:>7} {best:8.2f}s {speedup:7.2f}x {speedup / workers:10.0%}")
+
+    print(f"\n  All outputs identical ({len(concordance):,} words)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concordance postings build time vs worker count")
+    parser.add_argument("bible", nargs="?", default="nasb.txt")
+    parser.add_argument("--workers", default="1,2,4,8",
+                        type=lambda s: [int(n) for n in s.split(',') if n.strip()])
+    parser.add_argument("--repeats", type=int, default=3, help="best of N per worker count")
+    parser.add_argument("--copies", type=int, default=1, help="index N copies (like N translations)")
+    run(parser.parse_args())
@@ -0,0 +1,109 @@
+"""
+Benchmark: "valid next nodes" for random network paths.
+
+Compares the visualization's current algorithm (ported as-is: scan every
+chapter chain with a membership test per path word, once for the path
+and again for each candidate, plus a node lookup per candidate) against
+NetworkIndex's bitset ANDs (over network.bin, rewritten next to the JSON
+as build_network.py writes it). Paths are random walks that only ever take
+valid next steps, like a user clicking through the graph.
+
+Usage: python bench_network.py [network_data.json] [paths]
+"""
+
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from network_index import NetworkIndex, write_network_index
+
+
+class ChainScan:
+    """Python port of getReachableChapters / getValidNextNodes from index.html."""
+
+    def __init__(self, nodes, links):
+        self.nodes = nodes
+        self.chapter_chains = {n['id']: n.get('chain', []) for n in nodes if n['type'] == 'chapter'}
+        self.outgoing = {}
+        for link in links:
+            self.outgoing.setdefault(link['source'], set()).add(link['target'])
+
+    def reachable(self, path):
+        if not path:
+            return set()
+        return {
+            chapter for chapter, chain in self.chapter_chains.items()
+            if all(word in chain for word in path)
+        }
+
+    def valid_next(self, path):
+        if not path:
+            return set()
+        valid_chapters = self.reachable(path)
+        valid = set()
+        for next_id in self.outgoing.get(path[-1], set()):
+            node = next((n for n in self.nodes if n['id'] == next_id), None)
+            if node and node['type'] == 'chapter':
+                if next_id in valid_chapters:
+                    valid.add(next_id)
+            elif self.reachable(path + [next_id]):
+                valid.add(next_id)
+        return valid
+
+
+def random_paths(index, count, max_length=5, seed=7):
+    """Random walks from word nodes, each step chosen among valid next words."""
+    rng = random.Random(seed)
+    starts = [w for w in index.words() if index.outgoing(w)]
+    paths = []
+    while len(paths) < count:
+        path = [rng.choice(starts)]
+        for _ in range(rng.randint(0, max_length - 1)):
+            words = [n for n in index.valid_next(path) if not index.is_chapter(n)]
+            if not words:
+                break
+            path.append(rng.choice(words))
+        paths.append(path)
+    return paths
+
+
+def time_queries(valid_next, paths):
+    start = time.perf_counter()
+    results = [valid_next(path) for path in paths]
+    return time.perf_counter() - start, results
+
+
+if __name__ == "__main__":
+    network_file = sys.argv[1] if len(sys.argv) > 1 else "network_data.json"
+    path_count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with open(network_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    index_file = Path(network_file).with_name("network.bin")
+    start = time.perf_counter()
+    write_network_index(data['nodes'], data['links'], index_file)
+    index = NetworkIndex(index_file)
+    build_time = time.perf_counter() - start
+    scan = ChainScan(data['nodes'], data['links'])
+
+    paths = random_paths(index, path_count)
+    scan_time, scan_results = time_queries(scan.valid_next, paths)
+    bitset_time, bitset_results = time_queries(index.valid_next, paths)
+
+    mismatches = sum(set(a) != b for a, b in zip(bitset_results, scan_results))
+    lengths = [len(p) for p in paths]
+
+    print(f"\n{'='*60}")
+    print("NETWORK PATH QUERY BENCHMARK")
+    print(f"{'='*60}")
+    print(f"  Network: {index.word_count:,} words, {index.chapter_count:,} chapters")
+    print(f"  Index build: {build_time * 1000:.1f} ms")
+    print(f"  Paths: {len(paths)} (length {min(lengths)}-{max(lengths)}, "
+          f"avg {sum(lengths) / len(lengths):.1f})")
+    print(f"  Chain scan: {scan_time / len(paths) * 1000:9.3f} ms/query")
+    print(f"  Bitsets:    {bitset_time / len(paths) * 1000:9.3f} ms/query")
+    print(f"  Speedup:    {scan_time / bitset_time:,.0f}x")
+    print(f"  Result mismatches: {mismatches}")
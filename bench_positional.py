@@ -0,0 +1,131 @@
+"""
+Benchmark: multi-word queries on the positional index versus rescanning
+every verse's text.
+
+The scan baseline tokenizes all verses once up front (so only matching is
+timed) and then tests each verse for the query, which is what answering
+phrase or proximity queries costs without positions. Both must return the
+same matches. Queries are a list of common Bible phrases plus phrases
+sampled from the text itself, so every query has hits on any corpus.
+
+Usage: python bench_positional.py [concordance.pos] [--samples 30] [--repeats 5]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from positional_index import PositionalIndex, parse_query, tokenize
+
+COMMON_QUERIES = [
+    '"the lord"', '"son of man"', '"living water"', '"the kingdom of god"',
+    '"in the beginning"', '"fear not"', '"bread life"~2', '"lord god"~3',
+    'faith NEAR/5 works', 'love NEAR/3 neighbor', 'david NEAR/10 saul', 'moses NEAR/5 aaron',
+]
+
+
+def scan_search(verse_tokens, kind, words, k):
+    """Answer a query by checking every verse's token list."""
+    matches = []
+    n = len(words)
+    for verse_id, tokens in enumerate(verse_tokens):
+        if kind == "phrase":
+            for start in range(len(tokens) - n + 1):
+                if tokens[start:start + n] == words:
+                    matches.append((verse_id, start, start + n - 1))
+        elif kind == "ordered":
+            limit = n - 1 + k
+            for start, token in enumerate(tokens):
+                if token != words[0]:
+                    continue
+                position = start
+                for word in words[1:]:
+                    try:
+                        position = tokens.index(word, position + 1)
+                    except ValueError:
+                        position = None
+                        break
+                    if position - start > limit:
+                        break
+                if position is not None and position - start <= limit:
+                    matches.append((verse_id, start, position))
+        else:
+            first, second = words
+            for i, token in enumerate(tokens):
+                if token != first:
+                    continue
+                lo = i + 1 if first == second else max(0, i - k)
+                for j in range(lo, min(len(tokens), i + k + 1)):
+                    if j != i and tokens[j] == second:
+                        matches.append((verse_id, min(i, j), max(i, j)))
+    return matches
+
+
+def sampled_queries(verse_tokens, count, seed=11):
+    """Phrases, ordered sequences and NEAR pairs taken from random verses."""
+    rng = random.Random(seed)
+    queries = []
+    while len(queries) < count:
+        tokens = rng.choice(verse_tokens)
+        if len(tokens) < 6:
+            continue
+        start = rng.randrange(len(tokens) - 4)
+        kind = len(queries) % 3
+        if kind == 0:
+            queries.append('"' + " ".join(tokens[start:start + rng.randint(2, 4)]) + '"')
+        elif kind == 1:
+            queries.append(f'"{tokens[start]} {tokens[start + 2]}"~1')
+        else:
+            queries.append(f'{tokens[start + 3]} NEAR/4 {tokens[start]}')
+    return queries
+
+
+def timed(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def run(args):
+    index = PositionalIndex(args.index)
+    verse_tokens = [tokenize(index.verse_text(v)) for v in range(index.verse_count)]
+
+    queries = COMMON_QUERIES + sampled_queries(verse_tokens, args.samples)
+    print(f"\n{'='*72}")
+    print("POSITIONAL INDEX BENCHMARK")
+    print(f"{'='*72}")
+    print(f"  Index: {args.index} ({len(index):,} terms, {index.verse_count:,} verses)")
+    print(f"\n  {'query':<36} {'hits':>6} {'index':>10} {'scan':>10} {'speedup':>8}")
+
+    speedups = []
+    index_total = scan_total = 0.0
+    for query in queries:
+        kind, words, k = parse_query(query)
+        (_, _, matches), index_time = timed(lambda: index.search(query), args.repeats)
+        expected, scan_time = timed(lambda: scan_search(verse_tokens, kind, words, k), 1)
+        if sorted(matches) != sorted(expected):
+            raise SystemExit(f"  {query}: index and scan disagree ({len(matches)} vs {len(expected)})")
+        index_total += index_time
+        scan_total += scan_time
+        speedups.append(scan_time / index_time)
+        if query in COMMON_QUERIES or args.verbose:
+            print(f"  {query:<36} {len(matches):>6} {index_time * 1000:8.3f}ms "
+                  f"{scan_time * 1000:8.1f}ms {scan_time / index_time:7.0f}x")
+
+    print(f"\n  {len(queries)} queries ({len(COMMON_QUERIES)} common, {args.samples} sampled), "
+          f"all matching the scan")
+    print(f"  Total: index {index_total * 1000:.1f} ms, scan {scan_total * 1000:.0f} ms "
+          f"({scan_total / index_total:.0f}x); median speedup {statistics.median(speedups):.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Positional index vs text scan for multi-word queries")
+    parser.add_argument("index", nargs="?", default="concordance.pos")
+    parser.add_argument("--samples", type=int, default=30, help="queries sampled from the text")
+    parser.add_argument("--repeats", type=int, default=5, help="best of N for index queries")
+    parser.add_argument("--verbose", action="store_true", help="print sampled queries too")
+    run(parser.parse_args())
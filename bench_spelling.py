@@ -0,0 +1,101 @@
+"""
+Benchmark: deletion-neighborhood spelling lookup versus comparing the query
+against every dictionary word.
+
+Both must return the same suggestions (the scan uses the same bounded edit
+distance and ranking). Queries are common misspellings of Bible names and
+words with the intended spelling; a correction only counts against top-1 /
+top-5 accuracy when the intended word is in the dictionary at all.
+
+Usage: python bench_spelling.py [concordance.spell] [-k 5] [--repeats 20]
+"""
+
+import argparse
+import statistics
+import time
+
+from concordance_spelling import SpellingIndex, edit_distance
+
+MISSPELLINGS = {
+    "nebuchadnezar": "nebuchadnezzar", "melchisedek": "melchizedek", "pharoah": "pharaoh",
+    "isiah": "isaiah", "methusalah": "methuselah", "jerusalum": "jerusalem",
+    "bethlehim": "bethlehem", "zacheus": "zacchaeus", "hezekia": "hezekiah",
+    "elija": "elijah", "jehosaphat": "jehoshaphat", "barnabus": "barnabas",
+    "golgatha": "golgotha", "gethsemene": "gethsemane", "habbakuk": "habakkuk",
+    "zephania": "zephaniah", "nicodemas": "nicodemus", "philistenes": "philistines",
+    "bartholemew": "bartholomew", "goliah": "goliath", "abrahm": "abraham",
+    "issac": "isaac", "rebekka": "rebekah", "nazereth": "nazareth", "capernum": "capernaum",
+    "covenent": "covenant", "rightousness": "righteousness", "sacrafice": "sacrifice",
+    "prophecied": "prophesied", "tabernacel": "tabernacle", "beleive": "believe",
+    "deciples": "disciples", "annointed": "anointed", "pharasees": "pharisees",
+    "sepulchre": "sepulcher", "phillip": "philip", "mathew": "matthew", "levitcus": "leviticus",
+}
+
+
+def scan_lookup(index, word, k):
+    """Edit distance to every word, then rank: what the index avoids."""
+    found = []
+    for word_id in range(len(index)):
+        candidate = index.word(word_id)
+        distance = edit_distance(word, candidate, index.max_distance)
+        if distance <= index.max_distance:
+            found.append((distance, -index.counts[word_id], word_id))
+    found.sort()
+    return [(index.word(i), distance, -negative_count) for distance, negative_count, i in found[:k]]
+
+
+def timed(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def run(args):
+    index = SpellingIndex(args.index)
+
+    print(f"\n{'='*72}")
+    print("SPELLING LOOKUP BENCHMARK")
+    print(f"{'='*72}")
+    print(f"  Index: {args.index} ({len(index):,} words, {len(index.delete_hashes):,} deletes)")
+    print(f"\n  {'query':<16} {'expected':<16} {'rank':>4} {'index':>9} {'scan':>9}  top suggestion")
+
+    index_times, scan_times = [], []
+    top1 = top5 = known = 0
+    for query, expected in MISSPELLINGS.items():
+        results, index_time = timed(lambda: index.lookup(query, args.k), args.repeats)
+        baseline, scan_time = timed(lambda: scan_lookup(index, query, args.k), max(1, args.repeats // 10))
+        if results != baseline:
+            raise SystemExit(f"  {query}: index and full scan disagree")
+        index_times.append(index_time)
+        scan_times.append(scan_time)
+
+        words = [word for word, _, _ in results]
+        rank = words.index(expected) + 1 if expected in words else None
+        if expected in index:
+            known += 1
+            top1 += rank == 1
+            top5 += rank is not None and rank <= 5
+        top = f"{results[0][0]} ({results[0][1]})" if results else "-"
+        status = str(rank) if rank else ("-" if expected in index else "n/a")
+        print(f"  {query:<16} {expected:<16} {status:>4} {index_time * 1e6:7.0f}us "
+              f"{scan_time * 1e6:7.0f}us  {top}")
+
+    print(f"\n  {len(MISSPELLINGS)} queries, all matching the full scan; "
+          f"{known} with the intended word in the dictionary")
+    if known:
+        print(f"  Top-1 {top1 / known:.0%}, top-{args.k} {top5 / known:.0%}")
+    print(f"  Index: median {statistics.median(index_times) * 1e6:.0f} us, "
+          f"slowest {max(index_times) * 1e6:.0f} us; "
+          f"scan: median {statistics.median(scan_times) * 1e6:.0f} us "
+          f"({statistics.median(scan_times) / statistics.median(index_times):.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spelling index vs full vocabulary scan")
+    parser.add_argument("index", nargs="?", default="concordance.spell")
+    parser.add_argument("-k", type=int, default=5, help="suggestions per query")
+    parser.add_argument("--repeats", type=int, default=20, help="best of N per lookup")
+    run(parser.parse_args())
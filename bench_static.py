@@ -0,0 +1,108 @@
+"""
+Benchmark: bytes transferred for the page's JSON artifacts, cold vs warm.
+
+  cold:  first visit, no cached copy (uncompressed vs best precompressed variant)
+  warm:  repeat visit revalidating with If-None-Match (304, headers only)
+
+Without a URL the numbers come from the files on disk (run
+static_artifacts.py first to build the .gz/.br variants). With a URL the
+requests are made against a running server.py and the real response
+sizes, status codes and header bytes are reported.
+
+Usage: python bench_static.py [http://localhost:8000]
+"""
+
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from static_artifacts import ARTIFACTS, ENCODINGS
+
+# Rough size of a 304's status line + headers when measuring offline
+NOT_MODIFIED_BYTES = 200
+
+
+def fmt_bytes(n):
+    if n >= 1024 * 1024:
+        return f"{n / 1024 / 1024:.2f} MB"
+    if n >= 1024:
+        return f"{n / 1024:.1f} KB"
+    return f"{n} B"
+
+
+def measure_files():
+    rows = []
+    for name in ARTIFACTS:
+        path = Path(name)
+        if not path.exists():
+            continue
+        identity = path.stat().st_size
+        best = identity
+        best_encoding = "identity"
+        for encoding, suffix in ENCODINGS:
+            variant = path.with_name(path.name + suffix)
+            if variant.exists() and variant.stat().st_size < best:
+                best = variant.stat().st_size
+                best_encoding = encoding
+        rows.append((name, identity, best, best_encoding, NOT_MODIFIED_BYTES))
+    return rows
+
+
+def request(url, headers):
+    """Return (status, body_bytes, header_bytes, response_headers)."""
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(req) as response:
+            body = response.read()
+            status, response_headers = response.status, response.headers
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        status, response_headers = e.code, e.headers
+    header_bytes = sum(len(k) + len(v) + 4 for k, v in response_headers.items())
+    return status, len(body), header_bytes, response_headers
+
+
+def measure_server(base_url):
+    base_url = base_url.rstrip('/')
+    rows = []
+    for name in ARTIFACTS:
+        url = f"{base_url}/{name}"
+        status, identity, identity_headers, _ = request(url, {"Accept-Encoding": "identity"})
+        if status != 200:
+            continue
+        _, best, best_headers, headers = request(url, {"Accept-Encoding": "br, gzip"})
+        encoding = headers.get("Content-Encoding", "identity")
+        status, warm_body, warm_headers, _ = request(url, {
+            "Accept-Encoding": "br, gzip",
+            "If-None-Match": headers.get("ETag", ""),
+        })
+        if status != 304:
+            print(f"  WARNING: {name} revalidation returned {status}, expected 304")
+        rows.append((name, identity + identity_headers, best + best_headers, encoding,
+                     warm_body + warm_headers))
+    return rows
+
+
+def report(rows):
+    print(f"\n{'='*72}")
+    print("STATIC ARTIFACT TRANSFER")
+    print(f"{'='*72}")
+    print(f"  {'artifact':<20} {'cold (plain)':>14} {'cold (best)':>14} {'encoding':>9} {'warm (304)':>11}")
+    totals = [0, 0, 0]
+    for name, identity, best, encoding, warm in rows:
+        print(f"  {name:<20} {fmt_bytes(identity):>14} {fmt_bytes(best):>14} {encoding:>9} {fmt_bytes(warm):>11}")
+        totals[0] += identity
+        totals[1] += best
+        totals[2] += warm
+    print(f"  {'TOTAL':<20} {fmt_bytes(totals[0]):>14} {fmt_bytes(totals[1]):>14} {'':>9} {fmt_bytes(totals[2]):>11}")
+    if totals[1] and totals[2]:
+        print(f"\n  Cold load reduction: {totals[0] / totals[1]:.1f}x")
+        print(f"  Warm load reduction: {totals[0] / totals[2]:,.0f}x vs. re-downloading")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        report(measure_server(sys.argv[1]))
+    else:
+        report(measure_files())
@@ -0,0 +1,99 @@
+"""
+Benchmark: time to first audio and total time for a long chapter,
+one TTS call for the whole text versus sentence-pipelined synthesis.
+
+By default the text is Psalms 119 from chapters.json and synthesis goes
+to Edge TTS. --engine picks another engine; --stub uses the stub engine
+as an offline model of an upstream service (a fixed connection latency
+per call, then audio at a fixed multiple of real time). Without
+chapters.json, --chars of placeholder sentences are used.
+
+Usage: python bench_tts_pipeline.py [--chapter "Psalms 119"] [--concurrency 1,2,4,8]
+                                    [--repeats 1] [--engine edge|local|stub] [--stub]
+                                    [--chars 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from pregen_audio import chapter_tts_text
+from tts_engines import ENGINES, StubEngine, create_engines
+from tts_pipeline import pipelined_synthesize, split_segments
+
+# Offline upstream model for --stub
+STUB_LATENCY = 0.35
+STUB_SPEED = 10.0  # times real time
+
+
+def load_text(chapter, chars):
+    path = Path("chapters.json")
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            chapters = json.load(f)["chapters"]
+        if chapter in chapters:
+            return chapter_tts_text(chapters[chapter]["verses"]), chapter
+    sentence = "The quick brown fox jumps over the lazy dog near the river bank. "
+    text = (sentence * (chars // len(sentence) + 1))[:chars].rsplit('.', 1)[0] + "."
+    return text, f"{len(text):,} placeholder chars"
+
+
+async def measure(stream):
+    start = time.perf_counter()
+    ttfb = None
+    size = 0
+    async for chunk in stream:
+        if ttfb is None:
+            ttfb = time.perf_counter() - start
+        size += len(chunk)
+    return ttfb, time.perf_counter() - start, size
+
+
+async def run(args):
+    text, label = load_text(args.chapter, args.chars)
+    if args.stub:
+        engine = StubEngine(speed=STUB_SPEED, latency=STUB_LATENCY)
+        upstream = f"stub ({STUB_LATENCY * 1000:.0f} ms latency, {STUB_SPEED:g}x real time)"
+    else:
+        engine = create_engines()[args.engine]
+        if not engine.available():
+            raise SystemExit(f"TTS engine '{args.engine}' is not available on this machine")
+        upstream = f"{engine.name} ({engine.default_voice})"
+    synthesize = engine.stream
+
+    segments = split_segments(text)
+    print(f"\n{'='*60}")
+    print("TTS PIPELINE BENCHMARK")
+    print(f"{'='*60}")
+    print(f"  Text: {label} ({len(text):,} chars, {len(segments)} segments)")
+    print(f"  Upstream: {upstream}")
+    print(f"\n  {'mode':<18} {'TTFB':>9} {'total':>9} {'audio':>10}")
+
+    modes = [("single call", lambda: synthesize(text))]
+    for concurrency in args.concurrency:
+        modes.append((f"pipelined x{concurrency}",
+                      lambda c=concurrency: pipelined_synthesize(segments, synthesize, c)))
+
+    baseline = None
+    for name, make_stream in modes:
+        results = [await measure(make_stream()) for _ in range(args.repeats)]
+        ttfb = min(r[0] for r in results)
+        total = min(r[1] for r in results)
+        size = results[0][2]
+        baseline = baseline or (ttfb, total)
+        print(f"  {name:<18} {ttfb * 1000:7.0f}ms {total:8.2f}s {size / 1024:8.0f}KB"
+              f"   ({baseline[0] / ttfb:.1f}x TTFB, {baseline[1] / total:.1f}x total)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Single-call vs pipelined TTS timing")
+    parser.add_argument("--chapter", default="Psalms 119")
+    parser.add_argument("--concurrency", default="1,2,4,8",
+                        type=lambda s: [int(n) for n in s.split(',') if n.strip()])
+    parser.add_argument("--repeats", type=int, default=1, help="best of N per mode")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="edge")
+    parser.add_argument("--stub", action="store_true", help="offline upstream model instead of Edge TTS")
+    parser.add_argument("--chars", type=int, default=20000, help="placeholder text length")
+    asyncio.run(run(parser.parse_args()))
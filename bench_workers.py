@@ -0,0 +1,179 @@
+"""
+Benchmark: server throughput versus worker process count.
+
+For each worker count, starts `server.py --workers N --no-browser` on a
+fixed port, drives it from several client processes (each running many
+concurrent aiohttp requests) for a fixed duration, and reports requests
+per second plus the workers' combined memory. The request mix is word
+lookups from /api/concordance/<word> and chapters from /api/chapter/<key>,
+both served from the mmap'd stores.
+
+Memory is reported as RSS (counts shared pages once per worker) and PSS
+(shared pages split between the processes that map them). Every index the
+server loads is a mapped file, so PSS grows far more slowly than RSS as
+workers are added: each extra worker costs its interpreter, aiohttp and
+the boolean engine's term postings cache, not another copy of the indexes.
+Memory figures need Linux /proc and are skipped elsewhere.
+
+Usage: python bench_workers.py [--workers 1,2,4] [--duration 10]
+                               [--clients 4] [--concurrency 32] [--port 8765]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import aiohttp
+
+SERVER = Path(__file__).with_name("server.py")
+
+
+def wait_until_ready(base_url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/chapters", timeout=2) as response:
+                return json.load(response)
+        except OSError:
+            time.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout}s")
+
+
+def fetch_targets(base_url, chapters):
+    """A fixed list of request paths: ~half word lookups, ~half chapters."""
+    with urllib.request.urlopen(f"{base_url}/api/concordance") as response:
+        words = list(json.load(response)["counts"])
+    rng = random.Random(7)
+    paths = [f"/api/concordance/{rng.choice(words)}" for _ in range(500)]
+    paths += [f"/api/chapter/{rng.choice(chapters['order'])}" for _ in range(500)]
+    rng.shuffle(paths)
+    return paths
+
+
+async def drive(base_url, paths, concurrency, duration):
+    """Issue requests from `concurrency` loops until duration elapses."""
+    deadline = time.perf_counter() + duration
+    completed = 0
+    errors = 0
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def loop(offset):
+            nonlocal completed, errors
+            i = offset
+            while time.perf_counter() < deadline:
+                try:
+                    async with session.get(base_url + paths[i % len(paths)]) as response:
+                        await response.read()
+                        if response.status == 200:
+                            completed += 1
+                        else:
+                            errors += 1
+                except aiohttp.ClientError:
+                    errors += 1
+                i += concurrency
+
+        await asyncio.gather(*(loop(i) for i in range(concurrency)))
+    return completed, errors
+
+
+def client_process(base_url, paths, concurrency, duration, results):
+    results.put(asyncio.run(drive(base_url, paths, concurrency, duration)))
+
+
+def worker_pids(server_pid):
+    """The server's worker processes (or the server itself when single-process)."""
+    children = Path(f"/proc/{server_pid}/task/{server_pid}/children")
+    if not children.exists():
+        return []
+    pids = [int(pid) for pid in children.read_text().split()]
+    return pids or [server_pid]
+
+
+def memory_kb(pids):
+    """Summed (RSS, PSS) in KB from /proc/<pid>/smaps_rollup, or None."""
+    rss = pss = 0
+    for pid in pids:
+        try:
+            lines = Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()
+        except OSError:
+            return None
+        for line in lines:
+            field, _, value = line.partition(':')
+            if field == 'Rss':
+                rss += int(value.split()[0])
+            elif field == 'Pss':
+                pss += int(value.split()[0])
+    return rss, pss
+
+
+def run_round(workers, args):
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, str(SERVER), "--host", "127.0.0.1", "--port", str(args.port),
+         "--workers", str(workers), "--no-browser"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        chapters = wait_until_ready(base_url)
+        paths = fetch_targets(base_url, chapters)
+
+        # Short warm-up so every worker has touched its mapped pages
+        asyncio.run(drive(base_url, paths, args.concurrency, 1.0))
+
+        results = multiprocessing.Queue()
+        clients = [
+            multiprocessing.Process(target=client_process,
+                                    args=(base_url, paths, args.concurrency, args.duration, results))
+            for _ in range(args.clients)
+        ]
+        start = time.perf_counter()
+        for client in clients:
+            client.start()
+        totals = [results.get() for _ in clients]
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - start
+
+        memory = memory_kb(worker_pids(server.pid))
+        completed = sum(c for c, _ in totals)
+        errors = sum(e for _, e in totals)
+        return completed / elapsed, errors, memory
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", default=f"1,2,4,{os.cpu_count()}",
+                        help="comma-separated worker counts (default: 1,2,4,<cpus>)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per round")
+    parser.add_argument("--clients", type=int, default=4, help="load-generating processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="open requests per client")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    counts = sorted({int(n) for n in args.workers.split(',') if n.strip()})
+
+    print(f"\n{'='*60}")
+    print("THROUGHPUT VS WORKERS")
+    print(f"{'='*60}")
+    print(f"  {args.clients} clients x {args.concurrency} concurrent requests, "
+          f"{args.duration:.0f}s per round, {os.cpu_count()} CPUs")
+    print(f"\n  {'workers':>7}  {'req/s':>10}  {'speedup':>7}  {'errors':>6}  {'RSS MB':>8}  {'PSS MB':>8}")
+
+    baseline = None
+    for workers in counts:
+        rate, errors, memory = run_round(workers, args)
+        baseline = baseline or rate
+        rss, pss = (f"{m / 1024:8.1f}" for m in memory) if memory else ("       -", "       -")
+        print(f"  {workers:>7}  {rate:>10,.0f}  {rate / baseline:>6.2f}x  {errors:>6}  {rss}  {pss}")
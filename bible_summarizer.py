@@ -10,6 +10,8 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import requests
 
+from corpus import NASB_PATTERN, load_corpus
+
 # LM Studio API endpoint
 LM_STUDIO_URL = "http://127.0.0.1:1234/v1/chat/completions"
 
@@ -112,14 +114,17 @@ def parse_bible_text(filepath: Path) -> dict:
     2. Headers like "Genesis Chapter 1" followed by text
     3. JSON with structure: {"books": [{"name": "Genesis", "chapters": [{"chapter": 1, "text": "..."}]}]}
     """
-    content = filepath.read_text(encoding='utf-8')
-    
     # Check if JSON
     if filepath.suffix.lower() == '.json':
-        return parse_json_bible(json.loads(content))
+        return parse_json_bible(json.loads(filepath.read_text(encoding='utf-8')))
+    
+    # NASB format: served from the shared corpus cache
+    corpus = load_corpus(filepath)
+    if len(corpus):
+        return corpus.chapter_texts()
     
-    # Parse text format
-    return parse_text_bible(content)
+    # Other plain text layouts
+    return parse_text_bible(filepath.read_text(encoding='utf-8'))
 
 
 def parse_json_bible(data: dict) -> dict:
@@ -154,8 +159,7 @@ def parse_text_bible(content: str) -> dict:
     current_text = []
     
     # Pattern for "Text -- book chapter:verse" format (NASB style)
-    # Book names can be: genesis, 1 samuel, 2 kings, song of solomon, etc.
-    nasb_pattern = re.compile(r'^(.+?)\s+--\s+(\d?\s?[a-zA-Z]+(?:\s+of\s+[a-zA-Z]+|\s+[a-zA-Z]+)?)\s+(\d+):(\d+)\s*$', re.IGNORECASE)
+    nasb_pattern = NASB_PATTERN
     # Pattern for "Book Chapter:Verse Text" format (standard)
     standard_pattern = re.compile(r'^(\d?\s?[A-Za-z]+)\s+(\d+):(\d+)\s+(.+)$')
     # Pattern for chapter headers
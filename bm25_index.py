@@ -0,0 +1,418 @@
+"""
+BM25 Verse and Chapter Ranking
+Ranks verses or chapters for one- or many-word queries with BM25, instead
+of the concordance's raw per-chapter counts (where long chapters win):
+
+    score(d) = sum over query terms t of
+               idf(t) * tf(t, d) * (k1 + 1) / (tf(t, d) + k1 * (1 - b + b * len(d) / avglen))
+
+Terms are the concordance's lemmas (same tokenizer, stopwords and minimum
+length), so "waters" and "water" score as one term. Everything query-time
+scoring needs is precomputed by build_concordance.py into concordance.rank:
+document lengths and their k1/b normalisation, each term's idf, and the
+postings with term frequencies for both levels.
+
+Top-k retrieval uses block-max bounds, as in Block-Max WAND: each term's
+postings are split into blocks of BLOCK postings with the highest score in
+each block stored, and documents are visited in id order with the k best
+so far in a min-heap. Whole runs of documents whose summed block maxima
+cannot beat the k-th best score are skipped with a binary search instead
+of being scored, which is what keeps very frequent terms cheap.
+
+Layout (little-endian, sections 4-byte aligned):
+    header           magic, version, k1, b, block size, counts, average lengths, blob sizes
+    chapters         JSON list of chapter keys
+    verse_chapter    u32[verses]
+    verse_numbers    u16[verses]
+    term_offsets     u32[terms + 1]      sorted lemma string table
+    form_offsets     u32[forms + 1]      sorted surface-form string table
+    form_terms       u32[forms]          term id of each surface form
+    then for verses, then chapters:
+    lengths          u32[docs]           tokens per document
+    norms            f32[docs]           k1 * (1 - b + b * length / avglen)
+    term_starts      u32[terms + 1]      first posting of each term
+    term_blocks      u32[terms + 1]      first block of each term
+    idf              f32[terms]
+    block_max        f64[blocks]         highest score in the block
+    posting_docs     u32[postings]       document ids, ascending per term
+    posting_tfs      u16[postings]
+    terms, forms     UTF-8 strings, concatenated
+
+Usage: python bm25_index.py [concordance.rank] [--level verse|chapter] [-k 10] [query ...]
+"""
+
+import heapq
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from concordance_postings import STOPWORDS
+from positional_index import TOKEN_PATTERN
+
+MAGIC = b"BCBM"
+VERSION = 1
+K1 = 1.2
+B = 0.75
+BLOCK = 64
+LEVELS = ("verse", "chapter")
+# magic, version, k1, b, block size, verses, chapters, terms, forms, verse and
+# chapter postings and blocks, verse and chapter average length, then
+# chapters/terms/forms bytes
+HEADER = struct.Struct("<4sIddIIIIIIIIIddIII")
+
+
+def _pad(n):
+    return (4 - n % 4) % 4
+
+
+def _little_endian(arr):
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def index_terms(text: str, lemmas: dict):
+    """(token count, [lemma of each indexed token]) with the concordance's filters."""
+    tokens = TOKEN_PATTERN.findall(text)
+    terms = []
+    for token in tokens:
+        if len(token) < 3:
+            continue
+        word = token.lower()
+        lemma = lemmas.get(word, word)
+        if lemma not in STOPWORDS and len(lemma) >= 3:
+            terms.append(lemma)
+    return len(tokens), terms
+
+
+def _idf(df: int, n_docs: int) -> float:
+    """BM25 idf, kept positive for terms in over half the documents."""
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+def _level_sections(doc_terms: list, term_ids: dict, k1: float, b: float, block: int):
+    """Lengths, norms and term postings (with idf and block maxima) for one level."""
+    lengths = array('I', (length for length, _ in doc_terms))
+    avg_length = sum(lengths) / max(1, len(lengths))
+    norms = array('f', (k1 * (1 - b + b * length / avg_length) for length in lengths))
+
+    postings = [[] for _ in term_ids]  # term id -> [(doc id, tf)]
+    for doc_id, (_, counts) in enumerate(doc_terms):
+        for term, tf in counts.items():
+            postings[term_ids[term]].append((doc_id, tf))
+
+    term_starts = array('I', [0])
+    term_blocks = array('I', [0])
+    idf = array('f')
+    block_max = array('d')
+    posting_docs = array('I')
+    posting_tfs = array('H')
+    for term_postings in postings:
+        idf.append(_idf(len(term_postings), len(lengths)))
+        idf_f32 = idf[-1]
+        for start in range(0, len(term_postings), block):
+            # Computed from the stored values exactly as queries score, and kept
+            # as doubles: bounds equal to a tied k-th score still allow a skip
+            block_max.append(max(
+                idf_f32 * tf * (k1 + 1) / (tf + norms[doc_id])
+                for doc_id, tf in term_postings[start:start + block]))
+        for doc_id, tf in term_postings:
+            posting_docs.append(doc_id)
+            posting_tfs.append(min(tf, 0xFFFF))
+        term_starts.append(len(posting_docs))
+        term_blocks.append(len(block_max))
+    return avg_length, [lengths, norms, term_starts, term_blocks, idf, block_max, posting_docs, posting_tfs]
+
+
+def write_bm25_index(chapters: dict, lemmas: dict, output_filepath="concordance.rank",
+                     k1=K1, b=B, block=BLOCK):
+    """
+    Write the ranking index for {chapter_key: {"verses": [{ref, text}]}} (as
+    build_concordance.parse_bible returns), with lemmas from the lemma table.
+    """
+    chapter_keys = list(chapters)
+    verse_chapter = array('I')
+    verse_numbers = array('H')
+    verse_terms = []    # (length, {lemma: tf}) per verse
+    chapter_terms = []  # (length, {lemma: tf}) per chapter
+    forms = {}
+
+    for chapter_id, chapter_key in enumerate(chapter_keys):
+        chapter_length = 0
+        chapter_counts = {}
+        for verse in chapters[chapter_key]["verses"]:
+            verse_chapter.append(chapter_id)
+            verse_numbers.append(int(verse["ref"].rsplit(':', 1)[1]))
+            length, terms = index_terms(verse["text"], lemmas)
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+                chapter_counts[term] = chapter_counts.get(term, 0) + 1
+            verse_terms.append((length, counts))
+            chapter_length += length
+            for token in TOKEN_PATTERN.findall(verse["text"]):
+                word = token.lower()
+                if word not in forms and len(word) >= 3:
+                    forms[word] = lemmas.get(word, word)
+        chapter_terms.append((chapter_length, chapter_counts))
+
+    terms = sorted({term for _, counts in chapter_terms for term in counts})
+    term_ids = {term: i for i, term in enumerate(terms)}
+    # Every lemma is also its own form, so lemmas can be queried directly
+    form_map = {word: term_ids[lemma] for word, lemma in forms.items() if lemma in term_ids}
+    form_map.update(term_ids)
+    form_list = sorted(form_map)
+
+    verse_avg, verse_sections = _level_sections(verse_terms, term_ids, k1, b, block)
+    chapter_avg, chapter_sections = _level_sections(chapter_terms, term_ids, k1, b, block)
+
+    def string_table(strings):
+        offsets = array('I', [0])
+        blob = bytearray()
+        for string in strings:
+            blob += string.encode('utf-8')
+            offsets.append(len(blob))
+        return offsets, bytes(blob)
+
+    term_offsets, term_blob = string_table(terms)
+    form_offsets, form_blob = string_table(form_list)
+    form_terms = array('I', (form_map[form] for form in form_list))
+    chapters_bytes = json.dumps(chapter_keys, ensure_ascii=False).encode('utf-8')
+
+    with open(output_filepath, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, k1, b, block, len(verse_chapter), len(chapter_keys), len(terms),
+                            len(form_list), len(verse_sections[6]), len(verse_sections[5]),
+                            len(chapter_sections[6]), len(chapter_sections[5]), verse_avg, chapter_avg,
+                            len(chapters_bytes), len(term_blob), len(form_blob)))
+        f.write(chapters_bytes + b"\0" * _pad(len(chapters_bytes)))
+        for arr in (verse_chapter, verse_numbers, term_offsets, form_offsets, form_terms,
+                    *verse_sections, *chapter_sections):
+            _little_endian(arr).tofile(f)
+            f.write(b"\0" * _pad(arr.itemsize * len(arr)))
+        f.write(term_blob + b"\0" * _pad(len(term_blob)))
+        f.write(form_blob)
+
+    print(f"Saved BM25 index to {output_filepath} ({len(terms):,} terms, "
+          f"{len(verse_sections[6]):,} verse and {len(chapter_sections[6]):,} chapter postings, "
+          f"{Path(output_filepath).stat().st_size / 1024 / 1024:.1f} MB)")
+
+
+class RankLevel:
+    """The verse or chapter half of a BM25Index."""
+
+    __slots__ = ("avg_length", "lengths", "norms", "term_starts", "term_blocks",
+                 "idf", "block_max", "posting_docs", "posting_tfs")
+
+    def __init__(self, avg_length, sections):
+        self.avg_length = avg_length
+        (self.lengths, self.norms, self.term_starts, self.term_blocks, self.idf,
+         self.block_max, self.posting_docs, self.posting_tfs) = sections
+
+    def __len__(self):
+        return len(self.lengths)
+
+
+class BM25Index:
+    """Read-only view over concordance.rank."""
+
+    def __init__(self, filepath="concordance.rank"):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+
+        (magic, version, self.k1, self.b, self.block, n_verses, n_chapters, n_terms, n_forms,
+         n_verse_postings, n_verse_blocks, n_chapter_postings, n_chapter_blocks,
+         verse_avg, chapter_avg, chapters_len, terms_len, forms_len) = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{filepath} is not a version {VERSION} BM25 index")
+
+        offset = HEADER.size
+
+        def blob(length):
+            nonlocal offset
+            view = buf[offset:offset + length]
+            offset += length + _pad(length)
+            return view
+
+        def section(fmt, count):
+            nonlocal offset
+            size = struct.calcsize(fmt) * count
+            view = buf[offset:offset + size]
+            offset += size + _pad(size)
+            if sys.byteorder == 'little':
+                return view.cast(fmt)
+            arr = array(fmt, view)
+            arr.byteswap()
+            return arr
+
+        def level(n_docs, n_postings, n_blocks, avg_length):
+            return RankLevel(avg_length, [
+                section('I', n_docs), section('f', n_docs), section('I', n_terms + 1),
+                section('I', n_terms + 1), section('f', n_terms), section('d', n_blocks),
+                section('I', n_postings), section('H', n_postings)])
+
+        self.chapters = json.loads(bytes(blob(chapters_len)))
+        self.verse_chapter = section('I', n_verses)
+        self.verse_numbers = section('H', n_verses)
+        self.term_offsets = section('I', n_terms + 1)
+        self.form_offsets = section('I', n_forms + 1)
+        self.form_terms = section('I', n_forms)
+        self.levels = {
+            "verse": level(n_verses, n_verse_postings, n_verse_blocks, verse_avg),
+            "chapter": level(n_chapters, n_chapter_postings, n_chapter_blocks, chapter_avg),
+        }
+        self.terms = blob(terms_len)
+        self.forms = blob(forms_len)
+        self._len = n_terms
+        self._n_forms = n_forms
+
+    def __len__(self):
+        return self._len
+
+    def term(self, i: int) -> str:
+        return str(self.terms[self.term_offsets[i]:self.term_offsets[i + 1]], 'utf-8')
+
+    def _form(self, i: int) -> bytes:
+        return bytes(self.forms[self.form_offsets[i]:self.form_offsets[i + 1]])
+
+    def find(self, word: str) -> int:
+        """Term id of a word (any surface form of the lemma, or the lemma), or -1."""
+        target = word.lower().encode('utf-8')
+        lo, hi = 0, self._n_forms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._form(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n_forms and self._form(lo) == target:
+            return self.form_terms[lo]
+        return -1
+
+    def query_terms(self, query: str) -> list[int]:
+        """Distinct term ids of a query's words, in query order (unknown words dropped)."""
+        term_ids = []
+        for token in TOKEN_PATTERN.findall(query):
+            term_id = self.find(token)
+            if term_id >= 0 and term_id not in term_ids:
+                term_ids.append(term_id)
+        return term_ids
+
+    def top_k(self, term_ids: list[int], level="verse", k=10) -> list[tuple[int, float]]:
+        """
+        The k best (doc id, score) for the terms, best first (ties by doc id).
+        Docs are visited in id order, one window at a time: a window ends
+        where the first of the terms' current blocks ends, so each term has
+        at most one block in it and the sum of those block maxima bounds
+        every score in the window. Windows whose bound cannot beat the
+        heap's k-th score are skipped unscored.
+        """
+        rank = self.levels[level]
+        docs, tfs, norms = rank.posting_docs, rank.posting_tfs, rank.norms
+        block_max = rank.block_max
+        k1_plus_1 = self.k1 + 1
+        block = self.block
+
+        # cursor: [posting, end posting, idf, first posting, first block], in query order
+        cursors = [[rank.term_starts[t], rank.term_starts[t + 1], rank.idf[t],
+                    rank.term_starts[t], rank.term_blocks[t]]
+                   for t in term_ids if rank.term_starts[t] < rank.term_starts[t + 1]]
+
+        heap = []  # (score, -doc): the root is the k-th best
+        threshold = -1.0
+        while cursors:
+            # Window [.., window_end): up to the end of the earliest-ending current block
+            block_ends = [min(c[3] + ((c[0] - c[3]) // block + 1) * block, c[1]) for c in cursors]
+            window_end = min(docs[end - 1] for end in block_ends) + 1
+            bound = 0.0
+            for cursor in cursors:
+                if docs[cursor[0]] < window_end:
+                    bound += block_max[cursor[4] + (cursor[0] - cursor[3]) // block]
+
+            if bound <= threshold:
+                # Later docs lose ties, so nothing here can enter the top k
+                for cursor, block_end in zip(cursors, block_ends):
+                    cursor[0] = bisect_left(docs, window_end, cursor[0], block_end)
+            else:
+                scores = {}
+                for cursor, block_end in zip(cursors, block_ends):
+                    stop = bisect_left(docs, window_end, cursor[0], block_end)
+                    idf = cursor[2]
+                    if not scores:
+                        scores = {doc: idf * tf * k1_plus_1 / (tf + norms[doc])
+                                  for doc, tf in zip(docs[cursor[0]:stop], tfs[cursor[0]:stop])}
+                    else:
+                        for doc, tf in zip(docs[cursor[0]:stop], tfs[cursor[0]:stop]):
+                            scores[doc] = scores.get(doc, 0.0) + idf * tf * k1_plus_1 / (tf + norms[doc])
+                    cursor[0] = stop
+                for doc, score in scores.items():
+                    if len(heap) < k:
+                        heapq.heappush(heap, (score, -doc))
+                        if len(heap) == k:
+                            threshold = heap[0][0]
+                    elif score >= threshold and (score, -doc) > heap[0]:
+                        heapq.heapreplace(heap, (score, -doc))
+                        threshold = heap[0][0]
+            cursors = [c for c in cursors if c[0] < c[1]]
+
+        return [(-negative_doc, score) for score, negative_doc in sorted(heap, reverse=True)]
+
+    def search(self, query: str, level="verse", k=10) -> tuple[list[str], list[tuple[int, float]]]:
+        """Rank a query string; returns (lemmas used, [(doc id, score)])."""
+        if level not in LEVELS:
+            raise ValueError(f"Unknown level: {level}")
+        term_ids = self.query_terms(query)
+        return [self.term(t) for t in term_ids], self.top_k(term_ids, level, k)
+
+    def results(self, ranked, level="verse", positional=None) -> list[dict]:
+        """Result entries for (doc id, score) pairs; verse texts come from a PositionalIndex."""
+        if level == "chapter":
+            return [{"chapter": self.chapters[doc], "score": round(score, 4)} for doc, score in ranked]
+        results = []
+        for doc, score in ranked:
+            result = {
+                "ref": f"{self.chapters[self.verse_chapter[doc]]}:{self.verse_numbers[doc]}",
+                "chapter": self.chapters[self.verse_chapter[doc]],
+                "verse": self.verse_numbers[doc],
+                "score": round(score, 4),
+            }
+            if positional is not None:
+                result["text"] = positional.verse_text(doc)
+            results.append(result)
+        return results
+
+
+def open_bm25_index(filepath="concordance.rank"):
+    """Open the index if it has been built, otherwise None."""
+    if not Path(filepath).exists():
+        return None
+    index = BM25Index(filepath)
+    print(f"Mapped BM25 index {filepath} ({len(index):,} terms)")
+    return index
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Rank verses or chapters with BM25")
+    parser.add_argument("index", nargs="?", default="concordance.rank")
+    parser.add_argument("queries", nargs="*")
+    parser.add_argument("--level", choices=LEVELS, default="verse")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    index = BM25Index(args.index)
+    for query in args.queries or ["living water", "covenant blood", "lord", "faith hope love"]:
+        start = time.perf_counter()
+        lemmas, ranked = index.search(query, args.level, args.k)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        print(f"\n{query}  ({', '.join(lemmas)}; {elapsed_us:.0f} us)")
+        for result in index.results(ranked, args.level):
+            print(f"  {result['score']:8.3f}  {result.get('ref', result['chapter'])}")
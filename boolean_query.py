@@ -0,0 +1,364 @@
+"""
+Boolean Concordance Queries
+Evaluates AND / OR / NOT expressions over the verse postings in
+concordance.pos, at verse or chapter level:
+
+    covenant AND blood NOT egypt
+    (moses OR aaron) AND pharaoh
+    shepherd sheep              (adjacent words are ANDed)
+
+NOT binds tightest, then AND, then OR; "a NOT b" means a AND NOT b. A query
+word matches all its surface forms with the same lemma (the lemma groups
+build_concordance.py stores in concordance.pos), as concordance lookups do.
+
+Each set of ids is handled in whichever form suits its size:
+    sparse   a sorted id array, intersected by galloping search (exponential
+             probe, then binary search) from the smallest list outwards
+    dense    a bitset (Python int) for sets covering more than
+             1/DENSE_FRACTION of all verses/chapters, such as "lord" and
+             "israel"; combined with C-speed &, |, ~, and probed through a
+             byte bitmap when a sparse list is filtered through them
+The choice is made per operation, for terms and intermediate results alike.
+A bitset over ~31,000 verses is under 4 KB, so & costs about as much as one
+step of a Python loop over ids; hence the low density threshold.
+
+Usage: python boolean_query.py [concordance.pos] [--level verse|chapter] [query ...]
+"""
+
+import bisect
+import re
+from array import array
+from functools import lru_cache
+
+from positional_index import PositionalIndex
+
+DENSE_FRACTION = 256
+TOKEN = re.compile(r'\(|\)|[A-Za-z]+')
+OPERATORS = {"AND", "OR", "NOT"}
+LEVELS = ("verse", "chapter")
+BYTE_BITS = [tuple(offset for offset in range(8) if value >> offset & 1) for value in range(256)]
+NONZERO_BYTES = bytes([0] + [1] * 255)
+
+
+class Postings:
+    """
+    A set of ids, as a sorted array (sparse) and/or an int bitset (dense).
+    The dense form of a sparse set is built on first use and kept, so
+    cached term postings pay for it once.
+    """
+
+    __slots__ = ("ids", "bits", "count", "universe", "_bitmap")
+
+    def __init__(self, universe, ids=None, bits=None, count=None):
+        self.universe = universe
+        self.ids = ids
+        self.bits = bits
+        self.count = len(ids) if ids is not None else (count if count is not None else bits.bit_count())
+        self._bitmap = None
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def is_dense(self):
+        """Frequent enough that bitset operations beat walking the ids."""
+        return self.count * DENSE_FRACTION > self.universe
+
+    def dense_bits(self) -> int:
+        if self.bits is None:
+            # Set bits in a bytearray, then convert once (|= on a big int copies it each time)
+            bitmap = bytearray((self.universe + 7) // 8)
+            for i in self.ids:
+                bitmap[i >> 3] |= 1 << (i & 7)
+            self.bits = int.from_bytes(bitmap, 'little')
+            self._bitmap = bytes(bitmap)
+        return self.bits
+
+    def to_ids(self, limit=None):
+        """The ids in order (only the first limit of them, if given)."""
+        if self.ids is not None:
+            return self.ids if limit is None else self.ids[:limit]
+        # Decode byte by byte: to_bytes and find are C loops, and only
+        # non-zero bytes reach Python (bin() and per-bit shifts cost far more)
+        data = self.bits.to_bytes((self.universe + 7) // 8, 'little')
+        find = data.translate(NONZERO_BYTES).find
+        ids = array('I')
+        extend = ids.extend
+        wanted = self.count if limit is None else min(limit, self.count)
+        j = find(1)
+        while len(ids) < wanted:
+            extend(map((j * 8).__add__, BYTE_BITS[data[j]]))
+            j = find(1, j + 1)
+        if limit is None:
+            self.ids = ids
+        else:
+            del ids[limit:]
+        return ids
+
+    def contains_check(self):
+        """An O(1) membership test (testing bits of a big int would copy it per probe)."""
+        if self._bitmap is None:
+            self._bitmap = self.dense_bits().to_bytes((self.universe + 7) // 8, 'little')
+        bitmap = self._bitmap
+        return lambda i: bitmap[i >> 3] >> (i & 7) & 1
+
+
+def gallop(ids, target, lo):
+    """First index >= lo with ids[index] >= target: exponential probe, then bisect."""
+    n = len(ids)
+    step = 1
+    hi = lo
+    while hi < n and ids[hi] < target:
+        lo = hi + 1
+        hi += step
+        step *= 2
+    return bisect.bisect_left(ids, target, lo, min(hi + 1, n))
+
+
+def intersect_sorted(small, large):
+    """Sorted intersection, galloping through the larger list."""
+    result = array('I')
+    position = 0
+    n = len(large)
+    for i in small:
+        position = gallop(large, i, position)
+        if position == n:
+            break
+        if large[position] == i:
+            result.append(i)
+    return result
+
+
+def difference_sorted(ids, exclude):
+    result = array('I')
+    position = 0
+    n = len(exclude)
+    for i in ids:
+        position = gallop(exclude, i, position)
+        if position == n or exclude[position] != i:
+            result.append(i)
+    return result
+
+
+def union_sorted(lists):
+    return array('I', sorted(set().union(*lists)))
+
+
+def evaluate_and(positives: list, negatives: list, universe: int, strategy="auto") -> Postings:
+    """
+    Intersect positives, minus negatives. When even the smallest positive is
+    dense, everything combines as bitsets; otherwise the smallest list is
+    filtered through the others, galloping through sparse lists and probing
+    dense ones. strategy "sparse" or "bits" forces one path (for benchmarks).
+    """
+    if not positives:
+        positives = [Postings(universe, bits=(1 << universe) - 1, count=universe)]
+    positives = sorted(positives, key=len)
+
+    if strategy == "bits" or (strategy == "auto" and positives[0].is_dense):
+        bits = positives[0].dense_bits()
+        for postings in positives[1:]:
+            bits &= postings.dense_bits()
+        for postings in negatives:
+            bits &= ~postings.dense_bits()
+        return Postings(universe, bits=bits)
+
+    ids = positives[0].to_ids()
+    for postings in positives[1:]:
+        if not ids:
+            break
+        if strategy == "auto" and postings.is_dense:
+            contains = postings.contains_check()
+            ids = array('I', [i for i in ids if contains(i)])
+        else:
+            ids = intersect_sorted(ids, postings.to_ids())
+    for postings in negatives:
+        if not ids:
+            break
+        if strategy == "auto" and postings.is_dense:
+            contains = postings.contains_check()
+            ids = array('I', [i for i in ids if not contains(i)])
+        else:
+            ids = difference_sorted(ids, postings.to_ids())
+    return Postings(universe, ids=ids)
+
+
+def evaluate_or(operands: list, universe: int, strategy="auto") -> Postings:
+    if strategy == "bits" or (strategy == "auto" and any(p.is_dense for p in operands)):
+        bits = 0
+        for postings in operands:
+            bits |= postings.dense_bits()
+        return Postings(universe, bits=bits)
+    return Postings(universe, ids=union_sorted([p.to_ids() for p in operands]))
+
+
+@lru_cache(maxsize=1024)
+def parse_boolean(query: str):
+    """
+    Parse into a tree of ("term", word), ("and", [(node, negated), ...])
+    and ("or", [node, ...]). Raises ValueError on malformed queries.
+    Trees are cached, so callers must not modify them.
+    """
+    tokens = TOKEN.findall(query)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        operands = [parse_and()]
+        while peek() == "OR":
+            take()
+            operands.append(parse_and())
+        return operands[0] if len(operands) == 1 else ("or", operands)
+
+    def parse_and():
+        operands = []
+        while True:
+            token = peek()
+            if token is None or token in (")", "OR"):
+                break
+            if token == "AND":
+                take()
+                continue
+            negated = False
+            while peek() == "NOT":
+                take()
+                negated = not negated
+            operands.append((parse_primary(), negated))
+        if not operands:
+            raise ValueError(f"Expected a term in: {query}")
+        if len(operands) == 1 and not operands[0][1]:
+            return operands[0][0]
+        return ("and", operands)
+
+    def parse_primary():
+        token = peek()
+        if token is None or token in OPERATORS or token == ")":
+            raise ValueError(f"Expected a term in: {query}")
+        take()
+        if token == "(":
+            node = parse_or()
+            if peek() != ")":
+                raise ValueError(f"Unbalanced parentheses in: {query}")
+            take()
+            return node
+        return ("term", token.lower())
+
+    tree = parse_or()
+    if position != len(tokens):
+        raise ValueError(f"Unexpected '{tokens[position]}' in: {query}")
+    return tree
+
+
+class BooleanIndex:
+    """
+    Boolean queries over a PositionalIndex, matching every form in a query
+    word's lemma group. Term postings are cached per level after their first
+    use. strategy is "auto", or "sparse" / "bits" to force one
+    representation (benchmarks).
+    """
+
+    def __init__(self, positional: PositionalIndex, strategy="auto"):
+        self.positional = positional
+        self.strategy = strategy
+        self.universe = {"verse": positional.verse_count, "chapter": len(positional.chapters)}
+        self._cache = {}
+
+    def term_postings(self, word: str, level="verse") -> Postings:
+        """All verses (or chapters) containing any form of word's lemma."""
+        group = self.positional.lemma_group(word)
+        key = (level, group)
+        postings = self._cache.get(key)
+        if postings is not None:
+            return postings
+
+        verses = self.positional.posting_verses
+        starts = self.positional.term_starts
+        ranges = [(starts[term], starts[term + 1]) for term in self.positional.group_terms(group)]
+        ranges = [(first, last) for first, last in ranges if last > first]
+        if len(ranges) == 1:
+            ids = array('I', verses[ranges[0][0]:ranges[0][1]])
+        else:
+            ids = union_sorted([verses[first:last] for first, last in ranges])
+
+        if level == "chapter":
+            # Verse ids are in corpus order, so chapter ids come out sorted
+            verse_chapter = self.positional.verse_chapter
+            chapters = array('I')
+            for verse_id in ids:
+                chapter_id = verse_chapter[verse_id]
+                if not chapters or chapters[-1] != chapter_id:
+                    chapters.append(chapter_id)
+            ids = chapters
+
+        postings = Postings(self.universe[level], ids=ids)
+        self._cache[key] = postings
+        return postings
+
+    def evaluate(self, tree, level="verse") -> Postings:
+        kind = tree[0]
+        universe = self.universe[level]
+        if kind == "term":
+            return self.term_postings(tree[1], level)
+        if kind == "or":
+            return evaluate_or([self.evaluate(node, level) for node in tree[1]], universe, self.strategy)
+        positives = [self.evaluate(node, level) for node, negated in tree[1] if not negated]
+        negatives = [self.evaluate(node, level) for node, negated in tree[1] if negated]
+        return evaluate_and(positives, negatives, universe, self.strategy)
+
+    def query(self, query: str, level="verse") -> Postings:
+        """The set of verses (or chapters) matching a boolean query."""
+        if level not in LEVELS:
+            raise ValueError(f"Unknown level: {level}")
+        return self.evaluate(parse_boolean(query), level)
+
+    def search(self, query: str, level="verse", limit=None) -> array:
+        """Sorted verse (or chapter) ids matching a boolean query."""
+        return self.query(query, level).to_ids(limit)
+
+    def describe(self, ids, level="verse") -> list[dict]:
+        """Result entries for verse or chapter ids, as /api/search reports verses."""
+        positional = self.positional
+        if level == "chapter":
+            return [{"chapter": positional.chapters[i]} for i in ids]
+        return [{
+            "ref": positional.verse_ref(i),
+            "chapter": positional.chapters[positional.verse_chapter[i]],
+            "verse": positional.verse_numbers[i],
+            "text": positional.verse_text(i),
+        } for i in ids]
+
+
+def open_boolean_index(positional):
+    """A BooleanIndex over an opened positional index (None if there is none)."""
+    if positional is None:
+        return None
+    return BooleanIndex(positional)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Run boolean concordance queries")
+    parser.add_argument("index", nargs="?", default="concordance.pos")
+    parser.add_argument("queries", nargs="*")
+    parser.add_argument("--level", choices=LEVELS, default="verse")
+    args = parser.parse_args()
+
+    engine = open_boolean_index(PositionalIndex(args.index))
+    for query in args.queries or ["covenant AND blood NOT egypt", "(moses OR aaron) AND pharaoh",
+                                  "lord AND israel", "shepherd sheep NOT wolf"]:
+        engine.query(query, args.level)  # warm the term cache
+        start = time.perf_counter()
+        matches = engine.query(query, args.level)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        print(f"\n{query}  ({len(matches)} {args.level}s, {elapsed_us:.1f} us)")
+        for result in engine.describe(matches.to_ids(3), args.level):
+            print(f"  {result.get('ref', result['chapter'])}")
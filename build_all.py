@@ -0,0 +1,278 @@
+"""
+Incremental Build Driver
+Runs the build scripts as a stage graph and only re-runs a stage when the
+content of its inputs has changed since its last successful run:
+
+    nasb.txt + summaries    -> chapters     (chapters.json, chapters.bin)
+    nasb.txt + summaries    -> concordance  (concordance.json, .idx, .bin, .pos, .rank, .vocab)
+    concordance.json        -> entities     (entities.json)
+    concordance + entities  -> spelling     (concordance.spell)
+    summaries               -> network      (network_data.json, network.bin)
+
+A stage's inputs are every file it reads, including the scripts and
+modules it runs, so editing build_network.py rebuilds the network just like
+editing the summaries does. A stage that reads another stage's output must
+name that stage in `after` (checked before every build). The caches the
+scripts keep for themselves (nasb.corpus, lemma_table.json,
+network_chains.cache) are not inputs: each records what it was made from
+and discards itself when that changes. Stages whose dependencies are satisfied run in parallel, each in its
+own process. State is kept in .build_state.json: the input hash of each
+stage's last successful run, plus a (size, mtime) -> sha256 cache of every
+file hashed, so an up-to-date tree is checked without re-reading anything.
+
+Usage: python build_all.py [stage ...] [--force] [--dry-run] [--jobs N]
+    stage       build only these stages (and whatever they depend on)
+    --force     rebuild the selected stages even if up to date
+    --dry-run   show what would run
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+STATE_FILE = ROOT / ".build_state.json"
+STATE_VERSION = 1
+
+
+class Stage:
+    def __init__(self, name, commands, inputs, outputs, after=()):
+        self.name = name
+        self.commands = commands  # argv lists, run in order from ROOT
+        self.inputs = inputs      # data files and the code that reads them
+        self.outputs = outputs
+        self.after = after        # stages that produce some of the inputs
+
+
+STAGES = [
+    Stage("chapters",
+          [["build_chapters.py"]],
+          inputs=["nasb.txt", "bible_summaries.json", "build_chapters.py",
+                  "corpus.py", "chapter_store.py", "static_artifacts.py"],
+          outputs=["chapters.json", "chapters.bin"]),
+    Stage("concordance",
+          [["build_concordance.py"]],
+          inputs=["nasb.txt", "bible_summaries.json", "build_concordance.py", "bm25_index.py",
+                  "corpus.py", "concordance_binary.py", "concordance_postings.py",
+                  "concordance_store.py", "concordance_vocab.py", "lemma_table.py",
+                  "positional_index.py", "static_artifacts.py"],
+          outputs=["concordance.json", "concordance.idx", "concordance.bin", "concordance.pos",
+                   "concordance.rank", "concordance.vocab"]),
+    Stage("entities",
+          [["build_entities_complete.py"], ["static_artifacts.py", "entities.json"]],
+          inputs=["concordance.json", "build_entities_complete.py", "static_artifacts.py"],
+          outputs=["entities.json"],
+          after=("concordance",)),
+    Stage("spelling",
+          [["build_spelling.py"]],
+          inputs=["concordance.json", "entities.json", "build_spelling.py", "concordance_spelling.py"],
+          outputs=["concordance.spell"],
+          after=("concordance", "entities")),
+    Stage("network",
+          [["build_network.py"]],
+          inputs=["bible_summaries.json", "build_network.py", "network_index.py", "static_artifacts.py"],
+          outputs=["network_data.json", "network.bin"]),
+]
+
+
+def check_stages(stages=STAGES):
+    """Every input another stage produces must come from a stage listed in `after`."""
+    producers = {output: stage.name for stage in stages for output in stage.outputs}
+    names = {stage.name for stage in stages}
+    for stage in stages:
+        for dep in stage.after:
+            if dep not in names:
+                raise SystemExit(f"Stage {stage.name} runs after unknown stage {dep}")
+        for name in stage.inputs:
+            producer = producers.get(name)
+            if producer is not None and producer != stage.name and producer not in stage.after:
+                raise SystemExit(f"Stage {stage.name} reads {name} from {producer}, "
+                                 f"but does not run after it")
+
+
+def load_state() -> dict:
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"version": STATE_VERSION, "files": {}, "stages": {}}
+
+
+def save_state(state: dict):
+    tmp_path = STATE_FILE.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def file_digest(name: str, state: dict):
+    """sha256 of a file, reusing the cached value while its size and mtime are unchanged."""
+    try:
+        stat = (ROOT / name).stat()
+    except FileNotFoundError:
+        return None
+    cached = state["files"].get(name)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(ROOT / name, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    state["files"][name] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+    return digest.hexdigest()
+
+
+def stage_key(stage: Stage, state: dict):
+    """Hash of everything that determines the stage's outputs; None if an input is missing."""
+    digest = hashlib.sha256(json.dumps([stage.name, stage.commands]).encode('utf-8'))
+    for name in sorted(stage.inputs):
+        file_hash = file_digest(name, state)
+        if file_hash is None:
+            return None
+        digest.update(f"{name}\0{file_hash}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def outputs_intact(stage: Stage, state: dict) -> bool:
+    """True if every output still has the content the last run produced."""
+    recorded = state["stages"].get(stage.name, {}).get("outputs", {})
+    return all(name in recorded and file_digest(name, state) == recorded[name]
+               for name in stage.outputs)
+
+
+def select_stages(names) -> list:
+    """The named stages plus everything they depend on, in definition order."""
+    by_name = {stage.name: stage for stage in STAGES}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise SystemExit(f"Unknown stage(s): {', '.join(unknown)} "
+                         f"(choose from {', '.join(by_name)})")
+    if not names:
+        return list(STAGES)
+
+    wanted = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(by_name[name].after)
+    return [stage for stage in STAGES if stage.name in wanted]
+
+
+def run_stage(stage: Stage):
+    """Run a stage's commands in child processes; returns (ok, seconds, output)."""
+    start = time.perf_counter()
+    output = []
+    for command in stage.commands:
+        result = subprocess.run([sys.executable, *command], cwd=ROOT,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, encoding='utf-8', errors='replace')
+        output.append(result.stdout)
+        if result.returncode != 0:
+            output.append(f"{' '.join(command)} exited with status {result.returncode}\n")
+            return False, time.perf_counter() - start, "".join(output)
+    return True, time.perf_counter() - start, "".join(output)
+
+
+def print_output(name: str, output: str):
+    for line in output.rstrip().splitlines():
+        print(f"  [{name}] {line}")
+
+
+def build(stage_names=(), force=False, dry_run=False, jobs=None) -> bool:
+    check_stages()
+    start = time.perf_counter()
+    state = load_state()
+    stages = select_stages(stage_names)
+    waiting = {stage.name: set(stage.after) for stage in stages}
+    by_name = {stage.name: stage for stage in stages}
+    done, failed, ran = set(), set(), []
+    stale = set()  # dry run: stages that would run, so their dependents would too
+
+    def blocked(name):
+        return any(dep in failed for dep in by_name[name].after)
+
+    with ThreadPoolExecutor(max_workers=jobs or len(stages)) as pool:
+        running = {}
+        while waiting or running:
+            ready = [name for name, deps in waiting.items() if deps <= done or blocked(name)]
+            for name in ready:
+                del waiting[name]
+                stage = by_name[name]
+                if blocked(name):
+                    print(f"  {name}: skipped (dependency failed)")
+                    failed.add(name)
+                    continue
+
+                key = stage_key(stage, state)
+                if key is None:
+                    missing = [n for n in stage.inputs if not (ROOT / n).exists()]
+                    print(f"  {name}: cannot build, missing {', '.join(missing)}")
+                    failed.add(name)
+                    continue
+                up_to_date = (state["stages"].get(name, {}).get("key") == key
+                              and outputs_intact(stage, state))
+                if up_to_date and not force and not stale & set(stage.after):
+                    print(f"  {name}: up to date")
+                    done.add(name)
+                    continue
+                if dry_run:
+                    print(f"  {name}: would run {' && '.join(' '.join(c) for c in stage.commands)}")
+                    stale.add(name)
+                    done.add(name)
+                    continue
+
+                print(f"  {name}: running...")
+                running[pool.submit(run_stage, stage)] = (stage, key)
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, key = running.pop(future)
+                ok, seconds, output = future.result()
+                print_output(stage.name, output)
+                if not ok:
+                    print(f"  {stage.name}: FAILED after {seconds:.1f}s")
+                    failed.add(stage.name)
+                    continue
+                state["stages"][stage.name] = {
+                    "key": key,
+                    "outputs": {name: file_digest(name, state) for name in stage.outputs},
+                    "seconds": round(seconds, 2),
+                }
+                save_state(state)
+                print(f"  {stage.name}: built in {seconds:.1f}s")
+                done.add(stage.name)
+                ran.append(stage.name)
+
+    if not dry_run:
+        save_state(state)
+    if dry_run:
+        ran = sorted(stale)
+    verb = "would rebuild" if dry_run else "rebuilt"
+    summary = f"{verb} {', '.join(ran)}" if ran else "nothing to do"
+    print(f"\n{summary} ({time.perf_counter() - start:.2f}s)"
+          + (f"; failed: {', '.join(sorted(failed))}" if failed else ""))
+    return not failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the data files whose inputs changed")
+    parser.add_argument("stages", nargs="*", help=f"subset of: {', '.join(s.name for s in STAGES)}")
+    parser.add_argument("--force", action="store_true", help="rebuild even if up to date")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would run")
+    parser.add_argument("--jobs", type=int, default=None, help="max stages at once (default: all)")
+    args = parser.parse_args()
+    sys.exit(0 if build(args.stages, args.force, args.dry_run, args.jobs) else 1)
@@ -4,9 +4,11 @@ Exports full chapter text organized for easy navigation.
 """
 
 import json
-import re
 from pathlib import Path
-from collections import defaultdict
+
+from chapter_store import write_chapter_store
+from corpus import load_corpus
+from static_artifacts import compress_artifact
 
 # Bible book order for navigation
 BIBLE_ORDER = [
@@ -28,43 +30,22 @@ BIBLE_ORDER = [
 
 
 def parse_bible(filepath):
-    """Parse NASB Bible into chapters with verses."""
-    print(f"Reading {filepath}...")
-    content = Path(filepath).read_text(encoding='utf-8')
-    
-    # Pattern: "Text -- book chapter:verse"
-    pattern = re.compile(
-        r'^(.+?)\s+--\s+(\d?\s?[a-zA-Z]+(?:\s+of\s+[a-zA-Z]+|\s+[a-zA-Z]+)?)\s+(\d+):(\d+)\s*$',
-        re.IGNORECASE
-    )
-    
-    chapters = defaultdict(lambda: {"book": "", "chapter": 0, "verses": []})
-    
-    for line in content.split('\n'):
-        line = line.strip()
-        if not line or line == '.':
-            continue
-        
-        match = pattern.match(line)
-        if match:
-            text, book, chapter, verse = match.groups()
-            book = book.strip().title()
-            chapter_num = int(chapter)
-            verse_num = int(verse)
-            chapter_key = f"{book} {chapter}"
-            
-            chapters[chapter_key]["book"] = book
-            chapters[chapter_key]["chapter"] = chapter_num
-            chapters[chapter_key]["verses"].append({
-                "verse": verse_num,
-                "text": text
-            })
-    
-    return dict(chapters)
+    """Load the Bible (via the shared corpus cache) into chapters with verses."""
+    corpus = load_corpus(filepath)
+    chapters = {}
+    for chapter_key, indexes in corpus.chapter_verses().items():
+        first = indexes[0]
+        chapters[chapter_key] = {
+            "book": corpus.books[corpus.book_ids[first]],
+            "chapter": corpus.chapters[first],
+            "verses": [{"verse": corpus.verses[i], "text": corpus.verse_text(i)} for i in indexes]
+        }
+    return chapters
 
 
-def build_chapters_json(bible_filepath, summaries_filepath, output_filepath="chapters.json"):
-    """Build the chapters JSON with navigation info."""
+def build_chapters_json(bible_filepath, summaries_filepath, output_filepath="chapters.json",
+                        store_filepath="chapters.bin"):
+    """Build the chapters JSON with navigation info, plus the binary chapter store."""
     
     print("Loading Bible text...")
     chapters = parse_bible(bible_filepath)
@@ -113,6 +94,12 @@ def build_chapters_json(bible_filepath, summaries_filepath, output_filepath="cha
     
     file_size = Path(output_filepath).stat().st_size
     print(f"\nDone! {len(all_chapters)} chapters saved ({file_size / 1024 / 1024:.2f} MB)")
+    
+    # Precompressed variants for the server
+    compress_artifact(output_filepath)
+    
+    # Binary store the server mmaps for per-chapter lookups
+    write_chapter_store(all_chapters, summaries, store_filepath)
 
 
 if __name__ == "__main__":
@@ -121,5 +108,6 @@ if __name__ == "__main__":
     bible_file = sys.argv[1] if len(sys.argv) > 1 else "nasb.txt"
     summaries_file = sys.argv[2] if len(sys.argv) > 2 else "bible_summaries.json"
     output_file = sys.argv[3] if len(sys.argv) > 3 else "chapters.json"
+    store_file = sys.argv[4] if len(sys.argv) > 4 else "chapters.bin"
     
-    build_chapters_json(bible_file, summaries_file, output_file)
+    build_chapters_json(bible_file, summaries_file, output_file, store_file)
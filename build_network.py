@@ -13,15 +13,37 @@ Example: "Warning signs of false prophets everywhere"
 Uses spaCy NLP for part-of-speech tagging and dependency parsing.
 """
 
+import hashlib
+import inspect
 import json
+import os
 import re
 from collections import defaultdict
+from importlib import metadata
 from pathlib import Path
-import spacy
 
-# Load spaCy model
-print("Loading spaCy model...")
-nlp = spacy.load("en_core_web_sm")
+from network_index import write_network_index
+from static_artifacts import compress_artifact
+
+SPACY_MODEL = "en_core_web_sm"
+# Chains only need tags, lemmas and dependencies; NER is never loaded
+SPACY_EXCLUDE = ["ner"]
+CHAIN_CACHE_FILE = Path("network_chains.cache")
+
+# Below this many summaries to parse, worker start-up costs more than it saves
+MIN_TEXTS_PER_PROCESS = 2000
+
+# spaCy is loaded on first use, so a rebuild served from the chain cache never loads it
+nlp = None
+
+
+def load_nlp():
+    global nlp
+    if nlp is None:
+        print("Loading spaCy model...")
+        import spacy
+        nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+    return nlp
 
 # Known Biblical proper nouns (helps with recognition)
 BIBLICAL_ENTITIES = {
@@ -52,11 +74,27 @@ def extract_semantic_chain(summary: str) -> list[dict]:
     """
     Extract a semantic chain from a summary using NLP.
     Returns list of {word, role} where role is 'subject', 'verb', 'object', or 'modifier'
+    """
+    return chain_from_doc(load_nlp()(summary))
+
+
+def extract_semantic_chains(summaries: list, batch_size=64, n_process=None) -> list:
+    """
+    Chains for many summaries, streamed through nlp.pipe in batches. By
+    default worker processes are only used when there are enough texts.
+    """
+    if n_process is None:
+        n_process = min(os.cpu_count() or 1, max(1, len(summaries) // MIN_TEXTS_PER_PROCESS))
+    docs = load_nlp().pipe(summaries, batch_size=batch_size, n_process=n_process)
+    return [chain_from_doc(doc) for doc in docs]
+
+
+def chain_from_doc(doc) -> list[dict]:
+    """
+    The semantic chain of one parsed summary.
     
     All words are individual nodes - no compound possessives.
     """
-    doc = nlp(summary)
-    
     chain = []
     seen_words = set()
     
@@ -131,9 +169,78 @@ def extract_semantic_chain(summary: str) -> list[dict]:
     return chain
 
 
-def build_semantic_network(summaries: dict) -> tuple[list, list]:
+def package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "missing"
+
+
+def chain_fingerprint() -> str:
+    """
+    Everything besides the summary text that decides its chain: the spaCy
+    and model versions, the entity/subject word lists and the extraction code.
     """
-    Build the semantic network.
+    parts = [
+        f"spacy {package_version('spacy')}",
+        f"{SPACY_MODEL} {package_version(SPACY_MODEL)}",
+        " ".join(sorted(BIBLICAL_ENTITIES)),
+        " ".join(sorted(SUBJECT_WORDS)),
+        inspect.getsource(chain_from_doc),
+    ]
+    return hashlib.sha256("\0".join(parts).encode('utf-8')).hexdigest()
+
+
+class ChainCache:
+    """
+    Extracted chains persisted across builds, keyed by a hash of the summary
+    text and chain_fingerprint(). Saving keeps only the entries used by the
+    current build, so edited summaries don't accumulate.
+    """
+
+    def __init__(self, filepath=CHAIN_CACHE_FILE):
+        self.filepath = Path(filepath)
+        self.fingerprint = chain_fingerprint()
+        self.chains = {}
+        self.used = {}
+        self.hits = 0
+        self.misses = 0
+        try:
+            with open(self.filepath, 'r', encoding='utf-8') as f:
+                self.chains = json.load(f)["chains"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def key(self, summary: str) -> str:
+        return hashlib.sha256(f"{self.fingerprint}\0{summary}".encode('utf-8')).hexdigest()
+
+    def get(self, summary: str):
+        key = self.key(summary)
+        chain = self.chains.get(key)
+        if chain is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.used[key] = chain
+        return chain
+
+    def put(self, summary: str, chain: list):
+        key = self.key(summary)
+        self.chains[key] = self.used[key] = chain
+
+    def save(self):
+        tmp_path = self.filepath.with_name(self.filepath.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"fingerprint": self.fingerprint, "chains": self.used}, f)
+        os.replace(tmp_path, self.filepath)
+
+
+def build_semantic_network(summaries: dict, chain_cache: ChainCache = None,
+                           batch_size=64, n_process=None) -> tuple[list, list]:
+    """
+    Build the semantic network. Summaries are parsed in batches (see
+    extract_semantic_chains); with a chain_cache, only summaries without a
+    cached chain are parsed.
     
     Returns (nodes, links) where:
     - nodes: {id, type, role, count, chapters}
@@ -152,12 +259,21 @@ def build_semantic_network(summaries: dict) -> tuple[list, list]:
     
     print("Analyzing summaries with NLP...")
     
-    for i, (chapter, summary) in enumerate(summaries.items()):
-        if (i + 1) % 100 == 0:
-            print(f"  Processed {i + 1}/{len(summaries)} chapters...")
-        
-        # Extract semantic chain
-        chain = extract_semantic_chain(summary)
+    # Extract semantic chains: cached ones first, the rest in one batched pass
+    chains = {}
+    for summary in summaries.values():
+        if summary not in chains:
+            chains[summary] = chain_cache.get(summary) if chain_cache else None
+    to_parse = [summary for summary, chain in chains.items() if chain is None]
+    if to_parse:
+        print(f"  Parsing {len(to_parse)} summaries...")
+        for summary, chain in zip(to_parse, extract_semantic_chains(to_parse, batch_size, n_process)):
+            chains[summary] = chain
+            if chain_cache:
+                chain_cache.put(summary, chain)
+    
+    for chapter, summary in summaries.items():
+        chain = chains[summary]
         
         if not chain:
             continue
@@ -191,6 +307,8 @@ def build_semantic_network(summaries: dict) -> tuple[list, list]:
             links[(chain[-1]['word'], chapter)] += 1
     
     print(f"  Processed all {len(summaries)} chapters.")
+    if chain_cache:
+        print(f"  Chain cache: {chain_cache.hits} reused, {chain_cache.misses} parsed")
     
     # Build final node list
     nodes = []
@@ -224,7 +342,7 @@ def build_semantic_network(summaries: dict) -> tuple[list, list]:
     return nodes, links_list
 
 
-def main():
+def main(batch_size=64, n_process=None):
     input_file = Path("bible_summaries.json")
     output_file = Path("network_data.json")
     
@@ -237,7 +355,9 @@ def main():
         summaries = json.load(f)
     
     print(f"Processing {len(summaries)} chapters with semantic analysis...")
-    nodes, links = build_semantic_network(summaries)
+    chain_cache = ChainCache()
+    nodes, links = build_semantic_network(summaries, chain_cache, batch_size, n_process)
+    chain_cache.save()
     
     # Separate by type
     word_nodes = [n for n in nodes if n['type'] == 'word']
@@ -291,7 +411,18 @@ def main():
         json.dump(network, f)
     
     print(f"\nNetwork data saved to: {output_file}")
+    
+    # Precompressed variants and the mmap'd path index for the server
+    compress_artifact(output_file)
+    write_network_index(nodes, links, "network.bin")
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Build network_data.json from the chapter summaries")
+    parser.add_argument("--batch-size", type=int, default=64, help="summaries per nlp.pipe batch")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="spaCy worker processes (default: by input size)")
+    args = parser.parse_args()
+    main(args.batch_size, args.processes)
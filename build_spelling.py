@@ -0,0 +1,31 @@
+"""
+Build the Concordance Spelling Index
+Writes concordance.spell (see concordance_spelling.py) from the concordance
+vocabulary in concordance.json plus the people and places in entities.json,
+so it runs after both the concordance and the entities stages.
+"""
+
+import json
+import sys
+
+from concordance_spelling import write_spelling_index
+
+
+def build_spelling(concordance_filepath="concordance.json", entities_filepath="entities.json",
+                   output_filepath="concordance.spell"):
+    """Build the spelling index from the concordance's word -> chapter counts and the entities."""
+    print(f"Loading {concordance_filepath}...")
+    with open(concordance_filepath, 'r', encoding='utf-8') as f:
+        concordance = json.load(f)["concordance"]
+    counts = {word: len(entries) for word, entries in concordance.items()}
+    print(f"  {len(counts):,} concordance words")
+
+    write_spelling_index(counts, output_filepath, entities_filepath)
+
+
+if __name__ == "__main__":
+    concordance_file = sys.argv[1] if len(sys.argv) > 1 else "concordance.json"
+    entities_file = sys.argv[2] if len(sys.argv) > 2 else "entities.json"
+    output_file = sys.argv[3] if len(sys.argv) > 3 else "concordance.spell"
+
+    build_spelling(concordance_file, entities_file, output_file)
@@ -0,0 +1,231 @@
+"""
+Memory-mapped Binary Chapter Store
+build_chapters.py writes chapters.bin alongside chapters.json so the
+server can return one chapter (or a verse range) by slicing a mmap'd
+buffer instead of loading and parsing the whole JSON file.
+
+Layout (little-endian, sections 4-byte aligned):
+    header          magic, version, chapter count, verse count, section sizes
+    meta            small JSON table: chapter keys, book, chapter number, summary
+    chapter_first   u32[chapters + 1]  index of each chapter's first verse
+    verse_offsets   u32[verses + 1]    byte offset of each verse in the text blob
+    verse_numbers   u16[verses]        verse number within its chapter
+    text            UTF-8 verse texts, each followed by "\\n"
+
+Because verses are stored in order and newline-separated, any verse range
+of a chapter is one contiguous slice of the text blob.
+
+If chapters.bin is missing or older than chapters.json, open_chapter_store
+encodes chapters.json into the same layout in memory instead, so the
+server never serves text from a store that predates the JSON.
+"""
+
+import bisect
+import io
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+MAGIC = b"BCHS"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIII")  # magic, version, chapters, verses, meta bytes, text bytes
+
+
+def _pad(n):
+    return (4 - n % 4) % 4
+
+
+def _little_endian(arr):
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def write_chapter_store(ordered_chapters: list, summaries: dict, output_filepath="chapters.bin"):
+    """
+    Write the store from build_chapters' ordered [(chapter_key, chapter_data)]
+    list, where chapter_data has "book", "chapter" and "verses".
+    """
+    with open(output_filepath, 'wb') as f:
+        n_chapters, n_verses = _write_store(ordered_chapters, summaries, f)
+
+    print(f"Saved binary chapter store to {output_filepath} "
+          f"({n_chapters} chapters, {n_verses} verses)")
+
+
+def _write_store(ordered_chapters: list, summaries: dict, f):
+    meta = {"chapters": []}
+    chapter_first = array('I', [0])
+    verse_offsets = array('I', [0])
+    verse_numbers = array('H')
+    text = bytearray()
+
+    for chapter_key, chapter_data in ordered_chapters:
+        meta["chapters"].append([
+            chapter_key,
+            chapter_data["book"],
+            chapter_data["chapter"],
+            summaries.get(chapter_key, "")
+        ])
+        for verse in chapter_data["verses"]:
+            text += verse["text"].encode('utf-8') + b"\n"
+            verse_offsets.append(len(text))
+            verse_numbers.append(verse["verse"])
+        chapter_first.append(len(verse_numbers))
+
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+    f.write(HEADER.pack(MAGIC, VERSION, len(meta["chapters"]), len(verse_numbers),
+                        len(meta_bytes), len(text)))
+    f.write(meta_bytes + b"\0" * _pad(len(meta_bytes)))
+    f.write(_little_endian(chapter_first).tobytes())
+    f.write(_little_endian(verse_offsets).tobytes())
+    f.write(_little_endian(verse_numbers).tobytes())
+    f.write(b"\0" * _pad(verse_numbers.itemsize * len(verse_numbers)))
+    f.write(text)
+    return len(meta["chapters"]), len(verse_numbers)
+
+
+class ChapterStore:
+    """
+    Read-only view over chapters.bin. Lookups slice the mapped file (or, for
+    the chapters.json fallback, the same layout built in memory).
+    """
+
+    def __init__(self, filepath="chapters.bin", data: bytes = None):
+        self.filepath = filepath
+        if data is None:
+            self._file = open(filepath, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            buf = memoryview(self._mmap)
+        else:
+            self._file = self._mmap = None
+            buf = memoryview(data)
+
+        magic, version, n_chapters, n_verses, meta_len, text_len = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{filepath} is not a version {VERSION} chapter store")
+
+        offset = HEADER.size
+        meta = json.loads(bytes(buf[offset:offset + meta_len]))
+        offset += meta_len + _pad(meta_len)
+
+        def section(fmt, count):
+            nonlocal offset
+            size = struct.calcsize(fmt) * count
+            view = buf[offset:offset + size]
+            offset += size
+            if sys.byteorder == 'little':
+                return view.cast(fmt)
+            # Big-endian hosts get a swapped copy instead of a view
+            arr = array(fmt, view)
+            arr.byteswap()
+            return arr
+
+        self.chapter_first = section('I', n_chapters + 1)
+        self.verse_offsets = section('I', n_verses + 1)
+        self.verse_numbers = section('H', n_verses)
+        offset += _pad(2 * n_verses)
+        self.text = buf[offset:offset + text_len]
+
+        self.order = [row[0] for row in meta["chapters"]]
+        self.meta = meta["chapters"]
+        self.index = {key: i for i, key in enumerate(self.order)}
+
+    def __contains__(self, chapter_key):
+        return chapter_key in self.index
+
+    def __len__(self):
+        return len(self.order)
+
+    def close(self):
+        # Views must be released before the mmap can close
+        for name in ("chapter_first", "verse_offsets", "verse_numbers", "text"):
+            view = getattr(self, name)
+            if isinstance(view, memoryview):
+                view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+
+    def info(self, chapter_key: str) -> dict:
+        """Navigation info for a chapter (no verse text)."""
+        i = self.index[chapter_key]
+        _, book, chapter, summary = self.meta[i]
+        return {
+            "book": book,
+            "chapter": chapter,
+            "summary": summary,
+            "prev": self.order[i - 1] if i > 0 else None,
+            "next": self.order[i + 1] if i < len(self.order) - 1 else None
+        }
+
+    def verse_span(self, chapter_key: str, start=None, end=None) -> tuple[int, int]:
+        """Verse index range [first, last) for verse numbers start..end (inclusive)."""
+        i = self.index[chapter_key]
+        first, last = self.chapter_first[i], self.chapter_first[i + 1]
+        numbers = self.verse_numbers
+        if start is not None:
+            first = bisect.bisect_left(numbers, start, first, last)
+        if end is not None:
+            last = bisect.bisect_right(numbers, end, first, last)
+        return first, last
+
+    def text_slice(self, first: int, last: int) -> memoryview:
+        """Newline-separated UTF-8 text of verses [first, last), without copying."""
+        if first >= last:
+            return self.text[0:0]
+        return self.text[self.verse_offsets[first]:self.verse_offsets[last] - 1]
+
+    def verses(self, chapter_key: str, start=None, end=None) -> list[dict]:
+        """Verses of a chapter as [{verse, text}], optionally limited to start..end."""
+        first, last = self.verse_span(chapter_key, start, end)
+        offsets = self.verse_offsets
+        return [
+            {
+                "verse": self.verse_numbers[i],
+                "text": str(self.text[offsets[i]:offsets[i + 1] - 1], 'utf-8')
+            }
+            for i in range(first, last)
+        ]
+
+    def chapter(self, chapter_key: str) -> dict:
+        """A chapter in the same shape as chapters.json's "chapters" entries."""
+        chapter = self.info(chapter_key)
+        chapter["verses"] = self.verses(chapter_key)
+        return chapter
+
+
+def load_chapters_json(source="chapters.json") -> ChapterStore:
+    """A ChapterStore built in memory from chapters.json (private to the process)."""
+    with open(source, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    ordered = [(key, data["chapters"][key]) for key in data["order"]]
+    summaries = {key: chapter.get("summary", "") for key, chapter in ordered}
+    buffer = io.BytesIO()
+    _write_store(ordered, summaries, buffer)
+    return ChapterStore(source, buffer.getvalue())
+
+
+def open_chapter_store(filepath="chapters.bin", source="chapters.json"):
+    """
+    Map the store if it exists and is not older than source; otherwise fall
+    back to loading source, or None if neither has been built.
+    """
+    path, source_path = Path(filepath), Path(source)
+    if path.exists():
+        if not source_path.exists() or source_path.stat().st_mtime_ns <= path.stat().st_mtime_ns:
+            store = ChapterStore(filepath)
+            print(f"Mapped chapter store {filepath} ({len(store)} chapters)")
+            return store
+        print(f"{filepath} is older than {source} - ignoring it (rerun build_chapters.py)")
+
+    if not source_path.exists():
+        print(f"Chapter store not found at {filepath} - run build_chapters.py first")
+        return None
+    store = load_chapters_json(source)
+    print(f"Loaded {len(store)} chapters from {source}")
+    return store
@@ -0,0 +1,434 @@
+"""
+Compact Binary Concordance
+A packed alternative to concordance.json (concordance.bin). The JSON
+repeats the chapter key, the 5-word summary, a ref string and a snippet in
+every (word, chapter) entry; here chapters and verses are interned once and
+each entry shrinks to a few varint-encoded bytes:
+
+    verse id     delta from the previous entry's verse id (ids follow corpus
+                 order, so a word's entries sorted by verse give small deltas)
+    count        occurrences of the word in the chapter
+    snippet      start and length of the snippet within the verse text, which
+                 is stored once; "..." markers follow from the span. Snippets
+                 that aren't a span of a known verse are stored literally.
+
+Entries are stored in verse order and put back into concordance.json's
+order (most occurrences first, ties in chapter order) when read. A word
+whose JSON order differs from that rule is stored as-is, with zigzag deltas.
+
+Layout (little-endian, sections 4-byte aligned):
+    header          magic, version, counts and section sizes
+    meta            concordance meta JSON
+    chapters        JSON [[chapter key, summary], ...]   (the summary table)
+    verse_chapter   u32[verses]       chapter id of each verse
+    verse_numbers   u16[verses]
+    text_offsets    u32[verses + 1]   byte offset of each verse in the text blob
+    word_offsets    u32[words + 1]    sorted vocabulary string table
+    counts          u32[words]        chapter count per word
+    post_offsets    u32[words + 1]    byte offset of each word's postings
+    words           UTF-8 words, concatenated
+    texts           UTF-8 verse texts, concatenated
+    postings        per word: order flag, then varint entries
+
+The reader maps the file and decodes only the looked-up word's postings.
+
+Usage: python concordance_binary.py [concordance.json] [nasb.txt] [concordance.bin]
+       (writes the binary file and reports size and load time against the JSON)
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+MAGIC = b"BCCB"
+VERSION = 1
+# magic, version, words, chapters, verses, then meta, chapters, words, texts, postings bytes
+HEADER = struct.Struct("<4sIIIIIIIII")
+
+SORTED_BY_VERSE = 0
+STORED_ORDER = 1
+
+
+def _pad(n):
+    return (4 - n % 4) % 4
+
+
+def _little_endian(arr):
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def _write_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(buf, pos: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+def make_snippet(text: str, start: int, end: int) -> str:
+    """The snippet build_concordance's extract_snippet gives for text[start:end]."""
+    return ("..." if start > 0 else "") + text[start:end] + ("..." if end < len(text) else "")
+
+
+def find_snippet_span(text: str, snippet: str):
+    """(start, end) with make_snippet(text, start, end) == snippet, or None."""
+    candidates = [(snippet, False, False)]
+    if snippet.startswith("..."):
+        candidates.append((snippet[3:], True, False))
+    if snippet.endswith("..."):
+        candidates.append((snippet[:-3], False, True))
+        if snippet.startswith("...") and len(snippet) >= 6:
+            candidates.append((snippet[3:-3], True, True))
+
+    for core, leading, trailing in candidates:
+        start = text.find(core)
+        while start != -1:
+            end = start + len(core)
+            if (start > 0) == leading and (end < len(text)) == trailing:
+                return start, end
+            start = text.find(core, start + 1)
+    return None
+
+
+def _entry_order(entries, verse_ids):
+    """Indexes of entries sorted by verse, then (stably) by count descending."""
+    by_verse = sorted(range(len(entries)), key=lambda i: verse_ids[i])
+    return sorted(by_verse, key=lambda i: -entries[i]["count"]), by_verse
+
+
+def write_concordance_binary(data: dict, output_filepath="concordance.bin",
+                             verse_texts: dict = None, chapter_order: list = None):
+    """
+    Write the binary file from the dict written by build_concordance().
+    verse_texts maps refs to verse text so snippets can be stored as spans;
+    chapter_order (corpus order) fixes chapter ids, otherwise chapters are
+    numbered in order of first appearance.
+    """
+    concordance = data["concordance"]
+    verse_texts = verse_texts or {}
+
+    # Intern chapters (with their summaries) and the verses entries point at
+    chapter_ids = {key: i for i, key in enumerate(chapter_order or [])}
+    summaries = {}
+    verse_keys = set()
+    for entries in concordance.values():
+        for entry in entries:
+            chapter = entry["chapter"]
+            if chapter not in chapter_ids:
+                chapter_ids[chapter] = len(chapter_ids)
+            summaries.setdefault(chapter, entry["summary"])
+            # ref is always "<chapter>:<verse>" so only the verse is kept
+            verse_keys.add((chapter_ids[chapter], int(entry["ref"].rsplit(':', 1)[1])))
+
+    chapters = sorted(chapter_ids, key=chapter_ids.get)
+    verses = sorted(verse_keys)
+    verse_ids = {key: i for i, key in enumerate(verses)}
+
+    verse_chapter = array('I')
+    verse_numbers = array('H')
+    text_offsets = array('I', [0])
+    texts = bytearray()
+    for chapter_id, verse in verses:
+        verse_chapter.append(chapter_id)
+        verse_numbers.append(verse)
+        texts += verse_texts.get(f"{chapters[chapter_id]}:{verse}", "").encode('utf-8')
+        text_offsets.append(len(texts))
+
+    words = sorted(concordance)
+    word_offsets = array('I', [0])
+    counts = array('I')
+    post_offsets = array('I', [0])
+    word_blob = bytearray()
+    postings = bytearray()
+    literal_snippets = 0
+
+    for word in words:
+        entries = concordance[word]
+        ids = [verse_ids[(chapter_ids[e["chapter"]], int(e["ref"].rsplit(':', 1)[1]))] for e in entries]
+        json_order = list(range(len(entries)))
+        read_order, by_verse = _entry_order(entries, ids)
+        if read_order == json_order:
+            _write_varint(postings, SORTED_BY_VERSE)
+            order = by_verse
+        else:
+            _write_varint(postings, STORED_ORDER)
+            order = json_order
+
+        previous = 0
+        for i in order:
+            entry = entries[i]
+            delta = ids[i] - previous
+            _write_varint(postings, delta if order is by_verse else _zigzag(delta))
+            previous = ids[i]
+            _write_varint(postings, entry["count"])
+
+            text = verse_texts.get(entry["ref"])
+            span = find_snippet_span(text, entry["snippet"]) if text is not None else None
+            if span:
+                _write_varint(postings, span[0] + 1)
+                _write_varint(postings, span[1] - span[0])
+            else:
+                snippet = entry["snippet"].encode('utf-8')
+                _write_varint(postings, 0)
+                _write_varint(postings, len(snippet))
+                postings += snippet
+                literal_snippets += 1
+
+        word_blob += word.encode('utf-8')
+        word_offsets.append(len(word_blob))
+        counts.append(len(entries))
+        post_offsets.append(len(postings))
+
+    meta_bytes = json.dumps(data.get("meta", {}), ensure_ascii=False).encode('utf-8')
+    chapters_bytes = json.dumps([[key, summaries.get(key, "")] for key in chapters],
+                                ensure_ascii=False).encode('utf-8')
+
+    with open(output_filepath, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(words), len(chapters), len(verses),
+                            len(meta_bytes), len(chapters_bytes), len(word_blob),
+                            len(texts), len(postings)))
+        f.write(meta_bytes + b"\0" * _pad(len(meta_bytes)))
+        f.write(chapters_bytes + b"\0" * _pad(len(chapters_bytes)))
+        _little_endian(verse_chapter).tofile(f)
+        _little_endian(verse_numbers).tofile(f)
+        f.write(b"\0" * _pad(2 * len(verses)))
+        for arr in (text_offsets, word_offsets, counts, post_offsets):
+            _little_endian(arr).tofile(f)
+        f.write(word_blob + b"\0" * _pad(len(word_blob)))
+        f.write(texts + b"\0" * _pad(len(texts)))
+        f.write(postings)
+
+    print(f"Saved binary concordance to {output_filepath} ({len(words):,} words, "
+          f"{Path(output_filepath).stat().st_size / 1024 / 1024:.2f} MB"
+          + (f", {literal_snippets:,} literal snippets" if literal_snippets else "") + ")")
+
+
+class ConcordanceBinary:
+    """
+    Read-only view over concordance.bin with the same lookups as
+    ConcordanceIndex; only the requested word's postings are decoded.
+    """
+
+    def __init__(self, filepath="concordance.bin"):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+
+        (magic, version, n_words, n_chapters, n_verses, meta_len, chapters_len,
+         words_len, texts_len, postings_len) = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{filepath} is not a version {VERSION} binary concordance")
+
+        offset = HEADER.size
+
+        def blob(length):
+            nonlocal offset
+            view = buf[offset:offset + length]
+            offset += length + _pad(length)
+            return view
+
+        def section(fmt, count):
+            nonlocal offset
+            size = struct.calcsize(fmt) * count
+            view = buf[offset:offset + size]
+            offset += size + _pad(size)
+            if sys.byteorder == 'little':
+                return view.cast(fmt)
+            arr = array(fmt, view)
+            arr.byteswap()
+            return arr
+
+        self.meta = json.loads(bytes(blob(meta_len)))
+        chapter_table = json.loads(bytes(blob(chapters_len)))
+        self.chapters = [key for key, _ in chapter_table]
+        self.summaries = [summary for _, summary in chapter_table]
+        self.verse_chapter = section('I', n_verses)
+        self.verse_numbers = section('H', n_verses)
+        self.text_offsets = section('I', n_verses + 1)
+        self.word_offsets = section('I', n_words + 1)
+        self.counts = section('I', n_words)
+        self.post_offsets = section('I', n_words + 1)
+        self.words = blob(words_len)
+        self.texts = blob(texts_len)
+        self.postings = blob(postings_len)
+        self._len = n_words
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, word):
+        return self.find(word) >= 0
+
+    def close(self):
+        for name in ("verse_chapter", "verse_numbers", "text_offsets", "word_offsets",
+                     "counts", "post_offsets", "words", "texts", "postings"):
+            view = getattr(self, name)
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def word(self, i: int) -> bytes:
+        return bytes(self.words[self.word_offsets[i]:self.word_offsets[i + 1]])
+
+    def find(self, word: str) -> int:
+        """Position of word in the sorted vocabulary, or -1."""
+        target = word.encode('utf-8')
+        lo, hi = 0, self._len
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._len and self.word(lo) == target:
+            return lo
+        return -1
+
+    def chapter_count(self, word: str) -> int:
+        i = self.find(word)
+        return self.counts[i] if i >= 0 else 0
+
+    def word_counts(self) -> dict:
+        """Map every indexed word to its chapter count."""
+        return {str(self.word(i), 'utf-8'): self.counts[i] for i in range(self._len)}
+
+    def verse_text(self, verse_id: int) -> str:
+        return str(self.texts[self.text_offsets[verse_id]:self.text_offsets[verse_id + 1]], 'utf-8')
+
+    def index_json(self) -> bytes:
+        """The /api/concordance body: meta plus every word's chapter count."""
+        return json.dumps({"meta": self.meta, "counts": self.word_counts()}).encode('utf-8')
+
+    def lookup_json(self, word: str):
+        """The /api/concordance/<word> body, or None if the word is not indexed."""
+        if word not in self:
+            return None
+        return json.dumps({"word": word, "entries": self.lookup(word)}).encode('utf-8')
+
+    def lookup(self, word: str) -> list[dict]:
+        """Entries for one word in concordance.json's shape (empty if not indexed)."""
+        i = self.find(word)
+        if i < 0:
+            return []
+        buf = self.postings
+        pos = self.post_offsets[i]
+        order, pos = _read_varint(buf, pos)
+
+        entries = []
+        verse_id = 0
+        for _ in range(self.counts[i]):
+            delta, pos = _read_varint(buf, pos)
+            verse_id += delta if order == SORTED_BY_VERSE else _unzigzag(delta)
+            count, pos = _read_varint(buf, pos)
+            start, pos = _read_varint(buf, pos)
+            length, pos = _read_varint(buf, pos)
+            if start:
+                text = self.verse_text(verse_id)
+                snippet = make_snippet(text, start - 1, start - 1 + length)
+            else:
+                snippet = str(buf[pos:pos + length], 'utf-8')
+                pos += length
+
+            chapter_id = self.verse_chapter[verse_id]
+            chapter = self.chapters[chapter_id]
+            entries.append({
+                "chapter": chapter,
+                "summary": self.summaries[chapter_id],
+                "ref": f"{chapter}:{self.verse_numbers[verse_id]}",
+                "snippet": snippet,
+                "count": count
+            })
+
+        if order == SORTED_BY_VERSE:
+            entries.sort(key=lambda e: -e["count"])
+        return entries
+
+
+def open_concordance_binary(filepath="concordance.bin"):
+    """Open the binary concordance if it has been built, otherwise None."""
+    if not Path(filepath).exists():
+        return None
+    return ConcordanceBinary(filepath)
+
+
+if __name__ == "__main__":
+    import gzip
+    import random
+    import time
+
+    from corpus import load_corpus
+
+    source_file = sys.argv[1] if len(sys.argv) > 1 else "concordance.json"
+    bible_file = sys.argv[2] if len(sys.argv) > 2 else "nasb.txt"
+    output_file = sys.argv[3] if len(sys.argv) > 3 else "concordance.bin"
+
+    start = time.perf_counter()
+    with open(source_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    json_load = time.perf_counter() - start
+
+    verse_texts, chapter_order = None, None
+    if Path(bible_file).exists():
+        corpus = load_corpus(bible_file)
+        verse_texts = {f"{corpus.chapter_key(i)}:{corpus.verses[i]}": corpus.verse_text(i)
+                       for i in range(len(corpus))}
+        chapter_order = list(corpus.chapter_verses())
+    else:
+        print(f"{bible_file} not found - snippets are stored literally")
+    write_concordance_binary(data, output_file, verse_texts, chapter_order)
+
+    start = time.perf_counter()
+    binary = ConcordanceBinary(output_file)
+    binary_open = time.perf_counter() - start
+
+    words = list(data["concordance"])
+    for word in words:
+        if binary.lookup(word) != data["concordance"][word]:
+            raise SystemExit(f"Round trip mismatch for '{word}'")
+
+    sample = random.Random(1).sample(words, min(1000, len(words)))
+    start = time.perf_counter()
+    for word in sample:
+        binary.lookup(word)
+    lookup_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+    json_size = Path(source_file).stat().st_size
+    binary_bytes = Path(output_file).read_bytes()
+    json_gzip = len(gzip.compress(Path(source_file).read_bytes(), 6))
+    binary_gzip = len(gzip.compress(binary_bytes, 6))
+
+    print(f"\n  {'':<22} {'JSON':>12} {'binary':>12} {'reduction':>10}")
+    print(f"  {'size':<22} {json_size / 1024:10,.0f}KB {len(binary_bytes) / 1024:10,.0f}KB "
+          f"{json_size / len(binary_bytes):9.1f}x")
+    print(f"  {'size (gzip)':<22} {json_gzip / 1024:10,.0f}KB {binary_gzip / 1024:10,.0f}KB "
+          f"{json_gzip / binary_gzip:9.1f}x")
+    print(f"  {'load':<22} {json_load * 1000:10,.1f}ms {binary_open * 1000:10,.2f}ms "
+          f"{json_load / binary_open:9.0f}x")
+    print(f"  {'lookup (avg word)':<22} {'':>12} {lookup_us:10,.1f}us")
+    print(f"\n  All {len(words):,} words round-trip exactly")
@@ -0,0 +1,109 @@
+"""
+In-memory Concordance Index for the Server
+Loads the output of build_concordance.py once and keeps it as a compact
+inverted index, so a single word's entries can be served without the
+browser downloading the whole concordance.json.
+
+Chapter keys and summaries are interned into shared tables; each posting
+only stores a chapter id, verse number, count and snippet.
+"""
+
+import json
+from pathlib import Path
+
+
+class ConcordanceIndex:
+    """Inverted index: word -> postings of (chapter_id, verse, count, snippet)."""
+
+    def __init__(self, meta: dict, chapters: list, summaries: list, postings: dict):
+        self.meta = meta
+        self.chapters = chapters      # chapter_id -> chapter key
+        self.summaries = summaries    # chapter_id -> 5-word summary
+        self.postings = postings      # word -> tuple of postings
+
+    @classmethod
+    def from_concordance(cls, data: dict) -> "ConcordanceIndex":
+        """Build the index from the dict written by build_concordance()."""
+        chapter_ids = {}
+        chapters = []
+        summaries = []
+        postings = {}
+
+        for word, entries in data["concordance"].items():
+            word_postings = []
+            for entry in entries:
+                chapter = entry["chapter"]
+                chapter_id = chapter_ids.get(chapter)
+                if chapter_id is None:
+                    chapter_id = len(chapters)
+                    chapter_ids[chapter] = chapter_id
+                    chapters.append(chapter)
+                    summaries.append(entry["summary"])
+
+                # ref is always "<chapter>:<verse>" so only the verse is kept
+                verse = int(entry["ref"].rsplit(':', 1)[1])
+                word_postings.append((chapter_id, verse, entry["count"], entry["snippet"]))
+
+            postings[word] = tuple(word_postings)
+
+        return cls(data.get("meta", {}), chapters, summaries, postings)
+
+    @classmethod
+    def load(cls, filepath="concordance.json") -> "ConcordanceIndex":
+        """Load concordance.json and convert it to the compact index."""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls.from_concordance(data)
+
+    def __contains__(self, word):
+        return word in self.postings
+
+    def __len__(self):
+        return len(self.postings)
+
+    def chapter_count(self, word: str) -> int:
+        """Number of chapters containing the word (0 if not indexed)."""
+        return len(self.postings.get(word, ()))
+
+    def word_counts(self) -> dict:
+        """Map every indexed word to its chapter count."""
+        return {word: len(entries) for word, entries in self.postings.items()}
+
+    def index_json(self) -> bytes:
+        """The /api/concordance body: meta plus every word's chapter count."""
+        return json.dumps({"meta": self.meta, "counts": self.word_counts()}).encode('utf-8')
+
+    def lookup_json(self, word: str):
+        """The /api/concordance/<word> body, or None if the word is not indexed."""
+        if word not in self.postings:
+            return None
+        return json.dumps({"word": word, "entries": self.lookup(word)}).encode('utf-8')
+
+    def lookup(self, word: str) -> list[dict]:
+        """
+        Return the entries for one word in the same shape as concordance.json
+        (most occurrences first), or an empty list if the word is not indexed.
+        """
+        entries = []
+        for chapter_id, verse, count, snippet in self.postings.get(word, ()):
+            chapter = self.chapters[chapter_id]
+            entries.append({
+                "chapter": chapter,
+                "summary": self.summaries[chapter_id],
+                "ref": f"{chapter}:{verse}",
+                "snippet": snippet,
+                "count": count
+            })
+        return entries
+
+
+def load_concordance_index(filepath="concordance.json"):
+    """Load the index if the concordance has been built, otherwise None."""
+    if not Path(filepath).exists():
+        print(f"Concordance not found at {filepath} - run build_concordance.py first")
+        return None
+
+    print(f"Loading concordance index from {filepath}...")
+    index = ConcordanceIndex.load(filepath)
+    print(f"  Indexed {len(index):,} words across {len(index.chapters):,} chapters")
+    return index
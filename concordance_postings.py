@@ -0,0 +1,233 @@
+"""
+Parallel Concordance Postings
+Builds the concordance's word -> chapter entries in parallel: the corpus is
+split into per-book partitions, each worker process indexes its books into
+partial postings, and the partials are k-way merged into the final index.
+
+Words are lemmatized once, up front, by build_concordance.py; workers only
+get the finished word -> lemma map, so this module never imports spaCy and
+starting a worker stays cheap on every platform.
+
+The merged result is identical to indexing every verse in one loop: entry
+order, word order (first occurrence in the Bible) and the stable sort by
+count all come out the same.
+"""
+
+import gc
+import heapq
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+WORD_PATTERN = re.compile(r'\b[a-zA-Z]+\b')
+
+# Common stopwords to exclude
+STOPWORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of',
+    'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been', 'be', 'have',
+    'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may',
+    'might', 'must', 'shall', 'can', 'need', 'dare', 'ought', 'used', 'it', 'its',
+    'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'we', 'they', 'me',
+    'him', 'her', 'us', 'them', 'my', 'your', 'his', 'our', 'their', 'mine',
+    'yours', 'hers', 'ours', 'theirs', 'who', 'whom', 'which', 'what', 'whose',
+    'where', 'when', 'why', 'how', 'all', 'each', 'every', 'both', 'few', 'more',
+    'most', 'other', 'some', 'any', 'no', 'not', 'only', 'own', 'same', 'so',
+    'than', 'too', 'very', 's', 't', 'just', 'don', 'now', 'then', 'there', 'here',
+    'also', 'into', 'out', 'up', 'down', 'over', 'under', 'again', 'further',
+    'once', 'if', 'because', 'until', 'while', 'about', 'against', 'between',
+    'through', 'during', 'before', 'after', 'above', 'below', 'such', 'being',
+    'say', 'said', 'tell', 'told', 'go', 'went', 'come', 'came', 'let', 'make',
+    'made', 'take', 'took', 'give', 'gave', 'get', 'got', 'put', 'see', 'saw',
+    'know', 'knew', 'think', 'thought', 'look', 'looked', 'want', 'wanted',
+    'way', 'day', 'man', 'thing', 'time', 'year', 'people', 'son', 'sons'
+}
+
+# Set in each worker by _init_worker, so the lemma map is sent once per process
+_lemmas = {}
+
+
+def extract_snippet(verse_text, word, lemmas, context_chars=60):
+    """Extract a snippet around the word occurrence."""
+    word_lower = word.lower()
+    text_lower = verse_text.lower()
+
+    # Find the word
+    idx = text_lower.find(word_lower)
+    if idx == -1:
+        # Try finding any form
+        for w in re.findall(r'\b\w+\b', verse_text):
+            if lemmas.get(w.lower(), w.lower()) == word_lower:
+                idx = text_lower.find(w.lower())
+                break
+
+    if idx == -1:
+        # Word not found - return beginning of text
+        return verse_text[:context_chars * 2] + "..." if len(verse_text) > context_chars * 2 else verse_text
+
+    # Extract context around word
+    start = max(0, idx - context_chars)
+    end = min(len(verse_text), idx + len(word) + context_chars)
+
+    snippet = verse_text[start:end]
+
+    # Add ellipsis if truncated
+    if start > 0:
+        snippet = "..." + snippet
+    if end < len(verse_text):
+        snippet = snippet + "..."
+
+    return snippet
+
+
+def partition_by_book(chapters: dict) -> list:
+    """
+    Split {chapter_key: chapter_data} into per-book partitions of
+    (chapter index, chapter_key, chapter_data), keeping corpus order.
+    """
+    partitions = []
+    current_book = None
+    for index, (chapter_key, chapter_data) in enumerate(chapters.items()):
+        book = chapter_key.rsplit(' ', 1)[0]
+        if book != current_book:
+            partitions.append([])
+            current_book = book
+        partitions[-1].append((index, chapter_key, chapter_data))
+    return partitions
+
+
+def build_partial_postings(partition: list, summaries: dict, lemmas: dict = None) -> list:
+    """
+    Index one partition. Returns [(first_seen, word, entries)] sorted by
+    first_seen = (chapter index, order of the word within that chapter),
+    where entries are the word's chapter entries sorted by count (most
+    occurrences first, ties in chapter order).
+    """
+    lemmas = _lemmas if lemmas is None else lemmas
+    postings = {}
+
+    for chapter_index, chapter_key, chapter_data in partition:
+        # word -> [verse refs] for this chapter, in order of first appearance
+        word_refs = {}
+        for verse in chapter_data["verses"]:
+            ref = verse["ref"]
+            text = verse["text"]
+
+            seen_in_verse = set()
+            for word in WORD_PATTERN.findall(text):
+                if len(word) < 3:
+                    continue
+
+                lemma = lemmas.get(word.lower(), word.lower())
+
+                if lemma in STOPWORDS or len(lemma) < 3:
+                    continue
+
+                if lemma not in seen_in_verse:
+                    seen_in_verse.add(lemma)
+                    word_refs.setdefault(lemma, []).append((ref, text))
+
+        summary = summaries.get(chapter_key, "")
+        for order, (word, verse_refs) in enumerate(word_refs.items()):
+            # Pick the best verse (first occurrence)
+            ref, text = verse_refs[0]
+            entry = {
+                "chapter": chapter_key,
+                "summary": summary,
+                "ref": ref,
+                "snippet": extract_snippet(text, word, lemmas),
+                "count": len(verse_refs)
+            }
+            if word in postings:
+                postings[word][2].append(entry)
+            else:
+                postings[word] = ((chapter_index, order), word, [entry])
+
+    # Sort each word's chapters by count (stable, so ties stay in chapter order)
+    for _, _, entries in postings.values():
+        entries.sort(key=_by_count)
+
+    # Dict order is already first-seen order
+    return list(postings.values())
+
+
+def _by_count(entry):
+    return -entry["count"]
+
+
+def merge_postings(partials: list) -> dict:
+    """
+    k-way merge partial postings (from consecutive partitions) into
+    word -> entries, words in order of first occurrence. A word's entry
+    lists from different partitions are concatenated in partition order
+    and re-sorted; the sort is stable and each list is already a sorted
+    run, so this is a merge that keeps ties in chapter order exactly as
+    one sort over all chapters would.
+    """
+    concordance = {}
+    merged = set()
+    # first_seen is unique per posting, so tuples compare on it alone
+    for _, word, entries in heapq.merge(*partials):
+        if word in concordance:
+            concordance[word].extend(entries)
+            merged.add(word)
+        else:
+            concordance[word] = entries
+
+    for word in merged:
+        concordance[word].sort(key=_by_count)
+    return concordance
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Hold off cyclic GC while building postings: they are hundreds of
+    thousands of small acyclic dicts and lists, and GC passes triggered by
+    those allocations would otherwise cost more than the indexing itself.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _init_worker(lemmas):
+    global _lemmas
+    _lemmas = lemmas
+
+
+def _build_partial_postings_paused(partition, summaries):
+    with _gc_paused():
+        return build_partial_postings(partition, summaries)
+
+
+def default_workers(partition_count: int) -> int:
+    return max(1, min(os.cpu_count() or 1, partition_count))
+
+
+def build_postings(chapters: dict, summaries: dict, lemmas: dict, workers: int = None) -> dict:
+    """
+    The concordance for {chapter_key: {"verses": [{ref, text}]}}, built
+    by `workers` processes (default: one per core); workers=1 runs inline.
+    """
+    partitions = partition_by_book(chapters)
+    workers = workers or default_workers(len(partitions))
+
+    with _gc_paused():
+        if workers <= 1:
+            partials = [build_partial_postings(p, summaries, lemmas) for p in partitions]
+        else:
+            # Largest books first so no worker is left with Psalms at the end
+            order = sorted(range(len(partitions)),
+                           key=lambda i: -sum(len(c[2]["verses"]) for c in partitions[i]))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(lemmas,)) as pool:
+                futures = {i: pool.submit(_build_partial_postings_paused, partitions[i], summaries)
+                           for i in order}
+                partials = [futures[i].result() for i in range(len(partitions))]
+
+        return merge_postings(partials)
@@ -0,0 +1,321 @@
+"""
+Typo-Tolerant Concordance Lookup
+Suggests concordance words within edit distance 2 of a misspelled query
+("nebuchadnezar" -> nebuchadnezzar, "melchisedek" -> melchizedek) without
+comparing the query against every word, SymSpell-style:
+
+  - every dictionary word's deletion neighborhood (the word with up to
+    MAX_DISTANCE letters deleted) is precomputed into a delete -> word ids map
+  - two words within distance d share a string that is at most d deletions
+    from each, so a query only generates its own deletes, looks them up, and
+    verifies the few candidates with a bounded Damerau-Levenshtein distance
+
+The dictionary is the concordance vocabulary plus the people and places in
+entities.json, with chapter counts. Suggestions are ranked by distance, then
+by chapter count. build_spelling.py writes the index to concordance.spell
+once both the concordance and entities.json are built, and the server maps
+it read-only, so every worker shares one copy.
+
+Deletes are stored as their CRC-32s, sorted, each with its word ids. A hash
+collision only adds a candidate, and every candidate is verified, so the
+delete strings themselves are never stored.
+
+Layout (little-endian, sections 4-byte aligned):
+    header          magic, version, max distance, counts and blob size
+    word_offsets    u32[words + 1]       sorted word string table
+    counts          u32[words]           chapter count of each word
+    masks           u32[words]           letter_mask of each word
+    delete_hashes   u32[deletes]         CRC-32 of each delete, ascending
+    delete_starts   u32[deletes + 1]     first word id of each delete
+    delete_words    u32[entries]         word ids (ascending per delete)
+    words           UTF-8 words, concatenated
+
+Usage: python concordance_spelling.py [concordance.spell] [word ...]
+"""
+
+import json
+import mmap
+import re
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+MAGIC = b"BCSP"
+VERSION = 1
+MAX_DISTANCE = 2
+WORD = re.compile(r'^[a-z]+$')
+# magic, version, max distance, words, deletes, delete entries, words bytes
+HEADER = struct.Struct("<4sIIIIII")
+
+
+def _pad(n):
+    return (4 - n % 4) % 4
+
+
+def _little_endian(arr):
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def _is_subsequence(short: str, long: str) -> bool:
+    letters = iter(long)
+    return all(char in letters for char in short)
+
+
+def load_entity_counts(filepath="entities.json") -> dict:
+    """People and places with their chapter counts ({} if entities.json is missing)."""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            entities = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    counts = {}
+    for kind in ("people", "places"):
+        kind_counts = entities.get(f"{kind}_counts", {})
+        for name in entities.get(kind, []):
+            counts[name.lower()] = max(counts.get(name.lower(), 0), kind_counts.get(name, 0))
+    return counts
+
+
+def deletes(word, max_distance: int) -> dict:
+    """{variant: letters deleted} for word (str or bytes) with up to max_distance letters removed."""
+    variants = {word: 0}
+    level = [word]
+    for n in range(1, max_distance + 1):
+        next_level = []
+        for variant in level:
+            for i in range(len(variant)):
+                shorter = variant[:i] + variant[i + 1:]
+                if shorter not in variants:
+                    variants[shorter] = n
+                    next_level.append(shorter)
+        level = next_level
+    return variants
+
+
+def letter_mask(word: str) -> int:
+    """Bit per distinct letter; one edit changes at most two bits."""
+    mask = 0
+    for char in word:
+        mask |= 1 << (ord(char) - 97)
+    return mask
+
+
+def position_masks(word: str) -> dict:
+    """{letter: bit i set where word[i] is that letter}, for edit_distance."""
+    masks = {}
+    for i, char in enumerate(word):
+        masks[char] = masks.get(char, 0) | 1 << i
+    return masks
+
+
+def edit_distance(a: str, b: str, max_distance: int, masks: dict = None) -> int:
+    """
+    Damerau-Levenshtein distance (adjacent transpositions count as one edit,
+    optimal string alignment), or max_distance + 1 when it exceeds it.
+
+    Bit-parallel (Hyyro 2003): a column of the edit table is held as +1/-1
+    delta bit vectors over a's letters, so each letter of b costs a handful
+    of int operations instead of a row of cells. masks are a's
+    position_masks, precomputed when a is compared against many words.
+    """
+    len_a = len(a)
+    if abs(len_a - len(b)) > max_distance:
+        return max_distance + 1
+    if not len_a:
+        return len(b)
+    if masks is None:
+        masks = position_masks(a)
+
+    full = (1 << len_a) - 1
+    last = 1 << (len_a - 1)
+    vp, vn, d0, previous_match = full, 0, 0, 0
+    distance = len_a
+    for char in b:
+        match = masks.get(char, 0)
+        transposed = ((~d0 & match) << 1) & previous_match
+        d0 = (((match & vp) + vp) ^ vp) | match | vn | transposed
+        hp = vn | ~(d0 | vp)
+        hn = d0 & vp
+        if hp & last:
+            distance += 1
+        elif hn & last:
+            distance -= 1
+        hp = (hp << 1) | 1
+        hn <<= 1
+        vp = (hn | ~(d0 | hp)) & full
+        vn = hp & d0 & full
+        previous_match = match
+    return distance if distance <= max_distance else max_distance + 1
+
+
+def write_spelling_index(counts: dict, output_filepath="concordance.spell",
+                         entities_filepath="entities.json", max_distance=MAX_DISTANCE):
+    """Write the index for a word -> chapter count map plus the entity names."""
+    merged = load_entity_counts(entities_filepath)
+    merged.update(counts)
+    words = sorted(w for w in merged if WORD.match(w))
+
+    by_hash = {}  # delete hash -> [word ids], ascending
+    for word_id, word in enumerate(words):
+        for variant in deletes(word.encode('ascii'), max_distance):
+            by_hash.setdefault(zlib.crc32(variant), []).append(word_id)
+
+    delete_hashes = array('I', sorted(by_hash))
+    delete_starts = array('I', [0])
+    delete_words = array('I')
+    for delete_hash in delete_hashes:
+        delete_words.extend(by_hash[delete_hash])
+        delete_starts.append(len(delete_words))
+
+    word_offsets = array('I', [0])
+    blob = bytearray()
+    for word in words:
+        blob += word.encode('ascii')
+        word_offsets.append(len(blob))
+    word_counts = array('I', (merged[w] for w in words))
+    masks = array('I', (letter_mask(w) for w in words))
+
+    with open(output_filepath, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, max_distance, len(words), len(delete_hashes),
+                            len(delete_words), len(blob)))
+        for arr in (word_offsets, word_counts, masks, delete_hashes, delete_starts, delete_words):
+            _little_endian(arr).tofile(f)
+            f.write(b"\0" * _pad(arr.itemsize * len(arr)))
+        f.write(blob)
+
+    print(f"Saved spelling index to {output_filepath} ({len(words):,} words, "
+          f"{len(delete_hashes):,} deletes, {Path(output_filepath).stat().st_size / 1024 / 1024:.1f} MB)")
+
+
+class SpellingIndex:
+    """Read-only view over concordance.spell."""
+
+    def __init__(self, filepath="concordance.spell"):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+
+        (magic, version, self.max_distance, n_words, n_deletes, n_entries,
+         words_len) = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{filepath} is not a version {VERSION} spelling index")
+
+        offset = HEADER.size
+
+        def section(fmt, count):
+            nonlocal offset
+            size = struct.calcsize(fmt) * count
+            view = buf[offset:offset + size]
+            offset += size + _pad(size)
+            if sys.byteorder == 'little':
+                return view.cast(fmt)
+            arr = array(fmt, view)
+            arr.byteswap()
+            return arr
+
+        self.word_offsets = section('I', n_words + 1)
+        self.counts = section('I', n_words)
+        self.masks = section('I', n_words)
+        self.delete_hashes = section('I', n_deletes)
+        self.delete_starts = section('I', n_deletes + 1)
+        self.delete_words = section('I', n_entries)
+        self.words = buf[offset:offset + words_len]
+        self._len = n_words
+        self._n_deletes = n_deletes
+
+    def __len__(self):
+        return self._len
+
+    def word(self, i: int) -> str:
+        return str(self.words[self.word_offsets[i]:self.word_offsets[i + 1]], 'ascii')
+
+    def find(self, word: str) -> int:
+        """Word id of an exact dictionary word, or -1."""
+        lo, hi = 0, self._len
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word(mid) < word:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self._len and self.word(lo) == word else -1
+
+    def __contains__(self, word):
+        return self.find(word) >= 0
+
+    def lookup(self, word: str, k: int = 10, max_distance: int = None) -> list[tuple[str, int, int]]:
+        """
+        Up to k (word, distance, chapter count) within max_distance edits,
+        nearest first, then most frequent. An exact match comes first.
+        """
+        word = word.lower().strip()
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        if not WORD.match(word):
+            return []
+
+        hashes, starts, delete_words = self.delete_hashes, self.delete_starts, self.delete_words
+        masks, words, offsets = self.masks, self.words, self.word_offsets
+        mask = letter_mask(word)
+        query_masks = position_masks(word)
+        mask_limit = 2 * max_distance
+        found = {}
+        # Deletes are hashed as bytes with CRC-32: stable across processes, unlike hash()
+        for variant, deleted in deletes(word.encode('ascii'), max_distance).items():
+            delete_hash = zlib.crc32(variant)
+            i = bisect_left(hashes, delete_hash)
+            if i == self._n_deletes or hashes[i] != delete_hash:
+                continue
+            for word_id in delete_words[starts[i]:starts[i + 1]]:
+                if word_id in found:
+                    continue
+                candidate = words[offsets[word_id]:offsets[word_id + 1]]
+                if candidate == variant:
+                    # The candidate is the query with `deleted` letters removed
+                    found[word_id] = deleted
+                    continue
+                candidate = str(candidate, 'ascii')
+                if deleted == 0 and _is_subsequence(word, candidate):
+                    # The query is the candidate with letters removed
+                    found[word_id] = len(candidate) - len(word)
+                elif (mask ^ masks[word_id]).bit_count() > mask_limit:
+                    found[word_id] = max_distance + 1
+                else:
+                    found[word_id] = edit_distance(word, candidate, max_distance, query_masks)
+
+        ranked = sorted((distance, -self.counts[i], i) for i, distance in found.items()
+                        if distance <= max_distance)
+        return [(self.word(i), distance, -negative_count) for distance, negative_count, i in ranked[:k]]
+
+
+def open_spelling_index(filepath="concordance.spell"):
+    """Open the index if it has been built, otherwise None."""
+    if not Path(filepath).exists():
+        return None
+    index = SpellingIndex(filepath)
+    print(f"Mapped spelling index {filepath} ({len(index):,} words)")
+    return index
+
+
+if __name__ == "__main__":
+    import time
+
+    index_file = sys.argv[1] if len(sys.argv) > 1 else "concordance.spell"
+    queries = sys.argv[2:] or ["nebuchadnezar", "melchisedek", "pharoah", "isiah", "jerusalem", "covenent"]
+
+    index = SpellingIndex(index_file)
+    print(f"  {index_file}: {len(index):,} words")
+
+    repeat = 200
+    for query in queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            results = index.lookup(query, 5)
+        avg_us = (time.perf_counter() - start) / repeat * 1e6
+        top = ", ".join(f"{w} ({d}, {c})" for w, d, c in results)
+        print(f"  {query:<16} {avg_us:8.1f} us  {top}")
@@ -0,0 +1,212 @@
+"""
+Memory-mapped Concordance Store
+build_concordance.py writes concordance.idx alongside concordance.json so
+server workers can map one shared file instead of each parsing the JSON
+into its own in-memory ConcordanceIndex.
+
+Responses are pre-encoded at build time: every word's /api/concordance/<word>
+body and the /api/concordance body (meta plus per-word counts) are stored
+as JSON bytes, so a lookup is a binary search over the sorted word table
+and a slice of the mapped file.
+
+Layout (little-endian, sections 4-byte aligned):
+    header          magic, version, word count, section sizes
+    meta            concordance meta JSON
+    word_offsets    u32[words + 1]  byte offset of each word in the word blob
+    counts          u32[words]      chapter count per word
+    body_offsets    u32[words + 1]  byte offset of each word's body
+    words           sorted UTF-8 words, concatenated
+    index body      JSON {"meta": ..., "counts": {...}}
+    bodies          JSON {"word": ..., "entries": [...]} per word
+
+Usage: python concordance_store.py [concordance.json] [concordance.idx]
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+MAGIC = b"BCCX"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIIII")  # magic, version, words, meta, words, index body, bodies bytes
+
+
+def _pad(n):
+    return (4 - n % 4) % 4
+
+
+def _little_endian(arr):
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def _encode(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def write_concordance_store(data: dict, output_filepath="concordance.idx"):
+    """Write the store from the dict written by build_concordance()."""
+    concordance = data["concordance"]
+    words = sorted(concordance)
+
+    word_offsets = array('I', [0])
+    counts = array('I')
+    body_offsets = array('I', [0])
+    word_blob = bytearray()
+    bodies = bytearray()
+
+    for word in words:
+        entries = concordance[word]
+        word_blob += word.encode('utf-8')
+        word_offsets.append(len(word_blob))
+        counts.append(len(entries))
+        bodies += _encode({"word": word, "entries": entries})
+        body_offsets.append(len(bodies))
+
+    meta = data.get("meta", {})
+    meta_bytes = _encode(meta)
+    index_body = _encode({"meta": meta, "counts": {word: len(concordance[word]) for word in words}})
+
+    with open(output_filepath, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(words), len(meta_bytes),
+                            len(word_blob), len(index_body), len(bodies)))
+        f.write(meta_bytes + b"\0" * _pad(len(meta_bytes)))
+        _little_endian(word_offsets).tofile(f)
+        _little_endian(counts).tofile(f)
+        _little_endian(body_offsets).tofile(f)
+        f.write(word_blob + b"\0" * _pad(len(word_blob)))
+        f.write(index_body + b"\0" * _pad(len(index_body)))
+        f.write(bodies)
+
+    print(f"Saved concordance store to {output_filepath} ({len(words):,} words, "
+          f"{Path(output_filepath).stat().st_size / 1024 / 1024:.1f} MB)")
+
+
+class ConcordanceStore:
+    """
+    Read-only view over concordance.idx, interchangeable with
+    ConcordanceIndex for the server's lookups.
+    """
+
+    def __init__(self, filepath="concordance.idx"):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+
+        magic, version, n_words, meta_len, words_len, index_len, bodies_len = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{filepath} is not a version {VERSION} concordance store")
+
+        offset = HEADER.size
+        self.meta = json.loads(bytes(buf[offset:offset + meta_len]))
+        offset += meta_len + _pad(meta_len)
+
+        def section(fmt, count):
+            nonlocal offset
+            size = struct.calcsize(fmt) * count
+            view = buf[offset:offset + size]
+            offset += size
+            if sys.byteorder == 'little':
+                return view.cast(fmt)
+            arr = array(fmt, view)
+            arr.byteswap()
+            return arr
+
+        def blob(length):
+            nonlocal offset
+            view = buf[offset:offset + length]
+            offset += length + _pad(length)
+            return view
+
+        self.word_offsets = section('I', n_words + 1)
+        self.counts = section('I', n_words)
+        self.body_offsets = section('I', n_words + 1)
+        self.words = blob(words_len)
+        self.index_body = blob(index_len)
+        self.bodies = blob(bodies_len)
+        self._len = n_words
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, word):
+        return self.find(word) >= 0
+
+    def close(self):
+        for name in ("word_offsets", "counts", "body_offsets", "words", "index_body", "bodies"):
+            view = getattr(self, name)
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def word(self, i: int) -> bytes:
+        return bytes(self.words[self.word_offsets[i]:self.word_offsets[i + 1]])
+
+    def find(self, word: str) -> int:
+        """Position of word in the sorted word table, or -1."""
+        target = word.encode('utf-8')
+        lo, hi = 0, self._len
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._len and self.word(lo) == target:
+            return lo
+        return -1
+
+    def chapter_count(self, word: str) -> int:
+        i = self.find(word)
+        return self.counts[i] if i >= 0 else 0
+
+    def word_counts(self) -> dict:
+        """Map every indexed word to its chapter count."""
+        return {str(self.word(i), 'utf-8'): self.counts[i] for i in range(self._len)}
+
+    def index_json(self) -> memoryview:
+        """Pre-encoded /api/concordance body."""
+        return self.index_body
+
+    def lookup_json(self, word: str):
+        """Pre-encoded /api/concordance/<word> body, or None if not indexed."""
+        i = self.find(word)
+        if i < 0:
+            return None
+        return self.bodies[self.body_offsets[i]:self.body_offsets[i + 1]]
+
+    def lookup(self, word: str) -> list[dict]:
+        """Entries for one word in concordance.json's shape (empty if not indexed)."""
+        body = self.lookup_json(word)
+        if body is None:
+            return []
+        return json.loads(bytes(body))["entries"]
+
+
+def open_concordance_store(filepath="concordance.idx", source="concordance.json"):
+    """Open the store if it exists and is not older than source, otherwise None."""
+    path = Path(filepath)
+    if not path.exists():
+        return None
+    source_path = Path(source)
+    if source_path.exists() and source_path.stat().st_mtime_ns > path.stat().st_mtime_ns:
+        print(f"{filepath} is older than {source} - ignoring it (rerun concordance_store.py)")
+        return None
+
+    store = ConcordanceStore(filepath)
+    print(f"Mapped concordance store {filepath} ({len(store):,} words)")
+    return store
+
+
+if __name__ == "__main__":
+    source_file = sys.argv[1] if len(sys.argv) > 1 else "concordance.json"
+    output_file = sys.argv[2] if len(sys.argv) > 2 else "concordance.idx"
+
+    with open(source_file, 'r', encoding='utf-8') as f:
+        write_concordance_store(json.load(f), output_file)
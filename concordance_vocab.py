@@ -0,0 +1,316 @@
+"""
+Vocabulary Lookup Index for the Concordance
+Answers prefix, substring and wildcard ("bapt*", "*ism", "b?ptize") queries
+over the concordance vocabulary without scanning every word.
+
+Three structures are built once from the word -> chapter count map:
+  - a sorted word array, searched with bisect for prefixes
+  - n-gram postings (1- to 3-grams) listing word ids in chapter-frequency
+    order, so substring queries can stop as soon as k matches are found
+  - the same postings for each word's leading 1 to 3 letters only, so a
+    short prefix (the first keystrokes, where the sorted range is largest)
+    reads its top k straight off the front of one list
+
+build_concordance.py writes them to concordance.vocab and the server maps
+the file read-only, so every worker shares one copy.
+
+Layout (little-endian, sections 4-byte aligned):
+    header           magic, version, counts and blob size
+    word_offsets     u32[words + 1]      sorted word string table
+    counts           u32[words]          chapter count of each word
+    by_frequency     u32[words]          word ids, most frequent first
+    rank             u32[words]          position of each word in by_frequency
+    gram_keys        u64[grams]          gram_key of each n-gram, ascending
+    gram_starts      u32[grams + 1]      first posting of each n-gram
+    gram_words       u32[gram postings]  word ids in frequency order
+    leading_keys     u64[leading]        gram_key of each word start, ascending
+    leading_starts   u32[leading + 1]
+    leading_words    u32[leading postings]
+    words            UTF-8 words, concatenated
+
+Usage: python concordance_vocab.py [concordance.vocab] [query ...]
+"""
+
+import bisect
+import fnmatch
+import heapq
+import mmap
+import re
+import struct
+import sys
+from array import array
+from collections import defaultdict
+from pathlib import Path
+
+MAGIC = b"BCVO"
+VERSION = 1
+MAX_GRAM = 3
+WILDCARDS = re.compile(r'[*?]')
+# magic, version, words, grams, gram postings, leading, leading postings, words bytes
+HEADER = struct.Struct("<4sIIIIIII")
+
+
+def _pad(n):
+    return (4 - n % 4) % 4
+
+
+def _little_endian(arr):
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def gram_key(gram: str) -> int:
+    """
+    A 1- to 3-letter string as one integer (21 bits per code point), so the
+    gram tables are u64 arrays that bisect searches without decoding strings.
+    """
+    key = 0
+    for char in gram:
+        key = key << 21 | ord(char)
+    return key
+
+
+def _posting_table(postings: dict):
+    keys = array('Q', sorted(gram_key(gram) for gram in postings))
+    by_key = {gram_key(gram): ids for gram, ids in postings.items()}
+    starts = array('I', [0])
+    ids = array('I')
+    for key in keys:
+        ids.extend(by_key[key])
+        starts.append(len(ids))
+    return keys, starts, ids
+
+
+def write_vocabulary_index(counts: dict, output_filepath="concordance.vocab"):
+    """Write the index for a word -> chapter count map."""
+    words = sorted(counts)
+    word_counts = array('I', (counts[w] for w in words))
+
+    # Rank 0 is the most frequent word; ties broken alphabetically
+    by_frequency = array('I', sorted(range(len(words)), key=lambda i: (-word_counts[i], i)))
+    rank = array('I', bytes(4 * len(words)))
+    for position, word_id in enumerate(by_frequency):
+        rank[word_id] = position
+
+    grams = defaultdict(list)
+    leading = defaultdict(list)
+    for word_id in by_frequency:
+        word = words[word_id]
+        for n in range(1, min(len(word), MAX_GRAM) + 1):
+            leading[word[:n]].append(word_id)
+        seen = set()
+        for n in range(1, MAX_GRAM + 1):
+            for i in range(len(word) - n + 1):
+                gram = word[i:i + n]
+                if gram not in seen:
+                    seen.add(gram)
+                    grams[gram].append(word_id)
+
+    # Postings inherit frequency order from the loop above
+    gram_keys, gram_starts, gram_words = _posting_table(grams)
+    leading_keys, leading_starts, leading_words = _posting_table(leading)
+    word_offsets = array('I', [0])
+    blob = bytearray()
+    for word in words:
+        blob += word.encode('utf-8')
+        word_offsets.append(len(blob))
+
+    with open(output_filepath, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(words), len(gram_keys), len(gram_words),
+                            len(leading_keys), len(leading_words), len(blob)))
+        for arr in (word_offsets, word_counts, by_frequency, rank, gram_keys, gram_starts,
+                    gram_words, leading_keys, leading_starts, leading_words):
+            _little_endian(arr).tofile(f)
+            f.write(b"\0" * _pad(arr.itemsize * len(arr)))
+        f.write(blob)
+
+    print(f"Saved vocabulary index to {output_filepath} ({len(words):,} words, "
+          f"{len(gram_keys):,} n-grams, {Path(output_filepath).stat().st_size / 1024 / 1024:.1f} MB)")
+
+
+class StringTable:
+    """Sorted strings in a mapped blob, indexable (and bisectable) like a list."""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+
+class PostingTable:
+    """Mapped n-gram -> word ids postings; get() returns a slice of the ids."""
+
+    def __init__(self, keys, starts, ids):
+        self.keys = keys
+        self.starts = starts
+        self.ids = ids
+
+    def get(self, gram: str, default=None):
+        key = gram_key(gram)
+        i = bisect.bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return default
+        return self.ids[self.starts[i]:self.starts[i + 1]]
+
+
+class VocabularyIndex:
+    """Read-only view over concordance.vocab."""
+
+    def __init__(self, filepath="concordance.vocab"):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+
+        (magic, version, n_words, n_grams, n_gram_postings, n_leading, n_leading_postings,
+         words_len) = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{filepath} is not a version {VERSION} vocabulary index")
+
+        offset = HEADER.size
+
+        def section(fmt, count):
+            nonlocal offset
+            size = struct.calcsize(fmt) * count
+            view = buf[offset:offset + size]
+            offset += size + _pad(size)
+            if sys.byteorder == 'little':
+                return view.cast(fmt)
+            arr = array(fmt, view)
+            arr.byteswap()
+            return arr
+
+        word_offsets = section('I', n_words + 1)
+        self.counts = section('I', n_words)
+        self.by_frequency = section('I', n_words)
+        self.rank = section('I', n_words)
+        self.grams = PostingTable(section('Q', n_grams), section('I', n_grams + 1),
+                                  section('I', n_gram_postings))
+        self.leading = PostingTable(section('Q', n_leading), section('I', n_leading + 1),
+                                    section('I', n_leading_postings))
+        self.words = StringTable(word_offsets, buf[offset:offset + words_len])
+
+    def __len__(self):
+        return len(self.words)
+
+    def _result(self, word_ids):
+        return [(self.words[i], self.counts[i]) for i in word_ids]
+
+    def _prefix_range(self, prefix):
+        lo = bisect.bisect_left(self.words, prefix)
+        hi = bisect.bisect_left(self.words, prefix + '\uffff', lo)
+        return lo, hi
+
+    def _rarest_gram(self, fragment):
+        """Shortest n-gram posting list that every word containing fragment is in."""
+        if len(fragment) <= MAX_GRAM:
+            return self.grams.get(fragment, ())
+        postings = [
+            self.grams.get(fragment[i:i + MAX_GRAM], ())
+            for i in range(len(fragment) - MAX_GRAM + 1)
+        ]
+        return min(postings, key=len)
+
+    def _scan(self, candidates, match, k):
+        """Take the first k matching ids from a frequency-ordered candidate list."""
+        found = []
+        for word_id in candidates:
+            if match(self.words[word_id]):
+                found.append(word_id)
+                if len(found) == k:
+                    break
+        return found
+
+    def prefix(self, prefix: str, k: int = 10) -> list[tuple[str, int]]:
+        """Top-k words starting with prefix."""
+        if not prefix:
+            return self._result(self.by_frequency[:k])
+        candidates = self.leading.get(prefix[:MAX_GRAM], ())
+        if len(prefix) <= MAX_GRAM:
+            return self._result(candidates[:k])
+
+        # Longer prefixes: rank the sorted range or scan the frequency-ordered
+        # list for the leading letters, whichever is shorter
+        lo, hi = self._prefix_range(prefix)
+        if hi - lo <= len(candidates):
+            return self._result(heapq.nsmallest(k, range(lo, hi), key=self.rank.__getitem__))
+        return self._result(self._scan(candidates, lambda w: w.startswith(prefix), k))
+
+    def substring(self, fragment: str, k: int = 10) -> list[tuple[str, int]]:
+        """Top-k words containing fragment anywhere."""
+        if not fragment:
+            return self._result(self.by_frequency[:k])
+        candidates = self._rarest_gram(fragment)
+        if len(fragment) <= MAX_GRAM:
+            return self._result(candidates[:k])
+        return self._result(self._scan(candidates, lambda w: fragment in w, k))
+
+    def wildcard(self, pattern: str, k: int = 10) -> list[tuple[str, int]]:
+        """Top-k words matching a glob pattern ('*' = any run, '?' = one letter)."""
+        regex = re.compile(fnmatch.translate(pattern))
+        literal_prefix = WILDCARDS.split(pattern, 1)[0]
+        fragments = [f for f in WILDCARDS.split(pattern) if f]
+        candidates = self._rarest_gram(max(fragments, key=len)) if fragments else self.by_frequency
+
+        # Use whichever narrows the search more: the prefix range or the n-gram postings
+        if literal_prefix:
+            lo, hi = self._prefix_range(literal_prefix)
+            if hi - lo <= len(candidates):
+                matches = [i for i in range(lo, hi) if regex.match(self.words[i])]
+                return self._result(heapq.nsmallest(k, matches, key=self.rank.__getitem__))
+
+        return self._result(self._scan(candidates, regex.match, k))
+
+    def suggest(self, query: str, k: int = 10, mode: str = "auto") -> list[tuple[str, int]]:
+        """
+        Dispatch a query. In "auto" mode patterns containing * or ? are
+        wildcards and anything else is a substring match (which includes
+        all prefix matches), ranked by chapter frequency.
+        """
+        query = query.lower().strip()
+        if mode == "auto":
+            mode = "wildcard" if WILDCARDS.search(query) else "substring"
+
+        if mode == "prefix":
+            return self.prefix(query, k)
+        if mode == "substring":
+            return self.substring(query, k)
+        if mode == "wildcard":
+            return self.wildcard(query, k)
+        raise ValueError(f"Unknown suggest mode: {mode}")
+
+
+def open_vocabulary_index(filepath="concordance.vocab"):
+    """Open the index if it has been built, otherwise None."""
+    if not Path(filepath).exists():
+        return None
+    index = VocabularyIndex(filepath)
+    print(f"Mapped vocabulary index {filepath} ({len(index):,} words)")
+    return index
+
+
+if __name__ == "__main__":
+    import time
+
+    index_file = sys.argv[1] if len(sys.argv) > 1 else "concordance.vocab"
+    queries = sys.argv[2:] or ["bapt", "bapt*", "*ism", "lov", "ness", "b?ptize", "covenant", "z", "*"]
+
+    start = time.perf_counter()
+    vocab = VocabularyIndex(index_file)
+    print(f"  Mapped vocabulary index for {len(vocab):,} words in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    repeat = 1000
+    print(f"\n  {'query':<12} {'avg':>10}  top results")
+    for query in queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            results = vocab.suggest(query)
+        avg_us = (time.perf_counter() - start) / repeat * 1e6
+        top = ", ".join(f"{w} ({c})" for w, c in results[:5])
+        print(f"  {query:<12} {avg_us:8.1f} us  {top}")
@@ -0,0 +1,221 @@
+"""
+Shared NASB Corpus Parser with a Cached Verse Store
+Parses the "Text -- book chapter:verse" Bible text once and caches it as a
+columnar binary file next to the source (nasb.txt -> nasb.corpus). Later
+loads read the cache instead of re-running the regex over every line; the
+cache is rebuilt whenever the source's SHA-256 changes.
+
+Cache layout (little-endian, sections 4-byte aligned):
+    header       magic, version, verse count, source sha256, section sizes
+    books        JSON list of book names (title case, order of first appearance)
+    book_ids     u16[verses]    index into books
+    chapters     u16[verses]
+    verses       u16[verses]
+    offsets      u32[verses + 1]  character offset of each verse in the text
+    text         UTF-8 verse texts, concatenated
+
+Usage: python corpus.py [nasb.txt]   (parse, cache and print stats)
+"""
+
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+# "Text -- book chapter:verse"; books may be "1 samuel", "song of solomon", ...
+NASB_PATTERN = re.compile(
+    r'^(.+?)\s+--\s+(\d?\s?[a-zA-Z]+(?:\s+of\s+[a-zA-Z]+|\s+[a-zA-Z]+)?)\s+(\d+):(\d+)\s*$',
+    re.IGNORECASE
+)
+
+MAGIC = b"BCRP"
+VERSION = 1
+HEADER = struct.Struct("<4sII32sII")  # magic, version, verses, sha256, books bytes, text bytes
+
+
+def _pad(n):
+    return (4 - n % 4) % 4
+
+
+def _little_endian(arr):
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+class Corpus:
+    """Every verse of the Bible as parallel columns plus one text string."""
+
+    def __init__(self, books, book_ids, chapters, verses, offsets, text, source_hash):
+        self.books = books          # book id -> name
+        self.book_ids = book_ids    # per verse
+        self.chapters = chapters    # per verse
+        self.verses = verses        # per verse
+        self.offsets = offsets      # verse i is text[offsets[i]:offsets[i + 1]]
+        self.text = text
+        self.source_hash = source_hash
+
+    def __len__(self):
+        return len(self.verses)
+
+    @classmethod
+    def parse(cls, content: str, source_hash: bytes = b"") -> "Corpus":
+        """Parse NASB-format text. Lines that don't match are skipped."""
+        books, book_index = [], {}
+        book_ids, chapters, verses = array('H'), array('H'), array('H')
+        offsets = array('I', [0])
+        texts = []
+        length = 0
+
+        for line in content.split('\n'):
+            line = line.strip()
+            if not line or line == '.':
+                continue
+            match = NASB_PATTERN.match(line)
+            if not match:
+                continue
+            text, book, chapter, verse = match.groups()
+            book = book.strip().title()
+            book_id = book_index.get(book)
+            if book_id is None:
+                book_id = book_index[book] = len(books)
+                books.append(book)
+            book_ids.append(book_id)
+            chapters.append(int(chapter))
+            verses.append(int(verse))
+            texts.append(text)
+            length += len(text)
+            offsets.append(length)
+
+        return cls(books, book_ids, chapters, verses, offsets, "".join(texts), source_hash)
+
+    def save(self, filepath):
+        """Write the cache atomically (parallel builds may load it meanwhile)."""
+        books_bytes = json.dumps(self.books, ensure_ascii=False).encode('utf-8')
+        text_bytes = self.text.encode('utf-8')
+        tmp_path = Path(f"{filepath}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self), self.source_hash,
+                                len(books_bytes), len(text_bytes)))
+            f.write(books_bytes + b"\0" * _pad(len(books_bytes)))
+            for column in (self.book_ids, self.chapters, self.verses):
+                _little_endian(array('H', column)).tofile(f)
+            f.write(b"\0" * _pad(6 * len(self)))
+            _little_endian(array('I', self.offsets)).tofile(f)
+            f.write(text_bytes)
+        os.replace(tmp_path, filepath)
+
+    @classmethod
+    def load_cache(cls, filepath, source_hash: bytes):
+        """Read a cache file; None if it is missing, corrupt or for another source."""
+        try:
+            data = Path(filepath).read_bytes()
+            magic, version, n, cached_hash, books_len, text_len = HEADER.unpack_from(data, 0)
+        except (OSError, struct.error):
+            return None
+        if magic != MAGIC or version != VERSION or cached_hash != source_hash:
+            return None
+
+        offset = HEADER.size
+        books = json.loads(data[offset:offset + books_len])
+        offset += books_len + _pad(books_len)
+
+        def column(fmt, count):
+            nonlocal offset
+            arr = array(fmt)
+            arr.frombytes(data[offset:offset + arr.itemsize * count])
+            offset += arr.itemsize * count
+            if sys.byteorder != 'little':
+                arr.byteswap()
+            return arr
+
+        book_ids = column('H', n)
+        chapters = column('H', n)
+        verses = column('H', n)
+        offset += _pad(6 * n)
+        offsets = column('I', n + 1)
+        text = data[offset:offset + text_len].decode('utf-8')
+        if len(text) != offsets[-1]:
+            return None
+        return cls(books, book_ids, chapters, verses, offsets, text, source_hash)
+
+    def verse_text(self, i: int) -> str:
+        return self.text[self.offsets[i]:self.offsets[i + 1]]
+
+    def chapter_key(self, i: int) -> str:
+        """"Book chapter" key of verse i, as used throughout the project."""
+        return f"{self.books[self.book_ids[i]]} {self.chapters[i]}"
+
+    def iter_verses(self):
+        """Yield (book, chapter, verse, text) in source order."""
+        books, offsets, text = self.books, self.offsets, self.text
+        for i, (book_id, chapter, verse) in enumerate(zip(self.book_ids, self.chapters, self.verses)):
+            yield books[book_id], chapter, verse, text[offsets[i]:offsets[i + 1]]
+
+    def chapter_verses(self) -> dict:
+        """Map chapter key -> list of verse indexes, in order of first appearance."""
+        chapters = {}
+        previous = None
+        indexes = None
+        for i, (book_id, chapter) in enumerate(zip(self.book_ids, self.chapters)):
+            if (book_id, chapter) != previous:
+                previous = (book_id, chapter)
+                indexes = chapters.setdefault(f"{self.books[book_id]} {chapter}", [])
+            indexes.append(i)
+        return chapters
+
+    def chapter_texts(self) -> dict:
+        """Map chapter key -> all its verse texts joined by spaces."""
+        offsets, text = self.offsets, self.text
+        return {
+            key: " ".join(text[offsets[i]:offsets[i + 1]] for i in indexes)
+            for key, indexes in self.chapter_verses().items()
+        }
+
+
+def file_hash(filepath) -> bytes:
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def load_corpus(source="nasb.txt", cache_filepath=None) -> Corpus:
+    """
+    Load the parsed corpus for source, from the cache when it matches the
+    source's hash, otherwise by parsing (and refreshing the cache).
+    """
+    source = Path(source)
+    cache_filepath = Path(cache_filepath) if cache_filepath else source.with_suffix(".corpus")
+    start = time.perf_counter()
+    source_hash = file_hash(source)
+
+    corpus = Corpus.load_cache(cache_filepath, source_hash)
+    if corpus is not None:
+        print(f"Loaded {len(corpus):,} verses from {cache_filepath} "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return corpus
+
+    print(f"Parsing {source}...")
+    corpus = Corpus.parse(source.read_text(encoding='utf-8'), source_hash)
+    if len(corpus):
+        try:
+            corpus.save(cache_filepath)
+        except OSError as e:
+            print(f"  Could not write corpus cache {cache_filepath}: {e}")
+    print(f"Parsed {len(corpus):,} verses in {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"(cached to {cache_filepath})")
+    return corpus
+
+
+if __name__ == "__main__":
+    source_file = sys.argv[1] if len(sys.argv) > 1 else "nasb.txt"
+    corpus = load_corpus(source_file)
+    print(f"  {len(corpus.books)} books, {len(corpus.chapter_verses()):,} chapters, "
+          f"{len(corpus):,} verses, {len(corpus.text):,} characters")
@@ -4,10 +4,10 @@ Runs locally - no API tokens needed.
 """
 
 import json
-import re
-from pathlib import Path
 from collections import defaultdict
 
+from corpus import load_corpus
+
 print("Loading spaCy with NER...")
 import spacy
 nlp = spacy.load("en_core_web_sm")  # Has NER built in
@@ -15,30 +15,8 @@ print("spaCy loaded")
 
 
 def parse_bible(filepath):
-    """Parse NASB Bible into chapters."""
-    print(f"Reading {filepath}...")
-    content = Path(filepath).read_text(encoding='utf-8')
-    
-    pattern = re.compile(
-        r'^(.+?)\s+--\s+(\d?\s?[a-zA-Z]+(?:\s+of\s+[a-zA-Z]+|\s+[a-zA-Z]+)?)\s+(\d+):(\d+)\s*$',
-        re.IGNORECASE
-    )
-    
-    chapters = defaultdict(list)
-    
-    for line in content.split('\n'):
-        line = line.strip()
-        if not line or line == '.':
-            continue
-        
-        match = pattern.match(line)
-        if match:
-            text, book, chapter, verse = match.groups()
-            book = book.strip().title()
-            chapter_key = f"{book} {chapter}"
-            chapters[chapter_key].append(text)
-    
-    return {k: " ".join(v) for k, v in chapters.items()}
+    """Load the Bible (via the shared corpus cache) as chapter_key -> text."""
+    return load_corpus(filepath).chapter_texts()
 
 
 def extract_entities(bible_filepath, concordance_filepath, output_filepath="entities.json"):
@@ -5,9 +5,10 @@ This catches every name, including obscure genealogical names.
 
 import json
 import re
-from pathlib import Path
 from collections import defaultdict
 
+from corpus import load_corpus
+
 # Words that are capitalized but NOT proper nouns
 COMMON_WORDS_CAPS = {
     # Start of sentence words, common titles, etc.
@@ -48,42 +49,28 @@ COMMON_WORDS_CAPS = {
 }
 
 def parse_bible(filepath):
-    """Parse Bible and extract all capitalized words with chapter context."""
-    print(f"Reading {filepath}...")
-    content = Path(filepath).read_text(encoding='utf-8')
-    
-    pattern = re.compile(
-        r'^(.+?)\s+--\s+(\d?\s?[a-zA-Z]+(?:\s+of\s+[a-zA-Z]+|\s+[a-zA-Z]+)?)\s+(\d+):(\d+)\s*$',
-        re.IGNORECASE
-    )
+    """Find all capitalized words in the Bible with their chapters."""
+    corpus = load_corpus(filepath)
     
     # word -> set of chapters
     word_chapters = defaultdict(set)
     
-    for line in content.split('\n'):
-        line = line.strip()
-        if not line or line == '.':
-            continue
+    for i in range(len(corpus)):
+        chapter_key = corpus.chapter_key(i)
+        
+        # Find capitalized words that are NOT at start of sentence
+        # Split into words
+        words = re.findall(r'\b[A-Z][a-z]+\b', corpus.verse_text(i))
         
-        match = pattern.match(line)
-        if match:
-            text, book, chapter, verse = match.groups()
-            book = book.strip().title()
-            chapter_key = f"{book} {chapter}"
-            
-            # Find capitalized words that are NOT at start of sentence
-            # Split into words
-            words = re.findall(r'\b[A-Z][a-z]+\b', text)
-            
-            for word in words:
-                word_lower = word.lower()
-                # Skip if it's a common word
-                if word_lower in COMMON_WORDS_CAPS:
-                    continue
-                # Skip very short words
-                if len(word) < 3:
-                    continue
-                word_chapters[word_lower].add(chapter_key)
+        for word in words:
+            word_lower = word.lower()
+            # Skip if it's a common word
+            if word_lower in COMMON_WORDS_CAPS:
+                continue
+            # Skip very short words
+            if len(word) < 3:
+                continue
+            word_chapters[word_lower].add(chapter_key)
     
     return word_chapters
 
@@ -8,6 +8,8 @@ import requests
 import time
 from pathlib import Path
 
+from corpus import load_corpus
+
 LM_STUDIO_URL = "http://127.0.0.1:1234/v1/chat/completions"
 
 # Filler/generic words that indicate weak summaries
@@ -92,41 +94,8 @@ def is_weak_summary(summary: str) -> tuple[bool, str]:
 
 
 def parse_bible_text(filepath: Path) -> dict:
-    """Parse Bible into chapters."""
-    content = filepath.read_text(encoding='utf-8')
-    chapters = {}
-    current_book = ""
-    current_chapter = ""
-    current_text = []
-    
-    nasb_pattern = re.compile(r'^(.+?)\s+--\s+(\d?\s?[a-zA-Z]+(?:\s+of\s+[a-zA-Z]+|\s+[a-zA-Z]+)?)\s+(\d+):(\d+)\s*$', re.IGNORECASE)
-    
-    for line in content.split('\n'):
-        line = line.strip()
-        if not line or line == '.':
-            continue
-        
-        nasb_match = nasb_pattern.match(line)
-        if nasb_match:
-            text, book, chapter, verse = nasb_match.groups()
-            book = book.strip().title()
-            
-            if book != current_book or chapter != current_chapter:
-                if current_book and current_chapter and current_text:
-                    key = f"{current_book} {current_chapter}"
-                    chapters[key] = " ".join(current_text)
-                
-                current_book = book
-                current_chapter = chapter
-                current_text = []
-            
-            current_text.append(text)
-    
-    if current_book and current_chapter and current_text:
-        key = f"{current_book} {current_chapter}"
-        chapters[key] = " ".join(current_text)
-    
-    return chapters
+    """Load the Bible (via the shared corpus cache) as chapter_key -> text."""
+    return load_corpus(filepath).chapter_texts()
 
 
 def fix_specific_chapters(chapters_to_fix: list, summaries: dict, bible_chapters: dict) -> int:
@@ -253,7 +222,7 @@ def main():
         print(f"Saved to {summaries_file}")
         
         # Also need to rebuild concordance and network
-        print("\nNOTE: Run build_concordance.py and build_network.py to update indexes.")
+        print("\nNOTE: Run build_all.py to rebuild the indexes that depend on the summaries.")
 
 
 if __name__ == "__main__":
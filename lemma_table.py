@@ -0,0 +1,114 @@
+"""
+Persistent Lemma Table
+A surface form -> lemma map kept in lemma_table.json and shared by the
+build stages. Words are lemmatized by spaCy once, ever; later builds load
+the table in milliseconds and only send words they haven't seen to spaCy.
+With every word already in the table, spaCy is never imported.
+
+Each word is lemmatized as its own document (through nlp.pipe), so a word
+that spaCy's tokenizer splits ("cannot" -> "can", "not") maps to itself
+instead of leaving a gap. The table records the spaCy and model versions
+it was made with and is discarded when the installed versions differ.
+
+Usage: python lemma_table.py [word ...]   (add words and print their lemmas)
+"""
+
+import json
+import os
+import time
+from importlib import metadata
+from pathlib import Path
+
+SPACY_MODEL = "en_core_web_sm"
+LEMMA_TABLE_FILE = Path("lemma_table.json")
+
+
+def installed_version(package: str):
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+class LemmaTable:
+    """Lowercase word -> lowercase lemma, loaded from and saved to filepath."""
+
+    def __init__(self, filepath=LEMMA_TABLE_FILE, model=SPACY_MODEL):
+        self.filepath = Path(filepath)
+        self.model = model
+        self.versions = {"spacy": installed_version("spacy"), model: installed_version(model)}
+        self.lemmas = {}
+        self.added = 0
+        self._nlp = None
+
+        start = time.perf_counter()
+        try:
+            with open(self.filepath, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Without spaCy installed there is nothing to compare against: use the table as-is
+        if self.versions["spacy"] is not None and data.get("versions") != self.versions:
+            print(f"  {self.filepath} was made with {data.get('versions')}, discarding")
+            return
+        self.lemmas = data.get("lemmas", {})
+        self.versions = data.get("versions", self.versions)
+        print(f"  Loaded {len(self.lemmas):,} lemmas from {self.filepath} "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def __len__(self):
+        return len(self.lemmas)
+
+    def __contains__(self, word):
+        return word in self.lemmas
+
+    def get(self, word, default=None):
+        return self.lemmas.get(word, default)
+
+    def _load_nlp(self):
+        if self._nlp is None:
+            try:
+                import spacy
+            except ImportError:
+                raise RuntimeError(
+                    f"spaCy is needed to lemmatize words missing from {self.filepath}") from None
+            print("Loading spaCy...")
+            self._nlp = spacy.load(self.model, disable=["parser", "ner"])
+        return self._nlp
+
+    def lemmatize(self, words, batch_size=1000) -> int:
+        """Add every word (lowercased) not yet in the table. Returns how many were added."""
+        missing = sorted({w.lower() for w in words} - self.lemmas.keys())
+        if not missing:
+            return 0
+
+        nlp = self._load_nlp()
+        for word, doc in zip(missing, nlp.pipe(missing, batch_size=batch_size)):
+            self.lemmas[word] = doc[0].lemma_.lower() if len(doc) == 1 else word
+        self.added += len(missing)
+        return len(missing)
+
+    def save(self):
+        """Write the table if words were added (atomically; stages may run in parallel)."""
+        if not self.added:
+            return
+        tmp_path = self.filepath.with_name(f"{self.filepath.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"versions": self.versions, "lemmas": self.lemmas}, f,
+                      ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.filepath)
+        self.added = 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    table = LemmaTable()
+    words = [w.lower() for w in sys.argv[1:]]
+    if words:
+        added = table.lemmatize(words)
+        table.save()
+        print(f"  {added} new word(s)")
+        for word in words:
+            print(f"  {word} -> {table.get(word)}")
+    print(f"{len(table):,} lemmas in {table.filepath} ({table.versions})")
@@ -0,0 +1,359 @@
+"""
+Async Load Test for server.py
+Replays a weighted mix of requests against a running server (or one it
+starts itself) and reports throughput plus p50/p95/p99 latency and time
+to first byte per scenario:
+
+    static       GET a prebuilt artifact (network_data.json, chapters.json)
+                 with Accept-Encoding, like the page's first load
+    concordance  GET /api/concordance/<word> for a random indexed word
+    suggest      GET /api/concordance/suggest?q=<prefix>
+    tts          POST /api/tts and read the whole audio stream
+
+Load is either closed-loop (--concurrency N requests always in flight) or
+open-loop (--rate R requests per second, started on schedule whether or
+not earlier ones have finished). Open-loop latencies are measured from
+each request's scheduled start, so a server falling behind shows up in
+the percentiles instead of silently lowering the offered load.
+
+Without --url, a local server is started with the stub TTS engine, so
+the whole run is offline. All requests come from one address, so the
+server's per-client TTS admission limit applies: overlapping cache misses
+beyond it are answered 429 and reported per status code. Results are written as JSON for comparing runs.
+
+Usage: python load_test.py [--url http://host:port] [--duration 30]
+                           [--concurrency 32 | --rate 200]
+                           [--mix static=3,concordance=4,suggest=2,tts=1]
+                           [--tts-engine stub] [--tts-texts 20] [--workers 1]
+                           [--output load_test_results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+import aiohttp
+
+SERVER = Path(__file__).with_name("server.py")
+STATIC_TARGETS = ["network_data.json", "chapters.json"]
+DEFAULT_MIX = "static=3,concordance=4,suggest=2,tts=1"
+PLACEHOLDER = ("And the Lord spoke to Moses, saying, speak to the sons of Israel. "
+               "Blessed are those who keep His testimonies and seek Him with all their heart. ")
+
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.load(response)
+
+
+def start_server(port, workers, tts_engine):
+    server = subprocess.Popen(
+        [sys.executable, str(SERVER), "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--no-browser", "--tts-engine", tts_engine],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server.py exited with status {server.returncode}")
+        try:
+            get_json(f"{base_url}/api/metrics?format=json")
+            return server, base_url
+        except OSError:
+            time.sleep(0.25)
+    server.terminate()
+    raise RuntimeError("server.py did not start within 120s")
+
+
+def discover(base_url, tts_texts, rng):
+    """What the server can serve: artifacts, indexed words, and TTS texts."""
+    static = []
+    for name in STATIC_TARGETS:
+        request = urllib.request.Request(f"{base_url}/{name}", method="HEAD")
+        try:
+            urllib.request.urlopen(request, timeout=10).close()
+            static.append(f"/{name}")
+        except urllib.error.HTTPError:
+            print(f"  {name} not built - skipping")
+
+    words = []
+    try:
+        words = list(get_json(f"{base_url}/api/concordance")["counts"])
+    except urllib.error.HTTPError:
+        print("  Concordance not built - skipping concordance and suggest")
+
+    texts = []
+    try:
+        order = get_json(f"{base_url}/api/chapters")["order"]
+        for key in rng.sample(order, min(tts_texts, len(order))):
+            url = f"{base_url}/api/chapter/{urllib.parse.quote(key)}/verses?format=text"
+            with urllib.request.urlopen(url, timeout=10) as response:
+                texts.append(" ".join(response.read().decode('utf-8').split("\n")))
+    except urllib.error.HTTPError:
+        pass
+    if not texts:
+        texts = [f"{PLACEHOLDER * (i % 4 + 1)}Reading {i}." for i in range(tts_texts)]
+
+    return {"static": static, "words": words, "texts": texts}
+
+
+def make_request(scenario, targets, rng, args):
+    """(method, path, kwargs) for one request of the scenario."""
+    if scenario == "static":
+        return "GET", rng.choice(targets["static"]), {"headers": {"Accept-Encoding": "br, gzip"}}
+    if scenario == "concordance":
+        return "GET", f"/api/concordance/{urllib.parse.quote(rng.choice(targets['words']))}", {}
+    if scenario == "suggest":
+        word = rng.choice(targets["words"])
+        return "GET", f"/api/concordance/suggest?q={urllib.parse.quote(word[:rng.randint(1, 3)])}", {}
+    text = rng.choice(targets["texts"])
+    body = {"text": text}
+    if args.tts_engine:
+        body["engine"] = args.tts_engine
+    return "POST", "/api/tts", {"json": body}
+
+
+class Results:
+    def __init__(self):
+        self.scenarios = {}
+
+    def record(self, scenario, status, latency, ttfb, size):
+        stats = self.scenarios.setdefault(scenario, {
+            "latencies": [], "ttfbs": [], "statuses": {}, "bytes": 0, "errors": 0
+        })
+        stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+        if isinstance(status, int) and status < 400:
+            stats["latencies"].append(latency)
+            stats["ttfbs"].append(ttfb)
+            stats["bytes"] += size
+        else:
+            stats["errors"] += 1
+
+
+async def issue(session, base_url, scenario, request, scheduled, results):
+    method, path, kwargs = request
+    ttfb = None
+    size = 0
+    try:
+        async with session.request(method, base_url + path, **kwargs) as response:
+            status = response.status
+            async for chunk in response.content.iter_any():
+                if ttfb is None:
+                    ttfb = time.perf_counter() - scheduled
+                size += len(chunk)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        status = type(e).__name__
+    latency = time.perf_counter() - scheduled
+    results.record(scenario, status, latency, latency if ttfb is None else ttfb, size)
+
+
+async def run_load(base_url, targets, args, mix):
+    rng = random.Random(args.seed)
+    scenarios, weights = zip(*mix.items())
+    results = Results()
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=0)
+
+    def next_request():
+        scenario = rng.choices(scenarios, weights)[0]
+        return scenario, make_request(scenario, targets, rng, args)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        start = time.perf_counter()
+        deadline = start + args.duration
+
+        if args.rate:
+            # Open loop: start requests on a fixed schedule
+            tasks = set()
+            interval = 1.0 / args.rate
+            n = 0
+            while True:
+                scheduled = start + n * interval
+                if scheduled >= deadline:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                scenario, request = next_request()
+                task = asyncio.ensure_future(issue(session, base_url, scenario, request, scheduled, results))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                n += 1
+            if tasks:
+                await asyncio.gather(*tasks)
+        else:
+            # Closed loop: each worker sends its next request when the last one completes
+            async def worker():
+                while time.perf_counter() < deadline:
+                    scenario, request = next_request()
+                    await issue(session, base_url, scenario, request, time.perf_counter(), results)
+
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def distribution_ms(values):
+    values = sorted(values)
+    if not values:
+        return None
+    return {
+        "mean": round(sum(values) / len(values) * 1000, 2),
+        "p50": round(percentile(values, 50) * 1000, 2),
+        "p95": round(percentile(values, 95) * 1000, 2),
+        "p99": round(percentile(values, 99) * 1000, 2),
+        "max": round(values[-1] * 1000, 2),
+    }
+
+
+def summarize(results, elapsed):
+    summary = {}
+    all_latencies, all_ttfbs = [], []
+    total_requests = total_errors = 0
+    for scenario, stats in sorted(results.scenarios.items()):
+        requests = sum(stats["statuses"].values())
+        total_requests += requests
+        total_errors += stats["errors"]
+        all_latencies += stats["latencies"]
+        all_ttfbs += stats["ttfbs"]
+        summary[scenario] = {
+            "requests": requests,
+            "errors": stats["errors"],
+            "statuses": {str(k): v for k, v in sorted(stats["statuses"].items(), key=str)},
+            "throughput_rps": round(len(stats["latencies"]) / elapsed, 2),
+            "mbytes": round(stats["bytes"] / 1024 / 1024, 2),
+            "latency_ms": distribution_ms(stats["latencies"]),
+            "ttfb_ms": distribution_ms(stats["ttfbs"]),
+        }
+    summary["total"] = {
+        "requests": total_requests,
+        "errors": total_errors,
+        "throughput_rps": round(len(all_latencies) / elapsed, 2),
+        "latency_ms": distribution_ms(all_latencies),
+        "ttfb_ms": distribution_ms(all_ttfbs),
+    }
+    return summary
+
+
+def print_report(summary, config):
+    load = f"{config['rate']} req/s open loop" if config['rate'] else f"{config['concurrency']} concurrent"
+    print(f"\n{'='*78}")
+    print(f"LOAD TEST: {config['url']} - {load}, {config['elapsed_s']:.1f}s")
+    print(f"{'='*78}")
+    print(f"  {'scenario':<12} {'reqs':>7} {'err':>5} {'req/s':>8}   "
+          f"{'latency p50/p95/p99 ms':>24}   {'TTFB p50/p95/p99 ms':>22}")
+    for scenario, row in summary.items():
+        lat, ttfb = row["latency_ms"], row["ttfb_ms"]
+        lat_text = f"{lat['p50']:.1f}/{lat['p95']:.1f}/{lat['p99']:.1f}" if lat else "-"
+        ttfb_text = f"{ttfb['p50']:.1f}/{ttfb['p95']:.1f}/{ttfb['p99']:.1f}" if ttfb else "-"
+        print(f"  {scenario:<12} {row['requests']:>7} {row['errors']:>5} {row['throughput_rps']:>8.1f}   "
+              f"{lat_text:>24}   {ttfb_text:>22}")
+    for scenario, row in summary.items():
+        rejected = {k: v for k, v in row.get("statuses", {}).items() if not k.startswith(('2', '3'))}
+        if rejected:
+            print(f"  {scenario} non-2xx/3xx: {rejected}")
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ("static", "concordance", "suggest", "tts"):
+            raise argparse.ArgumentTypeError(f"unknown scenario: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test server.py")
+    parser.add_argument("--url", help="running server (default: start one locally with the stub TTS engine)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=32, help="closed loop: requests in flight")
+    load.add_argument("--rate", type=float, default=None, help="open loop: requests started per second")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"default: {DEFAULT_MIX}")
+    parser.add_argument("--tts-engine", default=None,
+                        help="engine sent with each /api/tts request (default: stub for a local server)")
+    parser.add_argument("--tts-texts", type=int, default=20,
+                        help="distinct TTS texts; repeats exercise the audio cache")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for a local server")
+    parser.add_argument("--port", type=int, default=8790, help="port for a local server")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="load_test_results.json")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        args.tts_engine = args.tts_engine or "stub"
+        print(f"Starting local server on port {args.port} ({args.workers} worker(s), "
+              f"{args.tts_engine} TTS)...")
+        server, base_url = start_server(args.port, args.workers, args.tts_engine)
+
+    try:
+        targets = discover(base_url, args.tts_texts, random.Random(args.seed))
+        mix = {name: weight for name, weight in args.mix.items() if weight > 0 and {
+            "static": targets["static"],
+            "concordance": targets["words"],
+            "suggest": targets["words"],
+            "tts": targets["texts"],
+        }[name]}
+        if not mix:
+            sys.exit("Nothing to request - build the artifacts first")
+
+        results, elapsed = asyncio.run(run_load(base_url, targets, args, mix))
+        try:
+            server_metrics = get_json(f"{base_url}/api/metrics?format=json").get("summary")
+        except (OSError, ValueError):
+            server_metrics = None
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    config = {
+        "url": base_url,
+        "local_server": server is not None,
+        "workers": args.workers if server is not None else None,
+        "duration_s": args.duration,
+        "elapsed_s": round(elapsed, 3),
+        "concurrency": None if args.rate else args.concurrency,
+        "rate": args.rate,
+        "mix": mix,
+        "tts_engine": args.tts_engine,
+        "tts_texts": len(targets["texts"]),
+        "seed": args.seed,
+    }
+    summary = summarize(results, elapsed)
+    print_report(summary, config)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(time.time() - elapsed)),
+            "config": config,
+            "results": summary,
+            "server_summary": server_metrics,
+        }, f, indent=2)
+    print(f"\nSaved results to {args.output}")
@@ -146,7 +146,7 @@ def main():
         json.dump(summaries, f, indent=2, ensure_ascii=False)
     
     print("Done!")
-    print("\nNOTE: Run build_network.py to update the network visualization.")
+    print("\nNOTE: Run build_all.py to rebuild the network and indexes.")
 
 
 if __name__ == "__main__":
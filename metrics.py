@@ -0,0 +1,182 @@
+"""
+Lightweight Server Metrics
+Counters, gauges and fixed-bucket latency histograms with labels, rendered
+as Prometheus text exposition format or JSON.
+
+Recording is a dict lookup plus a bisect into the bucket bounds, so it is
+cheap enough for every request. No external dependencies.
+"""
+
+import bisect
+import math
+
+# Seconds; spans sub-millisecond API lookups up to minute-long TTS streams
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.values = {}  # label values tuple -> value
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_number(value)}")
+        return lines
+
+    def to_json(self) -> dict:
+        return {
+            "type": self.type,
+            "help": self.help,
+            "values": [
+                {"labels": dict(zip(self.label_names, labels)), "value": value}
+                for labels, value in sorted(self.values.items())
+            ]
+        }
+
+    def total(self):
+        return sum(self.values.values())
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, *labels):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value, *labels):
+        self.values[labels] = value
+
+    def inc(self, amount=1, *labels):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, amount=1, *labels):
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.bounds = tuple(buckets)
+
+    def observe(self, value, *labels):
+        series = self.values.get(labels)
+        if series is None:
+            # [per-bucket counts (+Inf last), sum, count]
+            series = self.values[labels] = [[0] * (len(self.bounds) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.bounds, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def quantile(self, q: float, *labels):
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        series = self.values.get(labels)
+        if not series or not series[2]:
+            return None
+        counts, _, count = series
+        rank = q * count
+        seen = 0
+        for i, bucket_count in enumerate(counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                if i == len(self.bounds):
+                    return lower  # beyond the last bound
+                upper = self.bounds[i]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.bounds[-1]
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for labels, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.bounds + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_number(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+    def to_json(self) -> dict:
+        values = []
+        for labels, (counts, total, count) in sorted(self.values.items()):
+            values.append({
+                "labels": dict(zip(self.label_names, labels)),
+                "count": count,
+                "sum": total,
+                "mean": total / count if count else None,
+                "p50": self.quantile(0.50, *labels),
+                "p95": self.quantile(0.95, *labels),
+                "p99": self.quantile(0.99, *labels),
+            })
+        return {"type": self.type, "help": self.help, "values": values}
+
+    def total(self):
+        return sum(series[2] for series in self.values.values())
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labels=()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()) -> Gauge:
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> dict:
+        return {name: metric.to_json() for name, metric in self.metrics.items()}
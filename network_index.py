@@ -0,0 +1,265 @@
+"""
+Bitset Path Index for the Semantic Network
+Answers the visualization's "which nodes can follow this path?" question
+with bitwise ANDs instead of scanning every chapter chain.
+
+Each word gets one bitset (a Python int) with bit i set when chapter i's
+chain contains the word. The chapters reachable from a path are the AND
+of its words' bitsets; a candidate word is valid if ANDing it in leaves
+any chapter, and a candidate chapter is valid if its own bit survives.
+
+Built from build_network.build_semantic_network output: build_network.py
+writes the index to network.bin next to network_data.json, and the server
+maps it read-only, so every worker shares one copy.
+
+Layout (little-endian, sections 4-byte aligned):
+    header          magic, version, counts, bitset row size, names bytes
+    name_offsets    u32[names + 1]       sorted string table of node ids and chain words
+    name_hashes     u32[names]           CRC-32 of each name, ascending
+    hash_names      u32[names]           name id of each hash
+    name_chapters   u32[names]           chapter number of each name, NONE if not a chapter
+    name_words      u32[names]           bitset row of each name, NONE if in no chain
+    link_starts     u32[names + 1]       first outgoing link of each name
+    link_targets    u32[links]           target name ids, in link order
+    chapter_names   u32[chapters]        name id of each chapter, in network order
+    bitsets         row bytes per word   chapter bitset (bit i = chapter i)
+    names           UTF-8 names, concatenated
+
+Usage: python network_index.py [network.bin] [word ...]
+"""
+
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+MAGIC = b"BCNW"
+VERSION = 1
+NONE = 0xFFFFFFFF
+# magic, version, names, chapters, words, links, bitset row bytes, names bytes
+HEADER = struct.Struct("<4sIIIIIII")
+
+
+def _pad(n):
+    return (4 - n % 4) % 4
+
+
+def _little_endian(arr):
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def write_network_index(nodes: list, links: list, output_filepath="network.bin"):
+    """Write the index for the network's nodes (with chapter chains) and links."""
+    chapters = [n['id'] for n in nodes if n['type'] == 'chapter']
+    chapter_numbers = {chapter: i for i, chapter in enumerate(chapters)}
+
+    word_bits = {}
+    for node in nodes:
+        if node['type'] != 'chapter':
+            continue
+        bit = 1 << chapter_numbers[node['id']]
+        for word in node.get('chain', []):
+            word_bits[word] = word_bits.get(word, 0) | bit
+
+    outgoing = {}
+    for link in links:
+        targets = outgoing.setdefault(link['source'], [])
+        if link['target'] not in targets:
+            targets.append(link['target'])
+
+    names = sorted({n['id'] for n in nodes} | word_bits.keys()
+                   | {link[end] for link in links for end in ('source', 'target')})
+    name_ids = {name: i for i, name in enumerate(names)}
+    row_size = 4 * ((len(chapters) + 31) // 32)
+
+    name_offsets = array('I', [0])
+    name_chapters = array('I')
+    name_words = array('I')
+    link_starts = array('I', [0])
+    link_targets = array('I')
+    bitsets = bytearray()
+    blob = bytearray()
+    for name in names:
+        blob += name.encode('utf-8')
+        name_offsets.append(len(blob))
+        name_chapters.append(chapter_numbers.get(name, NONE))
+        if name in word_bits:
+            name_words.append(len(bitsets) // row_size)
+            bitsets += word_bits[name].to_bytes(row_size, 'little')
+        else:
+            name_words.append(NONE)
+        link_targets.extend(name_ids[target] for target in outgoing.get(name, ()))
+        link_starts.append(len(link_targets))
+    chapter_names = array('I', (name_ids[chapter] for chapter in chapters))
+    by_hash = sorted((zlib.crc32(name.encode('utf-8')), i) for i, name in enumerate(names))
+    name_hashes = array('I', (name_hash for name_hash, _ in by_hash))
+    hash_names = array('I', (i for _, i in by_hash))
+
+    with open(output_filepath, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(names), len(chapters), len(word_bits),
+                            len(link_targets), row_size, len(blob)))
+        for arr in (name_offsets, name_hashes, hash_names, name_chapters, name_words,
+                    link_starts, link_targets, chapter_names):
+            _little_endian(arr).tofile(f)
+        f.write(bitsets)
+        f.write(blob)
+
+    print(f"Saved network index to {output_filepath} ({len(word_bits):,} words, "
+          f"{len(chapters):,} chapters, {Path(output_filepath).stat().st_size / 1024:.0f} KB)")
+
+
+class NetworkIndex:
+    """Read-only view over network.bin."""
+
+    def __init__(self, filepath="network.bin"):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+
+        (magic, version, n_names, self.chapter_count, self.word_count, n_links,
+         self._row_size, names_len) = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{filepath} is not a version {VERSION} network index")
+
+        offset = HEADER.size
+
+        def section(fmt, count):
+            nonlocal offset
+            size = struct.calcsize(fmt) * count
+            view = buf[offset:offset + size]
+            offset += size + _pad(size)
+            if sys.byteorder == 'little':
+                return view.cast(fmt)
+            arr = array(fmt, view)
+            arr.byteswap()
+            return arr
+
+        self.name_offsets = section('I', n_names + 1)
+        self.name_hashes = section('I', n_names)
+        self.hash_names = section('I', n_names)
+        self.name_chapters = section('I', n_names)
+        self.name_words = section('I', n_names)
+        self.link_starts = section('I', n_names + 1)
+        self.link_targets = section('I', n_links)
+        self.chapter_names = section('I', self.chapter_count)
+        self.bitsets = buf[offset:offset + self.word_count * self._row_size]
+        offset += self.word_count * self._row_size
+        self.names = buf[offset:offset + names_len]
+        self._len = n_names
+
+    def name(self, i: int) -> str:
+        return str(self.names[self.name_offsets[i]:self.name_offsets[i + 1]], 'utf-8')
+
+    def find(self, name: str) -> int:
+        """Name id of a node or chain word, or -1."""
+        # Hashes are searched in C by bisect; names sharing a hash are adjacent
+        target = name.encode('utf-8')
+        name_hash = zlib.crc32(target)
+        hashes, offsets = self.name_hashes, self.name_offsets
+        i = bisect_left(hashes, name_hash)
+        while i < self._len and hashes[i] == name_hash:
+            name_id = self.hash_names[i]
+            if self.names[offsets[name_id]:offsets[name_id + 1]] == target:
+                return name_id
+            i += 1
+        return -1
+
+    def _bits(self, name_id: int) -> int:
+        row = self.name_words[name_id]
+        if row == NONE:
+            return 0
+        size = self._row_size
+        return int.from_bytes(self.bitsets[row * size:(row + 1) * size], 'little')
+
+    def word_bits(self, word: str) -> int:
+        """Bitset of chapters whose chain contains word."""
+        name_id = self.find(word)
+        return self._bits(name_id) if name_id >= 0 else 0
+
+    def words(self) -> list[str]:
+        """Every word that appears in some chapter chain, sorted."""
+        return [self.name(i) for i in range(self._len) if self.name_words[i] != NONE]
+
+    def is_chapter(self, name: str) -> bool:
+        name_id = self.find(name)
+        return name_id >= 0 and self.name_chapters[name_id] != NONE
+
+    def outgoing(self, name: str) -> list[str]:
+        """Link targets of a node, in link order."""
+        name_id = self.find(name)
+        if name_id < 0:
+            return []
+        return [self.name(i) for i in self.link_targets[self.link_starts[name_id]:self.link_starts[name_id + 1]]]
+
+    def reachable(self, path: list) -> int:
+        """Bitset of chapters whose chain contains every word in path."""
+        if not path:
+            return 0
+        bits = self.word_bits(path[0])
+        for word in path[1:]:
+            bits &= self.word_bits(word)
+            if not bits:
+                break
+        return bits
+
+    def chapters_in(self, bits: int) -> list[str]:
+        """Expand a chapter bitset into chapter ids (in network order)."""
+        chapters = []
+        while bits:
+            low = bits & -bits
+            chapters.append(self.name(self.chapter_names[low.bit_length() - 1]))
+            bits ^= low
+        return chapters
+
+    def valid_next(self, path: list) -> list[str]:
+        """Nodes linked from the last path node that keep at least one chapter reachable."""
+        if not path:
+            return []
+        reachable = self.reachable(path)
+        if not reachable:
+            return []
+        source = self.find(path[-1])
+        if source < 0:
+            return []
+
+        # Hot loop (a node can have hundreds of links): sections bound to locals
+        names, offsets, bitsets, size = self.names, self.name_offsets, self.bitsets, self._row_size
+        name_chapters, name_words = self.name_chapters, self.name_words
+        valid = []
+        for target in self.link_targets[self.link_starts[source]:self.link_starts[source + 1]]:
+            chapter = name_chapters[target]
+            if chapter != NONE:
+                hit = reachable >> chapter & 1
+            else:
+                row = name_words[target]
+                hit = row != NONE and reachable & int.from_bytes(bitsets[row * size:(row + 1) * size], 'little')
+            if hit:
+                valid.append(str(names[offsets[target]:offsets[target + 1]], 'utf-8'))
+        return valid
+
+
+def load_network_index(filepath="network.bin"):
+    """Map the index if the network has been built, otherwise None."""
+    if not Path(filepath).exists():
+        print(f"Network index not found at {filepath} - run build_network.py first")
+        return None
+    index = NetworkIndex(filepath)
+    print(f"Mapped network index {filepath} ({index.word_count:,} words, {index.chapter_count:,} chapters)")
+    return index
+
+
+if __name__ == "__main__":
+    index_file = sys.argv[1] if len(sys.argv) > 1 else "network.bin"
+    path = sys.argv[2:] or ["god"]
+
+    index = NetworkIndex(index_file)
+    reachable = index.reachable(path)
+    print(f"{' -> '.join(path)}: {reachable.bit_count()} chapters")
+    print(f"  next: {', '.join(index.valid_next(path)) or '-'}")
+    print(f"  chapters: {', '.join(index.chapters_in(reachable)[:10]) or '-'}")
@@ -0,0 +1,455 @@
+"""
+Positional Verse Index
+Every verse's tokens with their positions, so multi-word queries are
+answered by intersecting positional postings instead of rescanning text:
+
+    "living water"          exact phrase
+    "bread life"~3          ordered: the words in this order, with at most
+                            3 other tokens between them in total
+    faith NEAR/5 works      both words within 5 tokens, in either order
+
+Tokens are the lowercase [a-zA-Z]+ runs of the verse (the concordance's
+tokenizer), stopwords included, so phrases match exactly as written.
+build_concordance.py writes the index to concordance.pos, along with each
+term's lemma group from the lemma table (the forms a boolean query for any
+one of them matches), so the server never loads lemma_table.json.
+
+Layout (little-endian, sections 4-byte aligned):
+    header          magic, version, counts and section sizes
+    chapters        JSON list of chapter keys
+    verse_chapter   u32[verses]          chapter id of each verse
+    verse_numbers   u16[verses]
+    text_offsets    u32[verses + 1]      byte offset of each verse in the text blob
+    term_offsets    u32[terms + 1]       sorted term string table
+    term_postings   u32[terms + 1]       first posting of each term
+    posting_verses  u32[postings]        verse id of each posting (ascending per term)
+    posting_starts  u32[postings + 1]    first position of each posting
+    positions       u16[positions]       token positions (ascending per posting)
+    form_offsets    u32[forms + 1]       sorted string table of terms, lemmas and lemma table words
+    form_lemmas     u32[forms]           lemma group of each form
+    lemma_starts    u32[lemmas + 1]      first entry of each lemma group
+    lemma_terms     u32[terms]           term ids in each lemma group (ascending)
+    terms           UTF-8 terms, concatenated
+    forms           UTF-8 forms, concatenated
+    texts           UTF-8 verse texts, concatenated
+
+Usage: python positional_index.py [concordance.pos] [query ...]
+"""
+
+import bisect
+import json
+import mmap
+import re
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+MAGIC = b"BCPI"
+VERSION = 2
+# magic, version, verses, terms, postings, positions, forms, lemmas, then
+# chapters, terms, forms, texts bytes
+HEADER = struct.Struct("<4sIIIIIIIIIII")
+
+TOKEN_PATTERN = re.compile(r'[a-zA-Z]+')
+PHRASE_QUERY = re.compile(r'^"([^"]+)"(?:~(\d+))?$')
+NEAR_QUERY = re.compile(r'^(\S+)\s+NEAR/(\d+)\s+(\S+)$', re.IGNORECASE)
+
+
+def _pad(n):
+    return (4 - n % 4) % 4
+
+
+def _little_endian(arr):
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def tokenize(text: str) -> list[str]:
+    return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+
+def write_positional_index(chapters: dict, output_filepath="concordance.pos", lemmas: dict = None):
+    """
+    Write the index for {chapter_key: {"verses": [{ref, text}]}} (as
+    build_concordance.parse_bible returns), verse ids in corpus order.
+    lemmas maps surface forms to lemmas (LemmaTable().lemmas); without it
+    every term is its own lemma group.
+    """
+    chapter_keys = list(chapters)
+    verse_chapter = array('I')
+    verse_numbers = array('H')
+    text_offsets = array('I', [0])
+    texts = bytearray()
+    term_postings = {}  # term -> ([verse ids], [position lists])
+
+    for chapter_id, chapter_key in enumerate(chapter_keys):
+        for verse in chapters[chapter_key]["verses"]:
+            verse_id = len(verse_chapter)
+            verse_chapter.append(chapter_id)
+            verse_numbers.append(int(verse["ref"].rsplit(':', 1)[1]))
+            texts += verse["text"].encode('utf-8')
+            text_offsets.append(len(texts))
+
+            verse_positions = {}
+            for position, token in enumerate(tokenize(verse["text"])):
+                verse_positions.setdefault(token, []).append(position)
+            for token, positions in verse_positions.items():
+                verses, position_lists = term_postings.setdefault(token, ([], []))
+                verses.append(verse_id)
+                position_lists.append(positions)
+
+    terms = sorted(term_postings)
+    term_offsets = array('I', [0])
+    term_starts = array('I', [0])
+    posting_verses = array('I')
+    posting_starts = array('I', [0])
+    positions = array('H')
+    term_blob = bytearray()
+    for term in terms:
+        verses, position_lists = term_postings[term]
+        term_blob += term.encode('utf-8')
+        term_offsets.append(len(term_blob))
+        posting_verses.extend(verses)
+        for position_list in position_lists:
+            positions.extend(position_list)
+            posting_starts.append(len(positions))
+        term_starts.append(len(posting_verses))
+
+    # A word resolves to its lemma's group: a term, a lemma, or a lemma table
+    # word that isn't in the text itself ("ran" finds "run" and "runneth")
+    lemmas = lemmas or {}
+    groups = {}
+    for term_id, term in enumerate(terms):
+        groups.setdefault(lemmas.get(term, term), []).append(term_id)
+    lemma_list = sorted(groups)
+    lemma_ids = {lemma: i for i, lemma in enumerate(lemma_list)}
+    form_map = {}
+    for word in (*lemmas, *lemma_list, *terms):
+        lemma = lemmas.get(word, word)
+        if lemma in lemma_ids:
+            form_map[word] = lemma_ids[lemma]
+    forms = sorted(form_map)
+    form_offsets = array('I', [0])
+    form_lemmas = array('I', (form_map[form] for form in forms))
+    form_blob = bytearray()
+    for form in forms:
+        form_blob += form.encode('utf-8')
+        form_offsets.append(len(form_blob))
+    lemma_starts = array('I', [0])
+    lemma_terms = array('I')
+    for lemma in lemma_list:
+        lemma_terms.extend(groups[lemma])
+        lemma_starts.append(len(lemma_terms))
+
+    chapters_bytes = json.dumps(chapter_keys, ensure_ascii=False).encode('utf-8')
+    with open(output_filepath, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(verse_chapter), len(terms), len(posting_verses),
+                            len(positions), len(forms), len(lemma_list), len(chapters_bytes),
+                            len(term_blob), len(form_blob), len(texts)))
+        f.write(chapters_bytes + b"\0" * _pad(len(chapters_bytes)))
+        _little_endian(verse_chapter).tofile(f)
+        _little_endian(verse_numbers).tofile(f)
+        f.write(b"\0" * _pad(2 * len(verse_numbers)))
+        for arr in (text_offsets, term_offsets, term_starts, posting_verses, posting_starts):
+            _little_endian(arr).tofile(f)
+        _little_endian(positions).tofile(f)
+        f.write(b"\0" * _pad(2 * len(positions)))
+        for arr in (form_offsets, form_lemmas, lemma_starts, lemma_terms):
+            _little_endian(arr).tofile(f)
+        f.write(term_blob + b"\0" * _pad(len(term_blob)))
+        f.write(form_blob + b"\0" * _pad(len(form_blob)))
+        f.write(texts)
+
+    print(f"Saved positional index to {output_filepath} ({len(terms):,} terms, "
+          f"{len(positions):,} positions, {Path(output_filepath).stat().st_size / 1024 / 1024:.1f} MB)")
+
+
+def parse_query(query: str) -> tuple[str, list[str], int]:
+    """
+    (kind, words, k) for a query string: "a b" is a phrase, "a b"~k an
+    ordered sequence with up to k tokens in between, a NEAR/k b proximity.
+    Bare words are treated as a phrase.
+    """
+    query = query.strip()
+    match = PHRASE_QUERY.match(query)
+    if match:
+        words = tokenize(match.group(1))
+        if match.group(2) is None:
+            return "phrase", words, 0
+        return "ordered", words, int(match.group(2))
+    match = NEAR_QUERY.match(query)
+    if match:
+        words = tokenize(match.group(1)) + tokenize(match.group(3))
+        if len(words) != 2:
+            raise ValueError("NEAR takes one word on each side")
+        return "near", words, int(match.group(2))
+    if '"' in query or re.search(r'\bNEAR/', query, re.IGNORECASE):
+        raise ValueError(f"Cannot parse query: {query}")
+    return "phrase", tokenize(query), 0
+
+
+class PositionalIndex:
+    """Read-only view over concordance.pos."""
+
+    def __init__(self, filepath="concordance.pos"):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+
+        (magic, version, n_verses, n_terms, n_postings, n_positions, n_forms, n_lemmas,
+         chapters_len, terms_len, forms_len, texts_len) = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{filepath} is not a version {VERSION} positional index")
+
+        offset = HEADER.size
+
+        def blob(length):
+            nonlocal offset
+            view = buf[offset:offset + length]
+            offset += length + _pad(length)
+            return view
+
+        def section(fmt, count):
+            nonlocal offset
+            size = struct.calcsize(fmt) * count
+            view = buf[offset:offset + size]
+            offset += size + _pad(size)
+            if sys.byteorder == 'little':
+                return view.cast(fmt)
+            arr = array(fmt, view)
+            arr.byteswap()
+            return arr
+
+        self.chapters = json.loads(bytes(blob(chapters_len)))
+        self.verse_chapter = section('I', n_verses)
+        self.verse_numbers = section('H', n_verses)
+        self.text_offsets = section('I', n_verses + 1)
+        self.term_offsets = section('I', n_terms + 1)
+        self.term_starts = section('I', n_terms + 1)
+        self.posting_verses = section('I', n_postings)
+        self.posting_starts = section('I', n_postings + 1)
+        self.positions = section('H', n_positions)
+        self.form_offsets = section('I', n_forms + 1)
+        self.form_lemmas = section('I', n_forms)
+        self.lemma_starts = section('I', n_lemmas + 1)
+        self.lemma_terms = section('I', n_terms)
+        self.terms = blob(terms_len)
+        self.forms = blob(forms_len)
+        self.texts = blob(texts_len)
+        self.verse_count = n_verses
+        self._len = n_terms
+        self._n_forms = n_forms
+
+    def __len__(self):
+        return self._len
+
+    def close(self):
+        for name in ("verse_chapter", "verse_numbers", "text_offsets", "term_offsets", "term_starts",
+                     "posting_verses", "posting_starts", "positions", "form_offsets", "form_lemmas",
+                     "lemma_starts", "lemma_terms", "terms", "forms", "texts"):
+            view = getattr(self, name)
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def term(self, i: int) -> bytes:
+        return bytes(self.terms[self.term_offsets[i]:self.term_offsets[i + 1]])
+
+    def find(self, term: str) -> int:
+        """Position of term in the sorted term table, or -1."""
+        target = term.encode('utf-8')
+        lo, hi = 0, self._len
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.term(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._len and self.term(lo) == target:
+            return lo
+        return -1
+
+    def _form(self, i: int) -> bytes:
+        return bytes(self.forms[self.form_offsets[i]:self.form_offsets[i + 1]])
+
+    def lemma_group(self, word: str) -> int:
+        """Lemma group of a word (any surface form of the lemma, or the lemma), or -1."""
+        target = word.encode('utf-8')
+        lo, hi = 0, self._n_forms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._form(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n_forms and self._form(lo) == target:
+            return self.form_lemmas[lo]
+        return -1
+
+    def group_terms(self, group: int):
+        """Term ids of every form in a lemma group (none for group -1)."""
+        if group < 0:
+            return ()
+        return self.lemma_terms[self.lemma_starts[group]:self.lemma_starts[group + 1]]
+
+    def posting_range(self, term: str) -> tuple[int, int]:
+        """[first, last) posting indexes of a term (empty if not indexed)."""
+        i = self.find(term)
+        if i < 0:
+            return 0, 0
+        return self.term_starts[i], self.term_starts[i + 1]
+
+    def verse_frequency(self, term: str) -> int:
+        first, last = self.posting_range(term)
+        return last - first
+
+    def verse_positions(self, posting: int):
+        return self.positions[self.posting_starts[posting]:self.posting_starts[posting + 1]]
+
+    def verse_text(self, verse_id: int) -> str:
+        return str(self.texts[self.text_offsets[verse_id]:self.text_offsets[verse_id + 1]], 'utf-8')
+
+    def verse_ref(self, verse_id: int) -> str:
+        return f"{self.chapters[self.verse_chapter[verse_id]]}:{self.verse_numbers[verse_id]}"
+
+    def _intersect(self, words):
+        """
+        Yield (verse_id, [posting per word]) for verses containing every
+        word. Walks the rarest word's postings and binary-searches the
+        others from where the last search ended.
+        """
+        ranges = [self.posting_range(word) for word in words]
+        if any(first == last for first, last in ranges):
+            return
+        verses = self.posting_verses
+        rarest = min(range(len(words)), key=lambda i: ranges[i][1] - ranges[i][0])
+        cursors = [first for first, _ in ranges]
+
+        for posting in range(*ranges[rarest]):
+            verse_id = verses[posting]
+            found = []
+            for i, (_, last) in enumerate(ranges):
+                if i == rarest:
+                    found.append(posting)
+                    continue
+                j = bisect.bisect_left(verses, verse_id, cursors[i], last)
+                cursors[i] = j
+                if j == last:
+                    return
+                if verses[j] != verse_id:
+                    break
+                found.append(j)
+            else:
+                yield verse_id, found
+
+    def phrase(self, words: list[str]) -> list[tuple[int, int, int]]:
+        """(verse_id, first, last token position) of each exact occurrence."""
+        matches = []
+        for verse_id, postings in self._intersect(words):
+            position_sets = [set(self.verse_positions(p)) for p in postings[1:]]
+            for start in self.verse_positions(postings[0]):
+                if all(start + i + 1 in positions for i, positions in enumerate(position_sets)):
+                    matches.append((verse_id, start, start + len(words) - 1))
+        return matches
+
+    def ordered(self, words: list[str], slop: int) -> list[tuple[int, int, int]]:
+        """
+        Occurrences of the words in order with at most `slop` other tokens
+        between them in total, one (the shortest) per starting position.
+        """
+        matches = []
+        limit = len(words) - 1 + slop
+        for verse_id, postings in self._intersect(words):
+            position_lists = [self.verse_positions(p) for p in postings]
+            for start in position_lists[0]:
+                # Earliest next occurrence of each word gives the shortest span
+                position = start
+                for positions in position_lists[1:]:
+                    j = bisect.bisect_right(positions, position)
+                    if j == len(positions):
+                        position = None
+                        break
+                    position = positions[j]
+                    if position - start > limit:
+                        break
+                if position is not None and position - start <= limit:
+                    matches.append((verse_id, start, position))
+        return matches
+
+    def near(self, first: str, second: str, k: int) -> list[tuple[int, int, int]]:
+        """Pairs of the two words within k tokens of each other, in either order."""
+        matches = []
+        for verse_id, (a, b) in self._intersect([first, second]):
+            a_positions = self.verse_positions(a)
+            b_positions = self.verse_positions(b)
+            for position in a_positions:
+                # The same word twice: count each pair once, from its first word
+                lo = bisect.bisect_left(b_positions, position + 1 if a == b else position - k)
+                hi = bisect.bisect_right(b_positions, position + k)
+                for other in b_positions[lo:hi]:
+                    if other != position:
+                        matches.append((verse_id, min(position, other), max(position, other)))
+        return matches
+
+    def search(self, query: str) -> tuple[str, list[str], list[tuple[int, int, int]]]:
+        """Parse and run a query string; returns (kind, words, matches)."""
+        kind, words, k = parse_query(query)
+        if not words:
+            return kind, words, []
+        if kind == "near":
+            return kind, words, self.near(words[0], words[1], k)
+        if kind == "ordered":
+            return kind, words, self.ordered(words, k)
+        return kind, words, self.phrase(words)
+
+    def token_spans(self, verse_id: int) -> list[tuple[int, int]]:
+        """Character (start, end) of every token of a verse, for highlighting."""
+        return [match.span() for match in TOKEN_PATTERN.finditer(self.verse_text(verse_id))]
+
+    def results(self, matches, limit=50) -> list[dict]:
+        """Group matches by verse (corpus order), with character spans to highlight."""
+        by_verse = {}
+        for verse_id, first, last in matches:
+            by_verse.setdefault(verse_id, []).append((first, last))
+
+        results = []
+        for verse_id in sorted(by_verse)[:limit]:
+            spans = self.token_spans(verse_id)
+            results.append({
+                "ref": self.verse_ref(verse_id),
+                "chapter": self.chapters[self.verse_chapter[verse_id]],
+                "verse": self.verse_numbers[verse_id],
+                "text": self.verse_text(verse_id),
+                "highlights": [[spans[first][0], spans[last][1]] for first, last in by_verse[verse_id]],
+            })
+        return results
+
+
+def open_positional_index(filepath="concordance.pos"):
+    """Open the index if it has been built, otherwise None."""
+    if not Path(filepath).exists():
+        return None
+    index = PositionalIndex(filepath)
+    print(f"Mapped positional index {filepath} ({len(index):,} terms, {index.verse_count:,} verses)")
+    return index
+
+
+if __name__ == "__main__":
+    import time
+
+    index_file = sys.argv[1] if len(sys.argv) > 1 else "concordance.pos"
+    queries = sys.argv[2:] or ['"living water"', '"the lord is my shepherd"', '"bread life"~2',
+                               'faith NEAR/5 works', 'love NEAR/3 neighbor']
+    index = PositionalIndex(index_file)
+    for query in queries:
+        start = time.perf_counter()
+        kind, words, matches = index.search(query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        verses = len({verse_id for verse_id, _, _ in matches})
+        print(f"\n{query}  ({kind}, {verses} verses, {elapsed_ms:.2f} ms)")
+        for result in index.results(matches, limit=5):
+            print(f"  {result['ref']}: {result['text'][:100]}")
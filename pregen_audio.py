@@ -0,0 +1,169 @@
+"""
+Pre-generate TTS Audio for Every Chapter
+Synthesizes all chapters from chapters.json (build_chapters.py) into the
+server's audio cache, so the first Play of any chapter is served straight
+from disk.
+
+Chapter text is cleaned exactly like the reader does before calling
+/api/tts, and synthesized with the engine's default voice (the only one
+the server uses), so the cache keys match what the browser will request.
+
+Runs with bounded concurrency, retries failed chapters with backoff, and
+resumes where it left off (chapters already in the cache are skipped).
+
+Usage: python pregen_audio.py [--engine edge|local|stub] [--concurrency 4]
+                              [--retries 3] [--limit N]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+
+from tts_cache import AudioCache, cache_key
+from tts_engines import ENGINES, StubEngine, create_engines
+
+QUOTES = re.compile("[\u2018\u2019\u201a\u201b\u201c\u201d\u201e\u201f\u00ab\u00bb\"']")
+ALL_CAPS = re.compile(r'\b[A-Z]{2,}\b')
+
+
+def chapter_tts_text(verses: list[dict]) -> str:
+    """Build the text the reader sends to /api/tts for a chapter."""
+    text = " ".join(v["text"] for v in verses)
+    text = text.replace('*', '')
+    text = text.replace('[', '').replace(']', '')
+    text = QUOTES.sub('', text)
+    text = ALL_CAPS.sub(lambda m: m.group(0)[0] + m.group(0)[1:].lower(), text)  # ALL CAPS -> Title case
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+class PregenStats:
+    def __init__(self, total: int, skipped: int):
+        self.total = total
+        self.skipped = skipped
+        self.done = 0
+        self.failed = []
+        self.bytes = 0
+        self.retries = 0
+        self.start_time = time.time()
+
+    @property
+    def elapsed(self):
+        return time.time() - self.start_time
+
+    def report_progress(self, chapter_key: str, size: int):
+        elapsed = self.elapsed
+        rate = self.done / elapsed * 60 if elapsed else 0
+        print(f"  [{self.done + self.skipped}/{self.total}] {chapter_key}: {size / 1024:.0f} KB "
+              f"({rate:.1f} chapters/min)")
+
+    def print_final_stats(self):
+        elapsed = self.elapsed
+        minutes = elapsed / 60 if elapsed else 0
+        print(f"\n{'='*60}")
+        print("AUDIO PRE-GENERATION COMPLETE")
+        print(f"{'='*60}")
+        print(f"  Synthesized: {self.done} chapters ({self.skipped} already cached)")
+        print(f"  Failed: {len(self.failed)}")
+        print(f"  Retries: {self.retries}")
+        print(f"  Audio written: {self.bytes / 1024 / 1024:.1f} MB")
+        print(f"  Time: {elapsed:.1f}s")
+        if minutes:
+            print(f"  Throughput: {self.done / minutes:.1f} chapters/min, "
+                  f"{self.bytes / 1024 / 1024 / minutes:.1f} MB/min")
+        if self.failed:
+            print(f"  Failed chapters: {', '.join(self.failed)}")
+        print(f"{'='*60}")
+
+
+async def synthesize_chapter(cache, key, text, voice, synthesize, retries, stats):
+    """Synthesize one chapter into the cache, retrying with backoff. Returns bytes written."""
+    for attempt in range(retries + 1):
+        writer = cache.writer(key)
+        try:
+            async for data in synthesize(text, voice):
+                writer.write(data)
+        except Exception as e:
+            writer.abort()
+            if attempt == retries:
+                raise
+            delay = 2 ** attempt
+            stats.retries += 1
+            print(f"    Attempt {attempt + 1}/{retries + 1} failed: {e} - retrying in {delay}s")
+            await asyncio.sleep(delay)
+            continue
+        writer.commit()
+        return writer.size
+
+
+async def pregen_audio(chapters_filepath="chapters.json", cache_dir="audio_cache", engine=None,
+                       concurrency=4, retries=3, limit=None,
+                       max_bytes=4 * 1024 ** 3) -> PregenStats:
+    """Synthesize every chapter not yet in the cache with engine (default: Edge)."""
+    engine = engine or create_engines()["edge"]
+    voice = engine.default_voice
+    print(f"Loading {chapters_filepath}...")
+    with open(chapters_filepath, 'r', encoding='utf-8') as f:
+        chapters = json.load(f)
+
+    cache = AudioCache(cache_dir, max_bytes)
+
+    jobs = []
+    for chapter_key in chapters["order"]:
+        text = chapter_tts_text(chapters["chapters"][chapter_key]["verses"])
+        jobs.append((chapter_key, cache_key(engine.cache_voice(voice), text), text))
+    if limit:
+        jobs = jobs[:limit]
+
+    pending = [job for job in jobs if job[1] not in cache]
+    stats = PregenStats(len(jobs), len(jobs) - len(pending))
+    print(f"  {len(jobs)} chapters, {stats.skipped} already cached, {len(pending)} to synthesize")
+    print(f"  Engine: {engine.name} | Voice: {voice} | Concurrency: {concurrency} | Retries: {retries}")
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(chapter_key, key, text):
+        async with semaphore:
+            try:
+                size = await synthesize_chapter(cache, key, text, voice, engine.stream, retries, stats)
+            except Exception as e:
+                print(f"  FAILED {chapter_key}: {e}")
+                stats.failed.append(chapter_key)
+                return
+            stats.done += 1
+            stats.bytes += size
+            stats.report_progress(chapter_key, size)
+
+    await asyncio.gather(*(run(*job) for job in pending))
+
+    stats.print_final_stats()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate chapter audio into the TTS cache")
+    parser.add_argument("--chapters", default="chapters.json", help="output of build_chapters.py")
+    parser.add_argument("--cache-dir", default="audio_cache")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="edge")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=None, help="only the first N chapters")
+    parser.add_argument("--stub", action="store_true",
+                        help="shorthand for --engine stub, without throttling")
+    args = parser.parse_args()
+
+    if args.stub:
+        engine = StubEngine(speed=0, latency=0)
+    else:
+        engine = create_engines()[args.engine]
+    if not engine.available():
+        parser.exit(1, f"TTS engine '{engine.name}' is not available on this machine\n")
+
+    asyncio.run(pregen_audio(
+        args.chapters, args.cache_dir, engine,
+        concurrency=args.concurrency,
+        retries=args.retries,
+        limit=args.limit,
+    ))
@@ -1,31 +1,196 @@
 #!/usr/bin/env python3
 """
-Bible Visualization Server with streaming Edge TTS.
+Bible Visualization Server with streaming TTS (Edge by default, see tts_engines).
 Uses aiohttp for proper chunked streaming to browsers.
+
+    python server.py                      # local: free port, opens a browser
+    python server.py --host 0.0.0.0 --port 8080 --workers 4 --no-browser
+
+With --workers N, N processes share the port through SO_REUSEPORT and the
+kernel spreads connections across them. Every index the server queries is
+an mmap'd build artifact (chapters.bin, concordance.idx/.pos/.rank/.spell/
+.vocab, network.bin), so every worker shares the same page-cache pages
+instead of holding its own copy. What each worker still holds privately is
+small: the boolean engine's cache of term postings (filled as terms are
+queried; a few MB once every term has been), and the JSON fallbacks used
+only while concordance.idx or chapters.bin is missing or stale. TTS
+admission limits are per worker, so N workers admit N times as many.
+
+Behind a load balancer every request comes from the proxy's address, so
+pass --trusted-proxy ADDR (once per proxy) to key per-client TTS limits on
+the Forwarded / X-Forwarded-For client instead, or --tts-per-client 0 to
+turn the per-client limit off.
 """
 
+import argparse
 import asyncio
+import multiprocessing
 import os
+import signal
 import socket
+import time
 import webbrowser
 from aiohttp import web
-import edge_tts
 
-VOICE = "en-IE-EmilyNeural"
+from bm25_index import open_bm25_index
+from boolean_query import LEVELS, open_boolean_index
+from chapter_store import open_chapter_store
+from concordance_index import load_concordance_index
+from concordance_spelling import open_spelling_index
+from concordance_store import open_concordance_store
+from concordance_vocab import open_vocabulary_index
+from metrics import MetricsRegistry
+from network_index import load_network_index
+from positional_index import open_positional_index
+from static_artifacts import ARTIFACTS, ArtifactStore, parse_range
+from tts_admission import Admission, AdmissionRejected
+from tts_cache import AudioCache, cache_key
+from tts_pipeline import pipelined_synthesize, split_segments
+from tts_engines import ENGINES, create_engines
+from tts_singleflight import SingleFlight
+
+TTS_ENGINE = "edge"  # default engine; requests may pick another with "engine"
+CONCORDANCE_FILE = "concordance.json"
+CONCORDANCE_STORE_FILE = "concordance.idx"
+POSITIONAL_INDEX_FILE = "concordance.pos"
+RANK_INDEX_FILE = "concordance.rank"
+SPELLING_INDEX_FILE = "concordance.spell"
+VOCABULARY_INDEX_FILE = "concordance.vocab"
+CHAPTER_STORE_FILE = "chapters.bin"
+CHAPTERS_FILE = "chapters.json"
+NETWORK_INDEX_FILE = "network.bin"
+TTS_CACHE_DIR = "audio_cache"
+TTS_CACHE_MAX_BYTES = 4 * 1024 ** 3  # whole Bible at Edge's 48 kbit/s is ~1.6 GB
+
+# Texts at least this long are synthesized as sentence segments in parallel
+TTS_PIPELINE_MIN_CHARS = 600
+TTS_PIPELINE_CONCURRENCY = 4
+
+# Admission control for new upstream syntheses (cache hits and joins are free),
+# per worker process
+TTS_MAX_ACTIVE = 8          # each may use TTS_PIPELINE_CONCURRENCY upstream calls
+TTS_MAX_PER_CLIENT = 2      # 0: no per-client limit
+TTS_MAX_QUEUE = 32
+TTS_MAX_QUEUE_WAIT = 15.0   # seconds before a queued request gets a 429
 
-def find_open_port(start=8000, end=9000):
+STATIC_CHUNK_SIZE = 256 * 1024
+
+TTS_HEADERS = {
+    'Content-Type': 'audio/mpeg',
+    'Cache-Control': 'no-cache',
+    'Access-Control-Allow-Origin': '*',
+}
+
+metrics = MetricsRegistry()
+REQUEST_SECONDS = metrics.histogram(
+    'http_request_duration_seconds', 'Time to handle a request, by route', ('method', 'route'))
+REQUESTS = metrics.counter(
+    'http_requests_total', 'Requests handled, by route and status', ('method', 'route', 'status'))
+TTS_TTFB_SECONDS = metrics.histogram(
+    'tts_ttfb_seconds', 'Time from TTS request to first audio byte', ('source',))
+TTS_SYNTHESIS_SECONDS = metrics.histogram(
+    'tts_synthesis_seconds', 'Upstream synthesis time per completed clip', ('engine',))
+TTS_UPSTREAM_FIRST_CHUNK_SECONDS = metrics.histogram(
+    'tts_upstream_first_chunk_seconds', 'Time from starting synthesis to the first upstream audio chunk',
+    ('engine',))
+TTS_BYTES = metrics.counter(
+    'tts_bytes_streamed_total', 'Audio bytes sent to clients', ('source',))
+TTS_ACTIVE_STREAMS = metrics.gauge(
+    'tts_active_streams', 'TTS responses currently streaming')
+TTS_CACHE_LOOKUPS = metrics.counter(
+    'tts_cache_lookups_total', 'TTS disk cache lookups', ('result',))
+TTS_ADMISSION_WAIT_SECONDS = metrics.histogram(
+    'tts_admission_wait_seconds', 'Time a new synthesis waited in the admission queue')
+TTS_REJECTIONS = metrics.counter(
+    'tts_admission_rejections_total', 'TTS requests rejected with 429', ('reason',))
+TTS_ADMISSION_ACTIVE = metrics.gauge(
+    'tts_admission_active', 'Upstream syntheses holding an admission slot')
+TTS_ADMISSION_QUEUE = metrics.gauge(
+    'tts_admission_queue_depth', 'Requests waiting for an admission slot')
+TTS_FLIGHTS = metrics.counter(
+    'tts_flights_total', 'Cache misses that started a synthesis or joined one in flight', ('result',))
+
+def find_open_port(start=8000, end=9000, host='localhost'):
     """Find an available port in the given range."""
     for port in range(start, end):
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.bind(('localhost', port))
+                s.bind((host, port))
                 return port
         except OSError:
             continue
     raise RuntimeError(f"No open port found in range {start}-{end}")
 
+def synthesize(text, engine, voice):
+    """One engine call for short texts; sentence segments in parallel for long ones."""
+    segments = split_segments(text) if len(text) >= TTS_PIPELINE_MIN_CHARS else [text]
+    if len(segments) < 2:
+        return engine.stream(text, voice)
+    return pipelined_synthesize(segments, lambda segment: engine.stream(segment, voice),
+                                TTS_PIPELINE_CONCURRENCY)
+
+async def synthesize_to_cache(cache, key, text, engine, voice):
+    """Yield TTS audio chunks while writing them into the cache (tee)."""
+    writer = cache.writer(key)
+    start = time.perf_counter()
+    first_chunk = True
+    try:
+        async for data in synthesize(text, engine, voice):
+            if first_chunk:
+                TTS_UPSTREAM_FIRST_CHUNK_SECONDS.observe(time.perf_counter() - start, engine.name)
+                first_chunk = False
+            writer.write(data)
+            yield data
+    except BaseException:
+        writer.abort()
+        raise
+    TTS_SYNTHESIS_SECONDS.observe(time.perf_counter() - start, engine.name)
+    writer.commit()
+
+def _forwarded_host(value: str) -> str:
+    """Address of a Forwarded for= / X-Forwarded-For entry, without quotes, brackets or port."""
+    value = value.strip().strip('"')
+    if value.startswith('['):
+        return value[1:value.find(']')]
+    if value.count(':') == 1:
+        return value.split(':')[0]
+    return value
+
+def client_address(request) -> str:
+    """
+    The client to apply per-client limits to. Requests from a trusted proxy
+    are keyed on the nearest untrusted address in Forwarded, or failing
+    that X-Forwarded-For, walking back from the proxy.
+    """
+    remote = request.remote or 'unknown'
+    trusted = request.app['trusted_proxies']
+    if remote not in trusted:
+        return remote
+    hops = [_forwarded_host(element['for']) for element in request.forwarded if 'for' in element]
+    if not hops:
+        hops = [_forwarded_host(hop) for hop in request.headers.get('X-Forwarded-For', '').split(',')
+                if hop.strip()]
+    for hop in reversed(hops):
+        if hop not in trusted:
+            return hop
+    return hops[0] if hops else remote
+
+def serve_cached(key, text, cache, received):
+    """FileResponse for a cached clip, or None on a miss."""
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    size = cached.stat().st_size
+    print(f"TTS cache hit for {len(text)} chars ({size} bytes)")
+    TTS_CACHE_LOOKUPS.inc(1, 'hit')
+    TTS_BYTES.inc(size, 'cache')
+    # sendfile starts right after this returns; close enough for TTFB
+    TTS_TTFB_SECONDS.observe(time.perf_counter() - received, 'cache')
+    return web.FileResponse(cached, headers=TTS_HEADERS)
+
 async def handle_tts(request):
-    """Stream TTS audio as it's generated."""
+    """Serve TTS audio from the disk cache, or stream it as it's generated."""
+    received = time.perf_counter()
     try:
         data = await request.json()
         text = data.get('text', '')
@@ -33,25 +198,92 @@ async def handle_tts(request):
         if not text:
             return web.Response(status=400, text="No text provided")
         
-        print(f"TTS streaming audio for {len(text)} chars...")
+        engine_name = data.get('engine') or request.app['tts_engine']
+        engine = request.app['tts_engines'].get(engine_name)
+        if engine is None:
+            return web.Response(status=400, text=f"Unknown TTS engine: {engine_name}")
+        if not engine.available():
+            return web.Response(status=503, text=f"TTS engine not available: {engine_name}")
+        voice = engine.default_voice
         
-        response = web.StreamResponse(
-            status=200,
-            headers={
-                'Content-Type': 'audio/mpeg',
-                'Cache-Control': 'no-cache',
-                'Access-Control-Allow-Origin': '*',
-            }
+        cache = request.app['audio_cache']
+        flights = request.app['tts_flights']
+        key = cache_key(engine.cache_voice(voice), text)
+        cached = serve_cached(key, text, cache, received)
+        if cached is not None:
+            return cached
+        TTS_CACHE_LOOKUPS.inc(1, 'miss')
+        
+        # Starting a new upstream synthesis needs an admission slot; joining
+        # one already in flight does not
+        admission = request.app['tts_admission']
+        client = client_address(request)
+        admitted = key not in flights
+        if admitted:
+            try:
+                waited = await admission.acquire(client)
+            except AdmissionRejected as e:
+                print(f"TTS rejected for {client}: {e}")
+                TTS_REJECTIONS.inc(1, e.reason)
+                return web.Response(status=429, text=str(e), headers={
+                    'Retry-After': str(e.retry_after),
+                    'Access-Control-Allow-Origin': '*',
+                })
+            TTS_ADMISSION_WAIT_SECONDS.observe(waited)
+            
+            # The same text may have been finished while we were queued
+            cached = serve_cached(key, text, cache, received)
+            if cached is not None:
+                admission.release(client)
+                return cached
+        
+        # Identical concurrent requests share one upstream synthesis
+        flight, started = flights.join(
+            key, lambda: synthesize_to_cache(cache, key, text, engine, voice)
         )
-        await response.prepare(request)
+        if admitted:
+            if started:
+                # The slot is held for as long as the synthesis runs
+                flight.task.add_done_callback(
+                    lambda _, t=time.perf_counter(): admission.release(client, time.perf_counter() - t))
+            else:
+                admission.release(client)
         
-        communicate = edge_tts.Communicate(text, VOICE)
-        bytes_sent = 0
+        if started:
+            print(f"TTS streaming audio for {len(text)} chars...")
+        else:
+            print(f"TTS joining in-flight synthesis ({flight.size} bytes buffered, "
+                  f"{flight.subscribers - 1} other listeners)")
+        TTS_FLIGHTS.inc(1, 'started' if started else 'joined')
+        source = 'synthesis' if started else 'joined'
         
-        async for chunk in communicate.stream():
-            if chunk["type"] == "audio":
-                await response.write(chunk["data"])
-                bytes_sent += len(chunk["data"])
+        response = web.StreamResponse(status=200, headers=TTS_HEADERS)
+        try:
+            await response.prepare(request)
+        except BaseException:
+            # join() counted us as a listener; leaving may cancel the synthesis
+            flight.leave()
+            raise
+        
+        bytes_sent = 0
+        TTS_ACTIVE_STREAMS.inc()
+        try:
+            async for data in flight.subscribe():
+                if not bytes_sent:
+                    TTS_TTFB_SECONDS.observe(time.perf_counter() - received, source)
+                await response.write(data)
+                bytes_sent += len(data)
+        except ConnectionResetError:
+            # Leaving subscribe() cancels the synthesis if nobody else is listening
+            print(f"TTS client disconnected after {bytes_sent} bytes")
+            return response
+        except Exception as e:
+            # The 200 headers are already out, so a failed synthesis can only end the stream
+            print(f"TTS synthesis failed after {bytes_sent} bytes: {e}")
+            return response
+        finally:
+            TTS_ACTIVE_STREAMS.dec()
+            TTS_BYTES.inc(bytes_sent, source)
         
         print(f"TTS sent {bytes_sent} bytes")
         await response.write_eof()
@@ -63,6 +295,354 @@ async def handle_tts(request):
         traceback.print_exc()
         return web.Response(status=500, text=str(e))
 
+async def handle_concordance_meta(request):
+    """Concordance stats plus the chapter count for every indexed word."""
+    index = request.app['concordance']
+    if index is None:
+        return web.json_response({"error": "Concordance not built"}, status=503)
+    
+    return web.Response(body=index.index_json(), content_type='application/json')
+
+async def handle_concordance_suggest(request):
+    """Prefix / substring / wildcard word suggestions, top-k by chapter count."""
+    vocabulary = request.app['vocabulary']
+    if vocabulary is None:
+        return web.json_response({"error": "Vocabulary index not built"}, status=503)
+    
+    query = request.query.get('q', '')
+    mode = request.query.get('mode', 'auto')
+    try:
+        k = max(1, min(int(request.query.get('k', 10)), 100))
+    except ValueError:
+        return web.json_response({"error": "k must be an integer"}, status=400)
+    
+    start = time.perf_counter()
+    try:
+        results = vocabulary.suggest(query, k, mode)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    elapsed_us = (time.perf_counter() - start) * 1e6
+    
+    return web.json_response({
+        "query": query,
+        "mode": mode,
+        "results": [{"word": word, "count": count} for word, count in results],
+        "elapsed_us": round(elapsed_us, 1)
+    })
+
+async def handle_concordance_spell(request):
+    """Spelling corrections within two edits, nearest first, then by chapter count."""
+    spelling = request.app['spelling']
+    if spelling is None:
+        return web.json_response({"error": "Spelling index not built"}, status=503)
+    
+    query = request.query.get('q', '')
+    try:
+        k = max(1, min(int(request.query.get('k', 10)), 100))
+    except ValueError:
+        return web.json_response({"error": "k must be an integer"}, status=400)
+    
+    start = time.perf_counter()
+    results = spelling.lookup(query, k)
+    elapsed_us = (time.perf_counter() - start) * 1e6
+    
+    return web.json_response({
+        "query": query,
+        "results": [{"word": word, "distance": distance, "count": count}
+                    for word, distance, count in results],
+        "elapsed_us": round(elapsed_us, 1)
+    })
+
+async def handle_concordance_word(request):
+    """Return the concordance entries for a single word."""
+    index = request.app['concordance']
+    if index is None:
+        return web.json_response({"error": "Concordance not built"}, status=503)
+    
+    word = request.match_info['word'].lower().strip()
+    body = index.lookup_json(word)
+    if body is None:
+        return web.json_response({"word": word, "entries": []}, status=404)
+    
+    # Pre-encoded (and, from concordance.idx, a slice of the mapped file)
+    return web.Response(body=body, content_type='application/json')
+
+async def handle_search(request):
+    """
+    Phrase / ordered / proximity verse search on the positional index:
+    ?q="living water", ?q="bread life"~2 or ?q=faith NEAR/5 works
+    """
+    index = request.app['positional']
+    if index is None:
+        return web.json_response({"error": "Positional index not built"}, status=503)
+    
+    query = request.query.get('q', '')
+    try:
+        limit = max(1, min(int(request.query.get('limit', 50)), 500))
+    except ValueError:
+        return web.json_response({"error": "limit must be an integer"}, status=400)
+    
+    start = time.perf_counter()
+    try:
+        kind, words, matches = index.search(query)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    results = index.results(matches, limit)
+    elapsed_us = (time.perf_counter() - start) * 1e6
+    
+    return web.json_response({
+        "query": query,
+        "kind": kind,
+        "words": words,
+        "matches": len(matches),
+        "verses": len({verse_id for verse_id, _, _ in matches}),
+        "results": results,
+        "elapsed_us": round(elapsed_us, 1)
+    })
+
+async def handle_query(request):
+    """
+    Boolean verse or chapter search: ?q=covenant AND blood NOT egypt,
+    with &level=verse|chapter (default verse).
+    """
+    engine = request.app['boolean']
+    if engine is None:
+        return web.json_response({"error": "Positional index not built"}, status=503)
+    
+    query = request.query.get('q', '')
+    level = request.query.get('level', 'verse')
+    if level not in LEVELS:
+        return web.json_response({"error": f"level must be one of {', '.join(LEVELS)}"}, status=400)
+    try:
+        limit = max(1, min(int(request.query.get('limit', 50)), 500))
+    except ValueError:
+        return web.json_response({"error": "limit must be an integer"}, status=400)
+    
+    start = time.perf_counter()
+    try:
+        matches = engine.query(query, level)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    results = engine.describe(matches.to_ids(limit), level)
+    elapsed_us = (time.perf_counter() - start) * 1e6
+    
+    return web.json_response({
+        "query": query,
+        "level": level,
+        "matches": len(matches),
+        "results": results,
+        "elapsed_us": round(elapsed_us, 1)
+    })
+
+async def handle_rank(request):
+    """
+    BM25-ranked verses or chapters for a multi-word query:
+    ?q=living water&level=verse|chapter&k=10
+    """
+    index = request.app['bm25']
+    if index is None:
+        return web.json_response({"error": "BM25 index not built"}, status=503)
+    
+    query = request.query.get('q', '')
+    level = request.query.get('level', 'verse')
+    if level not in LEVELS:
+        return web.json_response({"error": f"level must be one of {', '.join(LEVELS)}"}, status=400)
+    try:
+        k = max(1, min(int(request.query.get('k', 10)), 500))
+    except ValueError:
+        return web.json_response({"error": "k must be an integer"}, status=400)
+    
+    start = time.perf_counter()
+    lemmas, ranked = index.search(query, level, k)
+    results = index.results(ranked, level, request.app['positional'])
+    elapsed_us = (time.perf_counter() - start) * 1e6
+    
+    return web.json_response({
+        "query": query,
+        "level": level,
+        "terms": lemmas,
+        "results": results,
+        "elapsed_us": round(elapsed_us, 1)
+    })
+
+async def handle_network_next(request):
+    """Valid next nodes for a click path: ?path=god,warn (or repeated path=)."""
+    index = request.app['network']
+    if index is None:
+        return web.json_response({"error": "Network not built"}, status=503)
+    
+    path = [word for value in request.query.getall('path', []) for word in value.split(',') if word]
+    reachable = index.reachable(path)
+    
+    return web.json_response({
+        "path": path,
+        "next": index.valid_next(path),
+        "chapters": index.chapters_in(reachable)
+    })
+
+def get_chapter_store(request):
+    store = request.app['chapters']
+    if store is None:
+        raise web.HTTPServiceUnavailable(text="Chapter store not built")
+    return store
+
+def get_chapter_key(request, store):
+    key = request.match_info['key']
+    if key not in store:
+        raise web.HTTPNotFound(text=f"Unknown chapter: {key}")
+    return key
+
+async def handle_chapter_index(request):
+    """Chapter order and navigation info (no verse text) for the reader."""
+    store = get_chapter_store(request)
+    books = []
+    for _, book, _, _ in store.meta:
+        if not books or books[-1] != book:
+            books.append(book)
+    
+    return web.json_response({
+        "meta": {"total_chapters": len(store), "books": books},
+        "order": store.order,
+        "chapters": {key: store.info(key) for key in store.order}
+    })
+
+async def handle_chapter(request):
+    """One chapter, sliced from the mmap'd store."""
+    store = get_chapter_store(request)
+    key = get_chapter_key(request, store)
+    return web.json_response(store.chapter(key))
+
+async def handle_chapter_verses(request):
+    """A verse range of a chapter: ?start=&end= (verse numbers), ?format=json|text."""
+    store = get_chapter_store(request)
+    key = get_chapter_key(request, store)
+    try:
+        start = int(request.query['start']) if 'start' in request.query else None
+        end = int(request.query['end']) if 'end' in request.query else None
+    except ValueError:
+        raise web.HTTPBadRequest(text="start and end must be verse numbers")
+    
+    if request.query.get('format') == 'text':
+        # Contiguous slice of the mapped file, one verse per line
+        first, last = store.verse_span(key, start, end)
+        return web.Response(body=store.text_slice(first, last),
+                            content_type='text/plain', charset='utf-8')
+    
+    return web.json_response({"chapter": key, "verses": store.verses(key, start, end)})
+
+async def handle_artifact(request):
+    """Serve a prebuilt JSON artifact: precompressed variant, ETag/304, Range."""
+    store = request.app['artifacts']
+    selected = store.variant(request.path.lstrip('/'), request.headers.get('Accept-Encoding', ''))
+    if selected is None:
+        raise web.HTTPNotFound()
+    
+    path, encoding, stat = selected
+    etag = store.etag(path, stat)
+    headers = {
+        'ETag': etag,
+        'Cache-Control': 'no-cache',  # always revalidate; a match costs one 304
+        'Vary': 'Accept-Encoding',
+    }
+    
+    # Conditional GET
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        tags = [t.strip().removeprefix('W/') for t in if_none_match.split(',')]
+        if '*' in tags or etag in tags:
+            return web.Response(status=304, headers=headers)
+    
+    headers['Content-Type'] = 'application/json'
+    headers['Accept-Ranges'] = 'bytes'
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    
+    # Single byte range over the bytes actually sent (i.e. the encoded variant)
+    size = stat.st_size
+    start, end, status = 0, size - 1, 200
+    byte_range = parse_range(request.headers.get('Range'), size)
+    if_range = request.headers.get('If-Range')
+    if byte_range is not None and (not if_range or if_range.strip() == etag):
+        if byte_range == "unsatisfiable":
+            headers['Content-Range'] = f'bytes */{size}'
+            return web.Response(status=416, headers=headers)
+        start, end = byte_range
+        status = 206
+        headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    
+    response = web.StreamResponse(status=status, headers=headers)
+    response.content_length = end - start + 1
+    await response.prepare(request)
+    
+    if request.method != 'HEAD':
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                block = f.read(min(STATIC_CHUNK_SIZE, remaining))
+                if not block:
+                    break
+                await response.write(block)
+                remaining -= len(block)
+    
+    await response.write_eof()
+    return response
+
+async def handle_metrics(request):
+    """Server metrics: Prometheus text by default, JSON with ?format=json."""
+    admission = request.app['tts_admission']
+    TTS_ADMISSION_ACTIVE.set(admission.active)
+    TTS_ADMISSION_QUEUE.set(admission.queue_depth)
+    
+    wants_json = (request.query.get('format') == 'json'
+                  or 'application/json' in request.headers.get('Accept', ''))
+    if not wants_json:
+        return web.Response(text=metrics.render_prometheus(),
+                            content_type='text/plain', charset='utf-8',
+                            headers={'Cache-Control': 'no-store'})
+    
+    data = metrics.to_json()
+    hits = TTS_CACHE_LOOKUPS.values.get(('hit',), 0)
+    lookups = TTS_CACHE_LOOKUPS.total()
+    cache = request.app['audio_cache']
+    data['summary'] = {
+        'tts_cache_hit_ratio': hits / lookups if lookups else None,
+        'tts_cache_files': len(cache),
+        'tts_cache_bytes': cache.total_bytes,
+        'tts_flights_in_progress': len(request.app['tts_flights']),
+        'tts_admission': {
+            'active': admission.active,
+            'queue_depth': admission.queue_depth,
+            'max_active': admission.max_active,
+            'max_per_client': admission.max_per_client,
+            'max_queue': admission.max_queue,
+            'retry_after': admission.retry_after(),
+        },
+        'pid': os.getpid(),  # metrics are per worker process
+    }
+    return web.json_response(data, headers={'Cache-Control': 'no-store'})
+
+@web.middleware
+async def metrics_middleware(request, handler):
+    """Record latency and status per route (the route pattern, not the raw path)."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    except asyncio.CancelledError:
+        status = 499  # client closed the connection
+        raise
+    finally:
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource is not None else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - start, request.method, route)
+        REQUESTS.inc(1, request.method, route, str(status))
+
 async def handle_options(request):
     """Handle CORS preflight."""
     return web.Response(
@@ -73,22 +653,136 @@ async def handle_options(request):
         }
     )
 
-def run_server():
-    os.chdir(os.path.dirname(os.path.abspath(__file__)))
-    port = find_open_port()
+def create_app(tts_engine=TTS_ENGINE, stub_speed=10.0, stub_latency=0.2,
+               trusted_proxies=(), tts_per_client=TTS_MAX_PER_CLIENT):
+    """Load the indexes and register all routes."""
+    app = web.Application(middlewares=[metrics_middleware])
+    app['trusted_proxies'] = frozenset(trusted_proxies)
+    app['tts_engines'] = create_engines(stub_speed, stub_latency)
+    app['tts_engine'] = tts_engine
+    app['concordance'] = (open_concordance_store(CONCORDANCE_STORE_FILE, CONCORDANCE_FILE)
+                          or load_concordance_index(CONCORDANCE_FILE))
+    app['vocabulary'] = open_vocabulary_index(VOCABULARY_INDEX_FILE)
+    app['spelling'] = open_spelling_index(SPELLING_INDEX_FILE)
+    app['positional'] = open_positional_index(POSITIONAL_INDEX_FILE)
+    app['boolean'] = open_boolean_index(app['positional'])
+    app['bm25'] = open_bm25_index(RANK_INDEX_FILE)
+    app['audio_cache'] = AudioCache(TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES)
+    app['tts_flights'] = SingleFlight()
+    app['tts_admission'] = Admission(TTS_MAX_ACTIVE, tts_per_client, TTS_MAX_QUEUE, TTS_MAX_QUEUE_WAIT)
+    app['artifacts'] = ArtifactStore('.')
+    app['chapters'] = open_chapter_store(CHAPTER_STORE_FILE, CHAPTERS_FILE)
+    app['network'] = load_network_index(NETWORK_INDEX_FILE)
     
-    app = web.Application()
     app.router.add_post('/api/tts', handle_tts)
     app.router.add_options('/api/tts', handle_options)
+    app.router.add_get('/api/concordance', handle_concordance_meta)
+    # Register before {word} so "suggest" and "spell" are not treated as word lookups
+    app.router.add_get('/api/concordance/suggest', handle_concordance_suggest)
+    app.router.add_get('/api/concordance/spell', handle_concordance_spell)
+    app.router.add_get('/api/concordance/{word}', handle_concordance_word)
+    app.router.add_get('/api/search', handle_search)
+    app.router.add_get('/api/query', handle_query)
+    app.router.add_get('/api/rank', handle_rank)
+    app.router.add_get('/api/network/next', handle_network_next)
+    app.router.add_get('/api/chapters', handle_chapter_index)
+    app.router.add_get('/api/chapter/{key}', handle_chapter)
+    app.router.add_get('/api/chapter/{key}/verses', handle_chapter_verses)
+    app.router.add_get('/api/metrics', handle_metrics)
+    for name in ARTIFACTS:
+        app.router.add_get(f'/{name}', handle_artifact)
     app.router.add_static('/', '.', show_index=True)
     
-    url = f"http://localhost:{port}/visualization.html"
-    print(f"Bible Visualization Server running at http://localhost:{port}")
-    print(f"TTS Voice: {VOICE} (streaming)")
+    cache = app['audio_cache']
+    print(f"TTS cache: {TTS_CACHE_DIR}/ ({len(cache)} files, "
+          f"{cache.total_bytes / 1024 / 1024:.1f} of {TTS_CACHE_MAX_BYTES / 1024 / 1024:.0f} MB)")
+    return app
+
+def serve(host, port, reuse_port=False, app_options=None):
+    """Run one server process (a worker when reuse_port is set)."""
+    # handler_cancellation: a client disconnect cancels its handler at once,
+    # so an abandoned TTS stream stops its upstream synthesis immediately
+    web.run_app(create_app(**(app_options or {})), host=host, port=port, reuse_port=reuse_port,
+                handler_cancellation=True, print=None)
+
+def run_server(host='localhost', port=None, workers=1, open_browser=True, app_options=None):
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    if port is None:
+        port = find_open_port(host=host)
+    
+    if workers > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+        print("SO_REUSEPORT is not available on this platform - running a single process")
+        workers = 1
+    
+    browse_host = 'localhost' if host in ('0.0.0.0', '::', '') else host
+    url = f"http://{browse_host}:{port}/visualization.html"
+    print(f"Bible Visualization Server running at http://{host}:{port}"
+          + (f" ({workers} workers)" if workers > 1 else ""))
+    tts_engine = (app_options or {}).get('tts_engine', TTS_ENGINE)
+    engine = create_engines()[tts_engine]
+    print(f"TTS engine: {tts_engine}, voice {engine.default_voice} (streaming)"
+          + ("" if engine.available() else " - NOT AVAILABLE on this machine"))
     print("Press Ctrl+C to stop")
     
-    webbrowser.open(url)
-    web.run_app(app, host='localhost', port=port, print=None)
+    if workers == 1:
+        if open_browser:
+            webbrowser.open(url)
+        serve(host, port, app_options=app_options)
+        return
+    
+    processes = [
+        multiprocessing.Process(target=serve, args=(host, port, True, app_options), name=f"worker-{i}")
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    # Pass a plain SIGTERM (service stop) on so no worker is left holding the port
+    signal.signal(signal.SIGTERM, lambda signum, frame: [p.terminate() for p in processes])
+    if open_browser:
+        webbrowser.open(url)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Workers receive the same SIGINT and shut down on their own
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bible visualization server")
+    parser.add_argument("--host", default="localhost", help="interface to bind (default: localhost)")
+    parser.add_argument("--port", type=int, default=None,
+                        help="port to bind (default: first free port from 8000)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes sharing the port via SO_REUSEPORT (default: 1)")
+    parser.add_argument("--no-browser", action="store_true", help="do not open a browser")
+    parser.add_argument("--tts-engine", choices=sorted(ENGINES), default=TTS_ENGINE,
+                        help=f"default TTS engine (default: {TTS_ENGINE})")
+    parser.add_argument("--stub-speed", type=float, default=10.0,
+                        help="stub engine: audio produced per second, as a multiple of real time")
+    parser.add_argument("--stub-latency", type=float, default=0.2,
+                        help="stub engine: seconds before the first audio")
+    parser.add_argument("--trusted-proxy", action="append", default=[], metavar="ADDR",
+                        help="proxy whose Forwarded / X-Forwarded-For header names the client "
+                             "(repeatable)")
+    parser.add_argument("--tts-per-client", type=int, default=TTS_MAX_PER_CLIENT,
+                        help=f"concurrent TTS syntheses per client and worker, 0 for no limit "
+                             f"(default: {TTS_MAX_PER_CLIENT})")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.tts_per_client < 0:
+        parser.error("--tts-per-client must be 0 or more")
+    return args
 
 if __name__ == '__main__':
-    run_server()
+    args = parse_args()
+    run_server(args.host, args.port, args.workers, not args.no_browser, {
+        'tts_engine': args.tts_engine,
+        'stub_speed': args.stub_speed,
+        'stub_latency': args.stub_latency,
+        'trusted_proxies': args.trusted_proxy,
+        'tts_per_client': args.tts_per_client,
+    })
@@ -0,0 +1,154 @@
+"""
+Precompressed Static Artifacts
+The large JSON files the page loads (network, concordance, chapters,
+entities) are compressed once at build time into .gz and .br siblings,
+so the server never compresses on the fly.
+
+ArtifactStore picks the best fresh variant for a request's
+Accept-Encoding and computes strong ETags from the variant's content
+(cached until the file changes).
+
+Usage: python static_artifacts.py [file ...]   (defaults to all artifacts)
+"""
+
+import gzip
+import hashlib
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ARTIFACTS = ["network_data.json", "concordance.json", "chapters.json", "entities.json"]
+
+# Preferred first
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def compress_artifact(filepath) -> dict:
+    """Write .gz (and .br when brotli is installed) next to filepath. Returns sizes."""
+    path = Path(filepath)
+    raw = path.read_bytes()
+    sizes = {"identity": len(raw)}
+
+    # mtime=0 keeps the output (and so its ETag) identical for identical input
+    gz_path = path.with_name(path.name + ".gz")
+    gz_path.write_bytes(gzip.compress(raw, compresslevel=9, mtime=0))
+    sizes["gzip"] = gz_path.stat().st_size
+
+    if brotli is not None:
+        br_path = path.with_name(path.name + ".br")
+        br_path.write_bytes(brotli.compress(raw, quality=11))
+        sizes["br"] = br_path.stat().st_size
+
+    summary = ", ".join(f"{enc} {size / 1024:,.0f} KB" for enc, size in sizes.items())
+    print(f"Compressed {path.name}: {summary}")
+    return sizes
+
+
+def parse_accept_encoding(header: str) -> set:
+    """Return the content-codings the client accepts (q > 0)."""
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding and q > 0:
+            accepted.add(coding)
+    return accepted
+
+
+class ArtifactStore:
+    """Variant selection and strong ETags for prebuilt artifacts."""
+
+    def __init__(self, root="."):
+        self.root = Path(root)
+        self._etags = {}  # path -> (mtime_ns, size, etag)
+
+    def variant(self, name: str, accept_encoding: str):
+        """
+        Return (path, encoding, stat) for the best available variant, where
+        encoding is None for the uncompressed file. Variants older than the
+        source are ignored. Returns None if the artifact does not exist.
+        """
+        source = self.root / name
+        try:
+            source_stat = source.stat()
+        except FileNotFoundError:
+            return None
+
+        accepted = parse_accept_encoding(accept_encoding or "")
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            path = source.with_name(source.name + suffix)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime_ns >= source_stat.st_mtime_ns:
+                return path, encoding, stat
+
+        return source, None, source_stat
+
+    def etag(self, path: Path, stat) -> str:
+        """Strong ETag: hash of the exact bytes served (differs per encoding)."""
+        cached = self._etags.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        etag = f'"{digest.hexdigest()[:32]}"'
+        self._etags[path] = (stat.st_mtime_ns, stat.st_size, etag)
+        return etag
+
+
+def parse_range(header: str, size: int):
+    """
+    Parse a single "bytes=" range. Returns (start, end) inclusive, None to
+    ignore the header (absent, malformed or multi-range), or "unsatisfiable".
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+
+    first, _, last = header[6:].strip().partition('-')
+    try:
+        if first == '':
+            # Suffix range: last N bytes
+            length = int(last)
+            if length <= 0:
+                return "unsatisfiable"
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if end < start:
+        return None
+    if start >= size:
+        return "unsatisfiable"
+    return start, min(end, size - 1)
+
+
+if __name__ == "__main__":
+    import sys
+
+    files = sys.argv[1:] or ARTIFACTS
+    if brotli is None:
+        print("brotli not installed - writing gzip variants only (pip install brotli)")
+    for filename in files:
+        if Path(filename).exists():
+            compress_artifact(filename)
+        else:
+            print(f"Skipping {filename} (not built)")
@@ -0,0 +1,97 @@
+"""
+Admission Control for TTS Synthesis
+Bounds the number of upstream syntheses running at once, globally and per
+client, with a short FIFO wait queue in front. A request that would
+exceed the per-client limit, finds the queue full, or waits longer than
+max_wait is rejected with a Retry-After estimate instead of piling on more
+upstream work. This keeps tail latency bounded during bursts.
+
+Cache hits and requests that join an in-flight synthesis need no slot.
+Limits are per process: with --workers N the server admits up to N times
+as many. max_per_client=0 turns the per-client limit off.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"TTS busy ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Admission:
+    """Global + per-client concurrency limits with a bounded FIFO wait queue."""
+
+    def __init__(self, max_active=8, max_per_client=2, max_queue=32, max_wait=15.0):
+        self.max_active = max_active
+        self.max_per_client = max_per_client
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.clients = {}       # client -> active + queued requests
+        self.waiters = deque()  # futures of queued requests, oldest first
+        self.mean_hold = 5.0    # EWMA of slot hold time (seconds), for Retry-After
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.waiters)
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up for a newcomer."""
+        rounds = (self.queue_depth + 1) / max(1, self.max_active)
+        return max(1, min(60, math.ceil(self.mean_hold * rounds)))
+
+    async def acquire(self, client: str) -> float:
+        """Wait for a slot. Returns the time waited; raises AdmissionRejected."""
+        if self.max_per_client and self.clients.get(client, 0) >= self.max_per_client:
+            raise AdmissionRejected("per-client limit", self.retry_after())
+
+        if self.active < self.max_active and not self.queue_depth:
+            self.active += 1
+            self.clients[client] = self.clients.get(client, 0) + 1
+            return 0.0
+
+        if self.queue_depth >= self.max_queue:
+            raise AdmissionRejected("queue full", self.retry_after())
+
+        start = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self.clients[client] = self.clients.get(client, 0) + 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we gave up: hand the slot on
+                self.release(client)
+            else:
+                waiter.cancel()
+                self.waiters.remove(waiter)
+                self._forget(client)
+            if isinstance(e, asyncio.TimeoutError):
+                raise AdmissionRejected("queue timeout", self.retry_after()) from None
+            raise
+        return time.perf_counter() - start
+
+    def release(self, client: str, held: float = None):
+        """Free a slot (and record how long it was held) and wake the next waiter."""
+        if held is not None:
+            self.mean_hold += 0.2 * (held - self.mean_hold)
+        self._forget(client)
+        self.active -= 1
+        if self.waiters:
+            # Abandoned waiters remove themselves, so the head is still waiting
+            self.active += 1
+            self.waiters.popleft().set_result(True)
+
+    def _forget(self, client: str):
+        remaining = self.clients.get(client, 0) - 1
+        if remaining > 0:
+            self.clients[client] = remaining
+        else:
+            self.clients.pop(client, None)
@@ -0,0 +1,129 @@
+"""
+Content-addressed On-disk TTS Audio Cache
+Finished MP3s are stored as <sha256(voice, text)>.mp3 so replaying a
+chapter never pays the synthesis latency again.
+
+Least-recently-used files are evicted once the cache grows past its byte
+budget. A cache miss is written through a CacheWriter while the audio is
+streamed to the client, and only becomes visible once it is complete.
+"""
+
+import hashlib
+import itertools
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+_writer_ids = itertools.count()
+
+
+def cache_key(voice: str, text: str) -> str:
+    """Content hash identifying one synthesized audio file."""
+    return hashlib.sha256(f"{voice}\n{text}".encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """Directory of MP3 files with an in-memory LRU index and a byte budget."""
+
+    def __init__(self, directory="audio_cache", max_bytes=4 * 1024 ** 3):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> size, least recently used first
+        self.total_bytes = 0
+        self._scan()
+
+    def _scan(self):
+        """Rebuild the LRU order from file mtimes (refreshed on every hit)."""
+        # Leftovers from interrupted writes (recent ones may belong to a live process)
+        for tmp in self.directory.glob("*.tmp"):
+            if time.time() - tmp.stat().st_mtime > 3600:
+                tmp.unlink(missing_ok=True)
+
+        files = []
+        for path in self.directory.glob("*.mp3"):
+            stat = path.stat()
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _, key, size in sorted(files):
+            self.entries[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.mp3"
+
+    def get(self, key: str):
+        """Return the cached file's path and mark it recently used, or None."""
+        path = self.path(key)
+        if key not in self.entries:
+            # Another server worker sharing the directory may have written it
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                return None
+            self.add(key, size)
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Removed behind our back (another process or by hand)
+            self.total_bytes -= self.entries.pop(key)
+            return None
+
+        self.entries.move_to_end(key)
+        return path
+
+    def writer(self, key: str) -> "CacheWriter":
+        return CacheWriter(self, key)
+
+    def add(self, key: str, size: int):
+        """Register a file that has just been written into the cache directory."""
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)
+        self.entries[key] = size
+        self.total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        # Never evict the newest entry, even if it alone exceeds the budget
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            self.path(key).unlink(missing_ok=True)
+
+
+class CacheWriter:
+    """Tee target for a cache miss: chunks go to a temp file, renamed on commit."""
+
+    def __init__(self, cache: AudioCache, key: str):
+        self.cache = cache
+        self.key = key
+        self.size = 0
+        self.tmp_path = cache.directory / f"{key}.{os.getpid()}-{next(_writer_ids)}.tmp"
+        self.file = open(self.tmp_path, 'wb')
+
+    def write(self, data: bytes):
+        self.file.write(data)
+        self.size += len(data)
+
+    def commit(self):
+        """Publish the finished file atomically and apply the byte budget."""
+        self.file.close()
+        if self.size == 0:
+            self.tmp_path.unlink(missing_ok=True)
+            return
+        os.replace(self.tmp_path, self.cache.path(self.key))
+        self.cache.add(self.key, self.size)
+
+    def abort(self):
+        """Discard a partial file (synthesis failed or client went away)."""
+        self.file.close()
+        self.tmp_path.unlink(missing_ok=True)
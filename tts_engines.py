@@ -0,0 +1,219 @@
+"""
+Streaming TTS Engines
+Every engine turns text into a stream of MP3 bytes (Edge's format: 24 kHz
+mono, 48 kbit/s) through the same interface, so the server, the audio
+pre-generator and the benchmarks can switch between them freely.
+
+    edge    Microsoft Edge online TTS (the default; needs network)
+    local   piper (if PIPER_MODEL points to a voice model) or espeak-ng/espeak,
+            encoded to MP3 with ffmpeg or lame; fully offline
+    stub    deterministic silent MP3 produced at a configurable speed, for
+            load tests and benchmarks that must not depend on any service
+
+Audio is cached per engine and voice (see cache_voice), so switching
+engines never serves one engine's audio for another.
+"""
+
+import abc
+import asyncio
+import importlib.util
+import json
+import os
+import shutil
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+EDGE_VOICE = "en-IE-EmilyNeural"
+
+# MPEG-2 Layer III, 48 kbit/s, 24 kHz, mono, no CRC: 144-byte frames of 576 samples
+MP3_FRAME_HEADER = bytes([0xFF, 0xF3, 0x64, 0xC0])
+MP3_FRAME_BYTES = 144
+MP3_FRAME_SECONDS = 576 / 24000
+
+
+class TTSEngine(abc.ABC):
+    """Base class: stream(text, voice) yields MP3 bytes."""
+
+    name = None
+    default_voice = None
+
+    def available(self) -> bool:
+        return True
+
+    def cache_voice(self, voice: str) -> str:
+        """The voice string used in the audio cache key."""
+        return f"{self.name}:{voice}"
+
+    @abc.abstractmethod
+    def stream(self, text: str, voice: str = None) -> AsyncIterator[bytes]:
+        """MP3 bytes for text as they are produced; implemented as an async generator."""
+
+
+class EdgeEngine(TTSEngine):
+    name = "edge"
+    default_voice = EDGE_VOICE
+
+    def available(self) -> bool:
+        return importlib.util.find_spec("edge_tts") is not None
+
+    def cache_voice(self, voice: str) -> str:
+        # Un-prefixed so audio cached before engines existed stays valid
+        return voice
+
+    async def stream(self, text: str, voice: str = None):
+        import edge_tts
+        communicate = edge_tts.Communicate(text, voice or self.default_voice)
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+
+
+class LocalEngine(TTSEngine):
+    """
+    Offline synthesis with piper or espeak-ng, piped into an MP3 encoder.
+    For piper the voice is the model path (default: $PIPER_MODEL); for
+    espeak it is an espeak voice name.
+    """
+
+    name = "local"
+
+    def __init__(self, piper_model: str = None):
+        piper_model = piper_model or os.environ.get("PIPER_MODEL")
+        self.piper = shutil.which("piper") if piper_model else None
+        self.espeak = shutil.which("espeak-ng") or shutil.which("espeak")
+        self.ffmpeg = shutil.which("ffmpeg")
+        self.lame = shutil.which("lame")
+        self.default_voice = piper_model if self.piper else "en"
+
+    def available(self) -> bool:
+        return bool((self.piper or self.espeak) and (self.ffmpeg or self.lame))
+
+    def _commands(self, voice: str):
+        """(synthesizer argv, encoder argv) for the installed tools."""
+        if self.piper:
+            with open(f"{voice}.json", 'r', encoding='utf-8') as f:
+                rate = json.load(f)["audio"]["sample_rate"]
+            synthesizer = [self.piper, "--model", voice, "--output_raw"]
+            if self.ffmpeg:
+                source = ["-f", "s16le", "-ar", str(rate), "-ac", "1", "-i", "pipe:0"]
+            else:
+                source = ["-r", "-s", f"{rate / 1000:g}", "--bitwidth", "16", "--little-endian"]
+        else:
+            synthesizer = [self.espeak, "-v", voice, "--stdin", "--stdout"]
+            source = ["-f", "wav", "-i", "pipe:0"] if self.ffmpeg else []
+
+        if self.ffmpeg:
+            encoder = [self.ffmpeg, "-loglevel", "error", *source,
+                       "-ac", "1", "-ar", "24000", "-b:a", "48k", "-f", "mp3", "pipe:1"]
+        else:
+            encoder = [self.lame, "--quiet", *source, "-m", "m", "-b", "48", "--resample", "24", "-", "-"]
+        return synthesizer, encoder
+
+    async def stream(self, text: str, voice: str = None):
+        synthesizer_args, encoder_args = self._commands(voice or self.default_voice)
+
+        # synthesizer stdout -> pipe -> encoder stdin
+        read_fd, write_fd = os.pipe()
+        try:
+            synthesizer = await asyncio.create_subprocess_exec(
+                *synthesizer_args, stdin=asyncio.subprocess.PIPE, stdout=write_fd,
+                stderr=asyncio.subprocess.DEVNULL)
+            encoder = await asyncio.create_subprocess_exec(
+                *encoder_args, stdin=read_fd, stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL)
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+        async def feed():
+            synthesizer.stdin.write(text.encode('utf-8'))
+            await synthesizer.stdin.drain()
+            synthesizer.stdin.close()
+
+        # Written in the background so a long text can't deadlock on full pipes
+        feeder = asyncio.ensure_future(feed())
+        try:
+            while True:
+                data = await encoder.stdout.read(16384)
+                if not data:
+                    break
+                yield data
+            await feeder
+            if await synthesizer.wait() != 0:
+                raise RuntimeError(f"{synthesizer_args[0]} exited with status {synthesizer.returncode}")
+            if await encoder.wait() != 0:
+                raise RuntimeError(f"{encoder_args[0]} exited with status {encoder.returncode}")
+        finally:
+            feeder.cancel()
+            for process in (synthesizer, encoder):
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+
+class StubEngine(TTSEngine):
+    """
+    Deterministic offline engine: silent but valid MP3 frames, as much audio
+    as a speaker would need for the text (chars_per_second), produced after
+    `latency` seconds at `speed` times real time.
+    """
+
+    name = "stub"
+    default_voice = "silence"
+
+    def __init__(self, speed=10.0, latency=0.2, chars_per_second=15.0, frames_per_chunk=20):
+        self.speed = speed
+        self.latency = latency
+        self.chars_per_second = chars_per_second
+        self.frames_per_chunk = frames_per_chunk
+        self.frame = MP3_FRAME_HEADER + bytes(MP3_FRAME_BYTES - len(MP3_FRAME_HEADER))
+
+    def frame_count(self, text: str) -> int:
+        return max(1, round(len(text) / self.chars_per_second / MP3_FRAME_SECONDS))
+
+    async def stream(self, text: str, voice: str = None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        remaining = self.frame_count(text)
+        while remaining > 0:
+            frames = min(self.frames_per_chunk, remaining)
+            if self.speed:
+                await asyncio.sleep(frames * MP3_FRAME_SECONDS / self.speed)
+            yield self.frame * frames
+            remaining -= frames
+
+
+ENGINES = {"edge": EdgeEngine, "local": LocalEngine, "stub": StubEngine}
+
+
+def create_engines(stub_speed=10.0, stub_latency=0.2) -> dict:
+    """One instance of every engine, keyed by name."""
+    return {
+        "edge": EdgeEngine(),
+        "local": LocalEngine(),
+        "stub": StubEngine(speed=stub_speed, latency=stub_latency),
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    engine_name = sys.argv[1] if len(sys.argv) > 1 else "stub"
+    text = " ".join(sys.argv[2:]) or "In the beginning God created the heavens and the earth."
+    output = Path(f"tts_{engine_name}.mp3")
+    engine = create_engines()[engine_name]
+    if not engine.available():
+        sys.exit(f"TTS engine '{engine_name}' is not available on this machine")
+
+    async def main():
+        start = time.perf_counter()
+        ttfb = None
+        with open(output, 'wb') as f:
+            async for data in engine.stream(text):
+                ttfb = ttfb or time.perf_counter() - start
+                f.write(data)
+        print(f"{engine_name}: first audio after {ttfb * 1000:.0f} ms, "
+              f"{output.stat().st_size:,} bytes in {time.perf_counter() - start:.2f}s -> {output}")
+
+    asyncio.run(main())
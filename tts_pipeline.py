@@ -0,0 +1,103 @@
+"""
+Sentence-pipelined TTS Synthesis
+Long chapters are split into sentence-aligned segments that are
+synthesized several at a time, while the audio is still streamed
+strictly in text order. The first segment is kept short so the first
+audio arrives quickly; later segments are larger to limit per-request
+overhead upstream.
+
+MP3 frames are self-contained, so the segments' streams are simply
+concatenated.
+
+Only the next `concurrency` segments (counting the one being streamed)
+are ever in progress or buffered, which bounds both upstream load and
+memory no matter how long the chapter is.
+"""
+
+import asyncio
+import re
+
+SENTENCE_END = re.compile(r'(?<=[.!?;])\s+')
+
+FIRST_SEGMENT_CHARS = 200
+SEGMENT_CHARS = 800
+MAX_SENTENCE_CHARS = 1500
+
+
+def _split_long(sentence: str, max_chars: int):
+    """Break an over-long sentence at the last comma (or space) before max_chars."""
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(', ', 0, max_chars)
+        if cut > 0:
+            cut += 1  # keep the comma with the first half
+        else:
+            cut = sentence.rfind(' ', 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+        yield sentence[:cut].strip()
+        sentence = sentence[cut:].strip()
+    if sentence:
+        yield sentence
+
+
+def split_segments(text: str, first_chars=FIRST_SEGMENT_CHARS, segment_chars=SEGMENT_CHARS,
+                   max_sentence_chars=MAX_SENTENCE_CHARS) -> list[str]:
+    """
+    Group whole sentences into segments of up to first_chars (first segment)
+    or segment_chars (the rest). A single sentence longer than the limit
+    becomes its own segment (split at commas past max_sentence_chars).
+    Joining the segments with spaces gives back the whitespace-normalized text.
+    """
+    segments = []
+    current = ""
+    for sentence in SENTENCE_END.split(text.strip()):
+        for piece in _split_long(sentence, max_sentence_chars):
+            limit = segment_chars if segments else first_chars
+            if current and len(current) + 1 + len(piece) > limit:
+                segments.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        segments.append(current)
+    return segments
+
+
+async def pipelined_synthesize(segments: list[str], synthesize, concurrency=4):
+    """
+    Yield audio chunks for segments in order. synthesize(segment) must return
+    an async iterator of bytes. Up to `concurrency` segments are synthesized
+    at once; segment i streams live while segments after it buffer.
+    """
+    queues = [asyncio.Queue() for _ in segments]
+    tasks = []
+
+    async def run(i):
+        try:
+            async for chunk in synthesize(segments[i]):
+                queues[i].put_nowait(chunk)
+        except Exception as e:
+            queues[i].put_nowait(e)
+        else:
+            queues[i].put_nowait(None)
+
+    try:
+        for i in range(len(segments)):
+            # Keep the window full: this segment plus the next concurrency - 1
+            while len(tasks) < min(i + concurrency, len(segments)):
+                tasks.append(asyncio.ensure_future(run(len(tasks))))
+
+            while True:
+                item = await queues[i].get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+            queues[i] = None  # release the segment's buffer
+    finally:
+        # Client went away or a segment failed: stop the rest upstream
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,123 @@
+"""
+Single-flight Coalescing for TTS Synthesis
+Concurrent requests for the same (voice, text) share one upstream
+synthesis. Its chunks are buffered and fanned out to every subscriber;
+a request that joins late first gets the already-buffered prefix
+replayed, then follows the live stream. When the last subscriber goes
+away before the audio is finished, the upstream synthesis is cancelled.
+
+A caller counts as a subscriber from join() on, not from its first read,
+so a flight is never cancelled while a request that joined it is still
+getting ready to stream. A cancelled flight is no longer joinable, even
+before its task has wound down; the next request starts a fresh one.
+"""
+
+import asyncio
+
+
+class Flight:
+    """One in-progress synthesis and the audio it has produced so far."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.chunks = []
+        self.size = 0
+        self.done = False
+        self.error = None
+        self.subscribers = 0    # callers that joined and have not left
+        self.abandoned = False  # cancelled for want of subscribers
+        self.task = None
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        # Wake everyone waiting on the current event, then arm a fresh one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def append(self, data: bytes):
+        self.chunks.append(data)
+        self.size += len(data)
+        self._notify()
+
+    def finish(self, error: BaseException = None):
+        self.done = True
+        self.error = error
+        self._notify()
+
+    def leave(self):
+        """Give up a join() without subscribing (subscribe() leaves on its own)."""
+        self.subscribers -= 1
+        if not self.subscribers and not self.done and self.task is not None:
+            # Nobody is listening any more: stop pulling audio upstream
+            self.abandoned = True
+            self.task.cancel()
+
+    async def subscribe(self):
+        """
+        Yield the audio from the beginning, waiting for chunks as they arrive.
+        Uses up the caller's join(); leaves when the iteration ends.
+        """
+        try:
+            position = 0
+            while True:
+                if position < len(self.chunks):
+                    # Hand over everything buffered since the last read in one write
+                    available = len(self.chunks)
+                    yield b"".join(self.chunks[position:available])
+                    position = available
+                elif self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                else:
+                    await self._changed.wait()
+        finally:
+            self.leave()
+
+
+class SingleFlight:
+    """Registry of in-flight syntheses keyed by audio cache key."""
+
+    def __init__(self):
+        self.flights = {}
+
+    def __len__(self):
+        return len(self.flights)
+
+    def __contains__(self, key):
+        flight = self.flights.get(key)
+        return flight is not None and not flight.abandoned
+
+    def join(self, key: str, produce) -> tuple[Flight, bool]:
+        """
+        Return (flight, started) for key, counting the caller as a subscriber:
+        it must then either iterate flight.subscribe() or call flight.leave().
+        produce() is only called - and an upstream synthesis only started - if
+        no live flight for key is running.
+        """
+        flight = self.flights.get(key)
+        if flight is not None and not flight.abandoned:
+            flight.subscribers += 1
+            return flight, False
+
+        flight = Flight(key)
+        flight.subscribers = 1
+        self.flights[key] = flight
+        flight.task = asyncio.ensure_future(self._run(flight, produce))
+        return flight, True
+
+    async def _run(self, flight: Flight, produce):
+        try:
+            async for data in produce():
+                flight.append(data)
+        except asyncio.CancelledError:
+            flight.finish(ConnectionAbortedError("TTS synthesis cancelled"))
+            raise
+        except Exception as e:
+            flight.finish(e)
+        else:
+            flight.finish()
+        finally:
+            # An abandoned flight may already have been replaced under its key
+            if self.flights.get(flight.key) is flight:
+                del self.flights[flight.key]